@@ -0,0 +1,143 @@
+"""config.yml 與題目 YAML 的安全寫入。
+
+Shared by web-interface/app.py, job_runner.py and public_projection.py.
+
+- FileLock：以 fcntl.flock 實作的跨行程 lock（沒有 fcntl 的平台退回行程內
+  的 threading.Lock）；
+- locked()：依固定順序取得多個檔案的 lock，讀取—修改—寫入期間其他 request /
+  worker 必須等待，避免互相覆蓋；
+- atomic_write_text() / dump_yaml()：先寫入同目錄的暫存檔並 fsync，再以
+  os.replace 取代，讀取端只會看到舊檔或完整的新檔，不會讀到寫到一半的 YAML；
+- file_version()：檔案內容的雜湊，回傳給前端作為樂觀鎖的版本；寫入時帶上
+  讀取當下的版本，若檔案已被其他人修改則拋出 VersionConflict。
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import yaml
+
+try:
+    import fcntl
+except ImportError:  # Windows 沒有 fcntl；只會以單一行程執行（waitress）
+    fcntl = None
+
+
+class VersionConflict(Exception):
+    """寫入時檔案版本與呼叫端讀取時的版本不同（已被其他人修改）。"""
+
+    def __init__(self, path: Path, expected: str, current: Optional[str]):
+        super().__init__(f"{Path(path).name} 已被其他人修改，請重新載入後再儲存")
+        self.path = Path(path)
+        self.expected = expected
+        self.current = current
+
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class FileLock:
+    """以 fcntl.flock 實作的跨行程 lock（同一行程內的不同執行緒也會互斥）。"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._thread_lock: Optional[threading.Lock] = None
+
+    def __enter__(self):
+        if fcntl is None:
+            with _thread_locks_guard:
+                self._thread_lock = _thread_locks.setdefault(str(self.path), threading.Lock())
+            self._thread_lock.acquire()
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread_lock is not None:
+            self._thread_lock.release()
+            self._thread_lock = None
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        return False
+
+
+def lock_path(path: Path, lock_dir: Path) -> Path:
+    """path 對應的 lock 檔；集中放在 lock_dir，不會在題目目錄留下多餘檔案。"""
+    resolved = str(Path(path).resolve())
+    digest = hashlib.sha1(resolved.encode("utf-8")).hexdigest()[:16]
+    return Path(lock_dir) / f"{Path(path).name}-{digest}.lock"
+
+
+@contextmanager
+def locked(paths: Iterable[Path], lock_dir: Path) -> Iterator[None]:
+    """取得多個檔案的 lock；依 lock 檔路徑排序，避免兩個寫入者互相等待。"""
+    lock_files = sorted({lock_path(p, lock_dir) for p in paths})
+    with ExitStack() as stack:
+        for lock_file in lock_files:
+            stack.enter_context(FileLock(lock_file))
+        yield
+
+
+def file_version(path: Path) -> Optional[str]:
+    """檔案內容的版本（sha256 前 16 碼）；檔案不存在時為 None。"""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def check_version(path: Path, expected: Optional[str]) -> None:
+    """expected 有值且與目前版本不同時拋出 VersionConflict（需在 lock 內呼叫）。"""
+    if not expected:
+        return
+    current = file_version(path)
+    if current != expected:
+        raise VersionConflict(path, expected, current)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> str:
+    """以「暫存檔 + fsync + os.replace」寫入；回傳新內容的版本。"""
+    path = Path(path)
+    data = text.encode(encoding)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except OSError:
+        mode = 0o644  # mkstemp 預設為 0600，新檔案改用一般檔案權限
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def render_yaml(data: Any) -> str:
+    """專案慣用的 YAML 格式：保留欄位順序、允許 unicode。"""
+    return yaml.dump(data, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+
+def dump_yaml(path: Path, data: Any) -> str:
+    """以 render_yaml 的格式原子寫入 YAML；回傳新版本。"""
+    return atomic_write_text(path, render_yaml(data))
@@ -0,0 +1,292 @@
+"""二進位附件的 flag 洩漏偵測：壓縮檔成員、圖片與 PDF 的原始位元組。
+
+Shared by scan-secrets.py.
+
+SecretsScanner 以文字方式掃描時會略過 .zip、.png、.pdf 等副檔名，但這些正是
+files/ 內最常見的附件。本模組在不解壓到磁碟的情況下：
+
+- 串流讀取 zip / tar / gzip / bz2 / xz 的每個成員（巢狀壓縮檔最多 MAX_DEPTH 層）
+- 直接掃描圖片、PDF 等檔案的原始位元組
+- 尋找 `flag_prefix{` 以及它的 UTF-16、hex、Base64 編碼
+
+每個檔案（含解壓後的成員）最多讀取 budget 位元組，超過時停止並標記 truncated。
+"""
+from __future__ import annotations
+
+import base64
+import bz2
+import gzip
+import io
+import lzma
+import re
+import tarfile
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, List, Optional, Tuple
+
+# 預設每個檔案最多讀取的位元組數（含解壓後的成員）
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+# 巢狀壓縮檔最多展開幾層
+MAX_DEPTH = 3
+
+# 無法 seek 的巢狀壓縮檔（例如 tar 內的 zip）會先讀進記憶體，超過此大小則只掃原始位元組
+NESTED_BUFFER_LIMIT = 32 * 1024 * 1024
+
+# 每個成員、每種編碼最多回報幾筆命中
+MAX_HITS = 10
+
+# 每次讀取的大小
+CHUNK_SIZE = 1024 * 1024
+
+ZIP_SUFFIXES = {'.zip', '.jar', '.apk', '.docx', '.xlsx', '.pptx', '.odt'}
+TAR_SUFFIXES = {'.tar', '.tgz', '.tbz2', '.txz'}
+COMPRESSORS = {'.gz': gzip.GzipFile, '.bz2': bz2.BZ2File, '.xz': lzma.LZMAFile}
+
+# 以原始位元組掃描的副檔名（其餘被略過的副檔名如字型、影音維持略過）
+RAW_SUFFIXES = {
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg',
+    '.pdf', '.doc', '.xls',
+    '.bin', '.exe', '.dll', '.so',
+}
+
+# 讀取壓縮檔成員時可能遇到的錯誤（損毀、加密、不支援的壓縮方式）
+_ARCHIVE_ERRORS = (
+    zipfile.BadZipFile, tarfile.TarError, zlib.error, lzma.LZMAError,
+    EOFError, OSError, RuntimeError, NotImplementedError,
+)
+
+
+@dataclass
+class BinaryHit:
+    """二進位掃描的一筆命中。"""
+    member: Optional[str]   # 壓縮檔內的成員路徑（巢狀時以 ! 分隔）；None 表示檔案本身
+    encoding: str           # raw / utf-16-le / utf-16-be / hex / base64
+    offset: int             # 在成員（或檔案）內的位元組偏移
+    preview: str
+
+
+@dataclass
+class BinaryScanResult:
+    hits: List[BinaryHit] = field(default_factory=list)
+    members: List[str] = field(default_factory=list)    # 掃描過的壓縮檔成員
+    errors: List[str] = field(default_factory=list)     # 無法讀取的成員
+    truncated: bool = False                             # 是否因為超過 budget 而提前停止
+
+
+def container_kind(name: str) -> Optional[str]:
+    """依檔名判斷容器格式：zip / tar / compressed；一般檔案回傳 None。"""
+    path = PurePosixPath(name.lower())
+    if path.suffix in ZIP_SUFFIXES:
+        return 'zip'
+    if path.suffix in TAR_SUFFIXES or path.stem.endswith('.tar'):
+        return 'tar'
+    if path.suffix in COMPRESSORS:
+        return 'compressed'
+    return None
+
+
+def is_binary_scannable(path: Path) -> bool:
+    """是否要以二進位模式掃描（壓縮檔或 RAW_SUFFIXES）。"""
+    return container_kind(path.name) is not None or path.suffix.lower() in RAW_SUFFIXES
+
+
+def flag_needles(flag_prefix: str) -> List[Tuple[str, bytes, bool]]:
+    """回傳 (編碼名稱, needle, 是否以小寫比對)。
+
+    raw / UTF-16 / hex 以小寫比對（hex 數字大小寫皆可）；Base64 需區分大小寫，
+    三種位元組對齊各產生一個只由 `flag_prefix{` 本身決定的片段。
+    """
+    marker = f'{flag_prefix}{{'.encode('utf-8')
+    needles = [
+        ('raw', marker.lower(), True),
+        ('utf-16-le', marker.decode('utf-8').encode('utf-16-le').lower(), True),
+        ('utf-16-be', marker.decode('utf-8').encode('utf-16-be').lower(), True),
+        ('hex', marker.hex().encode('ascii'), True),
+    ]
+    for shift in range(3):
+        encoded = base64.b64encode(b'\0' * shift + marker)
+        start = -(-shift * 8 // 6)                  # 前面的字元混有對齊用的位元
+        end = (shift + len(marker)) * 8 // 6        # 後面的字元混有後續內容的位元
+        fragment = encoded[start:end]
+        if len(fragment) >= 6:
+            needles.append(('base64', fragment, False))
+    return needles
+
+
+class _Budget:
+    """單一檔案（含所有成員）剩餘可讀取的位元組數。"""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+        self.exhausted = False
+
+
+class BinaryScanner:
+    """以固定的 flag_prefix 掃描二進位檔案與壓縮檔。"""
+
+    def __init__(self, flag_prefix: str, budget: int = DEFAULT_BUDGET):
+        self.needles = flag_needles(flag_prefix)
+        self.budget = budget
+        self._overlap = max(len(needle) for _, needle, _ in self.needles) + 96
+
+    def scan_path(self, path: Path) -> BinaryScanResult:
+        """掃描單一檔案；壓縮檔會展開成員掃描。"""
+        budget = _Budget(self.budget)
+        result = BinaryScanResult()
+        with open(path, 'rb') as f:
+            try:
+                self._scan_object(f, path.name, None, 0, budget, result)
+            except _ARCHIVE_ERRORS as e:
+                # 副檔名是壓縮檔但內容損毀：退回掃描整個檔案的原始位元組
+                result.errors.append(f'{path.name}: {e}')
+                f.seek(0)
+                budget = _Budget(self.budget)
+                self._scan_stream(f, None, budget, result)
+        result.truncated = budget.exhausted
+        return result
+
+    def _scan_object(self, f: BinaryIO, name: str, member: Optional[str], depth: int,
+                     budget: _Budget, result: BinaryScanResult) -> None:
+        kind = container_kind(name) if depth < MAX_DEPTH else None
+        if kind == 'zip':
+            try:
+                with zipfile.ZipFile(f) as archive:
+                    self._scan_zip(archive, member, depth, budget, result)
+                return
+            except zipfile.BadZipFile:
+                f.seek(0)
+        elif kind is not None:
+            try:
+                with tarfile.open(fileobj=f, mode='r|*') as archive:
+                    self._scan_tar(archive, member, depth, budget, result)
+                return
+            except tarfile.ReadError:
+                f.seek(0)
+            compressor = COMPRESSORS.get(PurePosixPath(name.lower()).suffix)
+            if compressor is not None:
+                inner = PurePosixPath(name).stem
+                with compressor(fileobj=f) as stream:
+                    self._scan_object(stream, inner, _join(member, inner), depth + 1, budget, result)
+                return
+        self._scan_stream(f, member, budget, result)
+
+    def _scan_member(self, stream: BinaryIO, name: str, size: int, path: str, depth: int,
+                     budget: _Budget, result: BinaryScanResult) -> None:
+        result.members.append(path)
+        try:
+            if container_kind(name) is not None and not stream.seekable():
+                # zip 需要 seek、格式判斷失敗也要能重來：小型巢狀壓縮檔先讀進記憶體
+                if size <= min(NESTED_BUFFER_LIMIT, budget.remaining):
+                    stream = io.BytesIO(stream.read())
+                else:
+                    self._scan_stream(stream, path, budget, result)
+                    return
+            self._scan_object(stream, name, path, depth + 1, budget, result)
+        except _ARCHIVE_ERRORS as e:
+            result.errors.append(f'{path}: {e}')
+
+    def _scan_zip(self, archive: zipfile.ZipFile, member: Optional[str], depth: int,
+                  budget: _Budget, result: BinaryScanResult) -> None:
+        if archive.comment:
+            self._scan_stream(io.BytesIO(archive.comment), _join(member, '<comment>'), budget, result)
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            if budget.remaining == 0:
+                budget.exhausted = True
+                break
+            path = _join(member, info.filename)
+            try:
+                stream = archive.open(info)
+            except _ARCHIVE_ERRORS as e:
+                result.members.append(path)
+                result.errors.append(f'{path}: {e}')
+                continue
+            with stream:
+                self._scan_member(stream, info.filename, info.file_size, path, depth, budget, result)
+
+    def _scan_tar(self, archive: tarfile.TarFile, member: Optional[str], depth: int,
+                  budget: _Budget, result: BinaryScanResult) -> None:
+        for info in archive:
+            if not info.isfile():
+                continue
+            if budget.remaining == 0:
+                budget.exhausted = True
+                break
+            stream = archive.extractfile(info)
+            if stream is not None:
+                path = _join(member, info.name)
+                self._scan_member(_Sequential(stream), info.name, info.size, path, depth, budget, result)
+
+    def _scan_stream(self, f: BinaryIO, member: Optional[str], budget: _Budget,
+                     result: BinaryScanResult) -> None:
+        """分段讀取 f，保留 overlap 位元組以找出跨段的 needle。"""
+        counts = {}
+        utf16_le = set()   # 前面緊接 0x00 的 UTF-16-LE 也會符合 UTF-16-BE，只回報一次
+        tail = b''
+        base = 0   # data[0] 在成員內的偏移
+        while True:
+            size = min(CHUNK_SIZE, budget.remaining)
+            if size == 0:
+                budget.exhausted = bool(f.read(1))
+                break
+            chunk = f.read(size)
+            if not chunk:
+                break
+            budget.remaining -= len(chunk)
+            data = tail + chunk
+            lowered = data.lower()
+            for encoding, needle, fold in self.needles:
+                haystack = lowered if fold else data
+                # 完全落在 tail 內的命中已在上一段回報過
+                pos = haystack.find(needle, max(0, len(tail) - len(needle) + 1))
+                while pos != -1 and counts.get(encoding, 0) < MAX_HITS:
+                    offset = base + pos
+                    if encoding == 'utf-16-le':
+                        utf16_le.add(offset)
+                    if encoding != 'utf-16-be' or offset + 1 not in utf16_le:
+                        counts[encoding] = counts.get(encoding, 0) + 1
+                        result.hits.append(BinaryHit(member, encoding, offset, _preview(data, pos, encoding)))
+                    pos = haystack.find(needle, pos + 1)
+            keep = min(len(data), self._overlap)
+            base += len(data) - keep
+            tail = data[len(data) - keep:]
+
+
+def _join(parent: Optional[str], name: str) -> str:
+    return name if parent is None else f'{parent}!{name}'
+
+
+def _preview(data: bytes, pos: int, encoding: str) -> str:
+    snippet = data[pos:pos + 96]
+    if encoding.startswith('utf-16'):
+        text = snippet.decode(encoding, errors='ignore')
+    elif encoding == 'hex':
+        digits = re.match(rb'[0-9a-fA-F]*', snippet).group()
+        text = bytes.fromhex(digits[:len(digits) // 2 * 2].decode('ascii')).decode('latin-1')
+    else:
+        text = snippet.decode('latin-1')
+    printable = ''.join(c if c.isprintable() else '.' for c in text)
+    end = printable.find('}')
+    if encoding != 'base64' and end != -1:
+        return printable[:end + 1]
+    return printable[:48]
+
+
+class _Sequential(io.RawIOBase):
+    """tar 串流模式的成員只能循序讀取。"""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""CLI: 建置可部署的靜態網站（預設為 viewer/site → viewer/dist）。
+
+CSS / JS 壓縮並改成內容雜湊檔名（assets/app.<hash>.css），HTML 中的引用跟著
+改寫，可壓縮的檔案旁邊產生 .gz / .br（有安裝 brotli 時）。雜湊檔名的內容不會
+改變，nginx 可設定一年的 immutable 快取並以 gzip_static 直接送出預壓縮檔，
+設定範例見 wiki/Viewer-Deployment.md。內容沒變的檔案不會被改寫。
+
+Usage:
+    uv run python scripts/build-static-assets.py
+    uv run python scripts/build-static-assets.py --input viewer/site --output viewer/dist
+    uv run python scripts/build-static-assets.py --no-precompress
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# 讓 static_assets 可被 import
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from static_assets import build_site  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--input",
+        default=str(SCRIPT_DIR.parent / "viewer" / "site"),
+        help="靜態網站來源目錄（預設 ./viewer/site）",
+    )
+    parser.add_argument(
+        "--output",
+        default=str(SCRIPT_DIR.parent / "viewer" / "dist"),
+        help="輸出目錄；不屬於這次輸出的檔案會被刪除（預設 ./viewer/dist）",
+    )
+    parser.add_argument("--no-precompress", action="store_true", help="不產生 .gz / .br 預壓縮檔")
+    args = parser.parse_args()
+
+    try:
+        report = build_site(Path(args.input), Path(args.output), compress=not args.no_precompress)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"✅ 已建置 {args.input} → {args.output}")
+    for rel, hashed in sorted(report.assets.items()):
+        print(f"  {rel} → {hashed}")
+    print(f"寫入: {len(report.written)}，未變更: {report.unchanged}，移除: {len(report.removed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
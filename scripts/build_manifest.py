@@ -0,0 +1,199 @@
+"""公開發布目錄的建置 manifest（.ctf-cache/build-manifests/<producer>-<輸出目錄雜湊>.json）。
+
+Shared by public_build.py (build.sh), sync-to-public.py and generate-pages.py.
+
+manifest 放在 .ctf-cache 而不是輸出目錄內，避免來源檔案的雜湊跟著公開倉庫發布。
+
+build.sh 與 sync-to-public.py 可以輸出到同一個 public-release/，但題目的 key 與
+輸出結構不同；每個產生者（producer）各自使用一份 manifest，不會把另一方的
+紀錄當成已刪除的題目而刪掉它寫入的檔案。另一方改寫過的輸出 stat 不同，
+is_fresh() 會判定需要重新產生。
+
+每個題目記錄：
+- inputs：影響輸出的來源檔案 {相對路徑: [mtime_ns, size, sha256]}
+- settings：影響輸出的設定（flag_prefix、是否含 writeup、建置程式版本...）的雜湊
+- outputs：產生的檔案 {相對於輸出目錄的路徑: [mtime_ns, size]}；目錄以 / 結尾
+
+重新建置時，inputs、settings 都沒變且 outputs 仍在原處（stat 相同）的題目
+直接沿用，不會重寫任何檔案；其餘題目重新處理，但內容相同的輸出檔也不會
+重寫，mtime 維持不變，下游的 rsync / git 只會看到真正變動的檔案。
+
+來源檔案先比對 (mtime_ns, size)，相同就沿用上次的 sha256，不讀檔；
+stat 改變（例如重新 checkout）才重新計算 sha256。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from hashing import file_sha256
+
+DEFAULT_MANIFEST_DIR = Path(".ctf-cache") / "build-manifests"
+
+# 變更 manifest 格式時遞增，舊 manifest 會被視為不存在
+MANIFEST_VERSION = 1
+
+
+def settings_key(*parts: Any) -> str:
+    """把影響輸出的設定轉成固定的雜湊字串。"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """內容與現有檔案不同時才寫入；回傳是否有寫入。"""
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def copy_if_changed(src: Path, dst: Path) -> bool:
+    """以 copy2 複製（保留 mtime）；dst 的大小與 mtime 都與 src 相同時略過。"""
+    src_st = os.stat(src)
+    try:
+        dst_st = os.stat(dst)
+        if dst_st.st_size == src_st.st_size and dst_st.st_mtime_ns == src_st.st_mtime_ns:
+            return False
+    except OSError:
+        pass
+    Path(dst).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(src, dst)
+    return True
+
+
+class BuildManifest:
+    """單一輸出目錄的建置 manifest。"""
+
+    def __init__(self, output_dir: Path, producer: str, manifest_dir: Path = DEFAULT_MANIFEST_DIR):
+        self.output_dir = Path(output_dir)
+        self.producer = producer
+        key = hashlib.sha256(os.path.abspath(self.output_dir).encode("utf-8")).hexdigest()[:16]
+        self.path = Path(manifest_dir) / f"{producer}-{key}.json"
+        self.entries: Dict[str, dict] = {}
+        self.extra: Dict[str, Any] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path, producer: str,
+             manifest_dir: Path = DEFAULT_MANIFEST_DIR) -> "BuildManifest":
+        """讀取 producer 的 manifest；不存在、損毀、版本不符或輸出目錄不存在時回傳空的 manifest。"""
+        manifest = cls(output_dir, producer, manifest_dir)
+        if not manifest.output_dir.is_dir():
+            return manifest
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            manifest.entries = data.get("challenges") or {}
+            manifest.extra = data.get("extra") or {}
+        return manifest
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "challenges": dict(sorted(self.entries.items())),
+            "extra": self.extra,
+        }
+        text = json.dumps(data, ensure_ascii=False, sort_keys=True)
+        write_if_changed(self.path, text.encode("utf-8"))
+
+    def hash_inputs(self, key: str, base: Path, rel_paths: Iterable[str]) -> Dict[str, list]:
+        """回傳 {相對路徑: [mtime_ns, size, sha256]}；stat 未變的檔案沿用上次的 sha256。"""
+        previous = (self.entries.get(key) or {}).get("inputs") or {}
+        inputs = {}
+        for rel in sorted(rel_paths):
+            st = os.stat(Path(base) / rel)
+            old = previous.get(rel)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                inputs[rel] = old
+            else:
+                inputs[rel] = [st.st_mtime_ns, st.st_size, file_sha256(Path(base) / rel)]
+        return inputs
+
+    def is_fresh(self, key: str, inputs: Dict[str, list], settings: str) -> bool:
+        """inputs 內容與 settings 都沒變，且上次的輸出仍完整存在時回傳 True。"""
+        entry = self.entries.get(key)
+        if not entry or entry.get("settings") != settings:
+            return False
+        old = entry.get("inputs") or {}
+        if old.keys() != inputs.keys():
+            return False
+        if any(old[rel][2] != inputs[rel][2] for rel in inputs):
+            return False
+        for rel, stat in (entry.get("outputs") or {}).items():
+            path = self.output_dir / rel
+            if rel.endswith("/"):
+                if not path.is_dir():
+                    return False
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                return False
+            if [st.st_mtime_ns, st.st_size] != stat:
+                return False
+        return True
+
+    def record(self, key: str, inputs: Dict[str, list], settings: str,
+               outputs: Iterable[str], **extra: Any) -> None:
+        """記錄題目的建置結果；與上次相比不再產生的輸出會被刪除。"""
+        outputs = sorted(set(outputs))
+        stats: Dict[str, Any] = {}
+        for rel in outputs:
+            if rel.endswith("/"):
+                stats[rel] = None
+            else:
+                st = (self.output_dir / rel).stat()
+                stats[rel] = [st.st_mtime_ns, st.st_size]
+        old = (self.entries.get(key) or {}).get("outputs") or {}
+        self.remove_outputs(set(old) - set(stats), keep=stats)
+        self.entries[key] = {"inputs": inputs, "settings": settings, "outputs": stats, **extra}
+
+    def forget(self, key: str) -> None:
+        """刪除題目的所有輸出並移除紀錄。"""
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.remove_outputs((entry.get("outputs") or {}).keys())
+
+    def prune(self, live_keys: Iterable[str]) -> List[str]:
+        """刪除不在 live_keys 內的題目（已被移除的題目），回傳被刪除的 key。"""
+        removed = sorted(set(self.entries) - set(live_keys))
+        for key in removed:
+            self.forget(key)
+        return removed
+
+    def remove_outputs(self, rel_paths: Iterable[str], keep: Iterable[str] = ()) -> None:
+        """刪除輸出檔案；目錄只在清空後刪除，並往上清掉空的父目錄（keep 內的目錄除外）。"""
+        keep = {rel.rstrip("/") for rel in keep if rel.endswith("/")}
+        rel_paths = list(rel_paths)
+        for rel in rel_paths:
+            if not rel.endswith("/"):
+                try:
+                    (self.output_dir / rel).unlink()
+                except FileNotFoundError:
+                    pass
+        parents = {str(Path(rel).parent) for rel in rel_paths if not rel.endswith("/")}
+        parents |= {rel.rstrip("/") for rel in rel_paths if rel.endswith("/")}
+        for rel in sorted(parents, key=lambda p: p.count("/"), reverse=True):
+            path = self.output_dir / rel
+            while path != self.output_dir and self.output_dir in path.parents:
+                if path.relative_to(self.output_dir).as_posix() in keep:
+                    break
+                try:
+                    path.rmdir()
+                except OSError:
+                    break
+                path = path.parent
@@ -0,0 +1,205 @@
+"""共用的題目索引：掃描 challenges/ 並快取解析過的 public.yml。
+
+Shared between web-interface/app.py, generate-pages.py, generate-viewer-data.py,
+update-readme.py, generate-dashboard.py and validate-all-challenges.py.
+
+每個 public.yml 以 (mtime_ns, size, inode) 作為簽章；簽章未變的檔案不會再次
+呼叫 yaml.safe_load，因此同一個行程內多次掃描只會解析有變動的檔案。
+"""
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import yaml
+
+if TYPE_CHECKING:
+    from metadata_cache import MetadataCache
+
+
+FileSignature = Tuple[int, int, int]
+
+
+def file_signature(st: os.stat_result) -> FileSignature:
+    """由 stat 結果產生快取簽章 (mtime_ns, size, inode)。"""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@dataclass
+class ChallengeRecord:
+    """單一題目的索引資料（challenges/<category>/<name>/public.yml）。"""
+    category: str
+    name: str
+    path: Path
+    public_yml: Path
+    signature: FileSignature
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def readme(self) -> Path:
+        return self.path / "README.md"
+
+    @property
+    def writeup_dir(self) -> Path:
+        return self.path / "writeup"
+
+    @property
+    def files_dir(self) -> Path:
+        return self.path / "files"
+
+    def copy_data(self) -> Dict[str, Any]:
+        """回傳 public.yml 內容的深拷貝，呼叫端可自由修改而不影響快取。"""
+        return copy.deepcopy(self.data)
+
+
+def load_public_yml(path: Path, cache: Optional["MetadataCache"] = None) -> Tuple[Dict[str, Any], Optional[str]]:
+    """解析 public.yml，回傳 (data, error)；失敗時 data 為空 dict。
+
+    提供 cache 時會先查 metadata_cache 的持久化快取。
+    """
+    try:
+        if cache is not None:
+            data = cache.load(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        return {}, str(e)
+    if not isinstance(data, dict):
+        return {}, f"YAML root must be a mapping: {path}"
+    return data, None
+
+
+class ChallengeIndex:
+    """challenges/ 目錄的快取索引。
+
+    scan() 每次都會重新列目錄（只做 stat），但只有簽章改變的 public.yml 才會
+    重新解析；已刪除的題目會從索引中移除。設定 cache 後，需要重新解析的檔案
+    會先查詢 .ctf-cache/meta.sqlite。
+    """
+
+    def __init__(self, root: Path, cache: Optional["MetadataCache"] = None):
+        self.root = Path(root)
+        self.cache = cache
+        self._records: Dict[Path, ChallengeRecord] = {}
+        self._lock = threading.Lock()
+        self.parses = 0
+        self.hits = 0
+
+    def _iter_public_ymls(self):
+        """產生 (category, name, challenge_dir, public_yml, stat)。"""
+        try:
+            category_entries = sorted(os.scandir(self.root), key=lambda e: e.name)
+        except OSError:
+            return
+        for category_entry in category_entries:
+            if not category_entry.is_dir():
+                continue
+            try:
+                challenge_entries = sorted(os.scandir(category_entry.path), key=lambda e: e.name)
+            except OSError:
+                continue
+            for challenge_entry in challenge_entries:
+                if not challenge_entry.is_dir():
+                    continue
+                public_yml = Path(challenge_entry.path) / "public.yml"
+                try:
+                    st = public_yml.stat()
+                except OSError:
+                    continue
+                yield category_entry.name, challenge_entry.name, Path(challenge_entry.path), public_yml, st
+
+    def _parse(self, public_yml: Path) -> Tuple[Dict[str, Any], Optional[str]]:
+        self.parses += 1
+        return load_public_yml(public_yml, self.cache)
+
+    def scan(self) -> List[ChallengeRecord]:
+        """掃描並回傳所有題目（依 category, name 排序）。"""
+        with self._lock:
+            seen: Dict[Path, ChallengeRecord] = {}
+            for category, name, challenge_dir, public_yml, st in self._iter_public_ymls():
+                signature = file_signature(st)
+                record = self._records.get(public_yml)
+                if record is not None and record.signature == signature:
+                    self.hits += 1
+                else:
+                    data, error = self._parse(public_yml)
+                    record = ChallengeRecord(
+                        category=category,
+                        name=name,
+                        path=challenge_dir,
+                        public_yml=public_yml,
+                        signature=signature,
+                        data=data,
+                        error=error,
+                    )
+                seen[public_yml] = record
+            self._records = seen
+            return list(seen.values())
+
+    def get(self, category: str, name: str) -> Optional[ChallengeRecord]:
+        """取得單一題目；會先確認該檔案簽章是否仍然有效。"""
+        public_yml = self.root / category / name / "public.yml"
+        try:
+            st = public_yml.stat()
+        except OSError:
+            with self._lock:
+                self._records.pop(public_yml, None)
+            return None
+        signature = file_signature(st)
+        with self._lock:
+            record = self._records.get(public_yml)
+            if record is not None and record.signature == signature:
+                self.hits += 1
+                return record
+            data, error = self._parse(public_yml)
+            record = ChallengeRecord(
+                category=category,
+                name=name,
+                path=public_yml.parent,
+                public_yml=public_yml,
+                signature=signature,
+                data=data,
+                error=error,
+            )
+            self._records[public_yml] = record
+            return record
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """清除單一 public.yml（或整個索引）的快取。"""
+        with self._lock:
+            if path is None:
+                self._records.clear()
+            else:
+                self._records.pop(Path(path), None)
+
+
+_INDEXES: Dict[Path, ChallengeIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(root: Path, cache: Optional["MetadataCache"] = None) -> ChallengeIndex:
+    """取得 root 對應的行程內共用索引；提供 cache 時一併掛上持久化快取。"""
+    key = Path(root).resolve()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = ChallengeIndex(Path(root))
+            _INDEXES[key] = index
+        if cache is not None:
+            index.cache = cache
+        return index
+
+
+def scan_challenges(root: Path, cache: Optional["MetadataCache"] = None) -> List[ChallengeRecord]:
+    """便利函式：以共用索引掃描 root。"""
+    return get_index(root, cache).scan()
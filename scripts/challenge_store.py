@@ -0,0 +1,383 @@
+"""行程內的題目快照：啟動時載入一次，之後由檔案監看保持最新。
+
+Shared by web-interface/app.py.
+
+ChallengeIndex.scan() 雖然只重新解析有變動的 public.yml，但每次呼叫仍要列出
+整個 challenges/ 並 stat 每個檔案。ChallengeStore 把掃描結果保存成不可變的
+快照，路由直接讀取記憶體中的快照，只有在偵測到變更時才重新掃描：
+
+- 有安裝 watchdog 時以 inotify / FSEvents 監看 challenges/，只有 public.yml
+  或目錄的變更事件會把快照標記為過期，下一次讀取時重新掃描；
+- 沒有 watchdog（或監看啟動失敗）時，改由背景執行緒每 poll_interval 秒
+  呼叫一次 scan()（只做 stat，簽章未變的檔案不會重新解析）。
+
+Web 介面自己寫入 public.yml 後應呼叫 invalidate()，讓下一次讀取立即看到變更。
+
+快照同時帶有依分類 / 難度的統計與分組（ChallengeStats）。重新掃描時只把
+新增、修改、刪除的題目套用到統計上，簽章未變的題目沿用上次的 dict，
+因此讀取統計是 O(1)，更新成本只和變動的題目數量有關。分組同時作為
+query_challenges() 篩選用的次要索引。
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from challenge_index import ChallengeIndex, get_index
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 為選用套件，沒有安裝時改用輪詢
+    FileSystemEventHandler = object
+    Observer = None
+
+
+# 沒有 watchdog 時的輪詢間隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+# 統計與分組（次要索引）使用的欄位
+GROUP_FIELDS = ("category", "difficulty", "status", "author")
+
+
+def challenge_points(challenge: Dict[str, Any]) -> int:
+    """題目分數；缺少或不是整數時視為 0。"""
+    points = challenge.get("points", 0)
+    try:
+        return int(points) if points else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+def _group_value(challenge: Dict[str, Any], field_name: str, default: Any = None) -> Any:
+    """分組用的值；YAML 中寫成 list / dict 等不可雜湊的值時改用 repr。"""
+    value = challenge.get(field_name, default)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+@dataclass(frozen=True)
+class ChallengeStats:
+    """題目統計：總數、總分，以及依分類 / 難度的數量與題目分組。
+
+    counts 以 challenge.get(field, "unknown") 計數（與 /api/stats 相同），
+    groups 以 challenge.get(field) 分組，供配額檢視直接取用。
+    """
+    total_challenges: int
+    total_points: int
+    counts: Dict[str, Dict[Any, int]]
+    groups: Dict[str, Dict[Any, Tuple[Dict[str, Any], ...]]]
+
+    def group(self, field_name: str, value: Any) -> Tuple[Dict[str, Any], ...]:
+        return self.groups.get(field_name, {}).get(value, ())
+
+    def match(self, field_name: str, values: Iterable[str]) -> Tuple[Dict[str, Any], ...]:
+        """以字串比對索引值（查詢參數都是字串），回傳符合任一值的題目。"""
+        wanted = set(values)
+        found = []
+        for key, members in self.groups.get(field_name, {}).items():
+            if key is not None and str(key) in wanted:
+                found.extend(members)
+        return tuple(found)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """/api/stats 的輸出格式。"""
+        return {
+            "total_challenges": self.total_challenges,
+            "by_category": dict(self.counts.get("category", {})),
+            "by_difficulty": dict(self.counts.get("difficulty", {})),
+            "total_points": self.total_points,
+        }
+
+
+@dataclass(frozen=True)
+class ChallengeSnapshot:
+    """某一時間點的題目列表與統計；version 在內容改變時遞增。
+
+    challenges 內的 dict 由所有讀取者共用，呼叫端不可修改。
+    """
+    version: int
+    challenges: Tuple[Dict[str, Any], ...]
+    errors: Tuple[Tuple[str, str], ...]
+    loaded_at: float
+    stats: ChallengeStats
+
+
+class _Aggregates:
+    """可增量更新的統計；每個題目以 public.yml 路徑為 key。"""
+
+    def __init__(self):
+        self.total_points = 0
+        self.counts: Dict[str, Dict[Any, int]] = {f: {} for f in GROUP_FIELDS}
+        self.members: Dict[str, Dict[Any, Dict[Path, Dict[str, Any]]]] = {f: {} for f in GROUP_FIELDS}
+        self.groups: Dict[str, Dict[Any, Tuple[Dict[str, Any], ...]]] = {f: {} for f in GROUP_FIELDS}
+
+    def add(self, key: Path, challenge: Dict[str, Any], touched: set) -> None:
+        self.total_points += challenge_points(challenge)
+        for f in GROUP_FIELDS:
+            counts = self.counts[f]
+            label = _group_value(challenge, f, "unknown")
+            counts[label] = counts.get(label, 0) + 1
+            value = _group_value(challenge, f)
+            self.members[f].setdefault(value, {})[key] = challenge
+            touched.add((f, value))
+
+    def remove(self, key: Path, challenge: Dict[str, Any], touched: set) -> None:
+        self.total_points -= challenge_points(challenge)
+        for f in GROUP_FIELDS:
+            counts = self.counts[f]
+            label = _group_value(challenge, f, "unknown")
+            counts[label] -= 1
+            if not counts[label]:
+                del counts[label]
+            value = _group_value(challenge, f)
+            members = self.members[f][value]
+            del members[key]
+            if not members:
+                del self.members[f][value]
+            touched.add((f, value))
+
+    def freeze(self, total: int, touched: Iterable[Tuple[str, Any]]) -> ChallengeStats:
+        """產生不可變的統計；只重建有變動的分組。"""
+        groups = {f: dict(self.groups[f]) for f in GROUP_FIELDS}
+        for f, value in touched:
+            members = self.members[f].get(value)
+            if members:
+                groups[f][value] = tuple(members[k] for k in sorted(members))
+            else:
+                groups[f].pop(value, None)
+        self.groups = groups
+        return ChallengeStats(
+            total_challenges=total,
+            total_points=self.total_points,
+            counts={f: dict(self.counts[f]) for f in GROUP_FIELDS},
+            groups=groups,
+        )
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """watchdog 事件處理：public.yml 或目錄有變動時把快照標記為過期。"""
+
+    def __init__(self, store: "ChallengeStore"):
+        super().__init__()
+        self.store = store
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed", "closed_no_write"):
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        if event.is_directory or any(os.path.basename(p) == "public.yml" for p in paths if p):
+            self.store.invalidate()
+
+
+class ChallengeStore:
+    """challenges/ 的記憶體快照，搭配檔案監看或輪詢保持最新。"""
+
+    def __init__(self, root: Path, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 index: Optional[ChallengeIndex] = None):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self.index = index or ChallengeIndex(self.root)
+        self.mode = "manual"
+        self.refreshes = 0
+        self._snapshot: Optional[ChallengeSnapshot] = None
+        self._entries: Dict[Path, Tuple[Any, Optional[Dict[str, Any]]]] = {}
+        self._aggregates = _Aggregates()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._observer = None
+        self._poller: Optional[threading.Thread] = None
+
+    def start(self, watch: bool = True) -> "ChallengeStore":
+        """載入初始快照並啟動監看；watch=False 時只在 invalidate() 後重新掃描。"""
+        self.refresh()
+        if watch and self._observer is None and self._poller is None:
+            if not self._start_observer():
+                self._start_poller()
+        return self
+
+    def _start_observer(self) -> bool:
+        if Observer is None or not self.root.is_dir():
+            return False
+        observer = Observer()
+        try:
+            observer.schedule(_ChangeHandler(self), str(self.root), recursive=True)
+            observer.daemon = True
+            observer.start()
+        except OSError:
+            return False
+        self._observer = observer
+        self.mode = "watchdog"
+        return True
+
+    def _start_poller(self) -> None:
+        self._poller = threading.Thread(target=self._poll, name="challenge-store-poll", daemon=True)
+        self._poller.start()
+        self.mode = "polling"
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as poll_error:  # 輪詢執行緒不能因單次錯誤而停止
+                print(f"題目列表更新失敗: {poll_error}")
+
+    def stop(self) -> None:
+        """停止監看（主要供測試使用）。"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._poller is not None:
+            self._poller.join(timeout=5)
+            self._poller = None
+        self.mode = "manual"
+
+    def invalidate(self) -> None:
+        """標記快照為過期，下一次 snapshot() 會重新掃描。"""
+        self._dirty.set()
+
+    def snapshot(self) -> ChallengeSnapshot:
+        """回傳目前的快照；被標記為過期時先重新掃描。"""
+        if self._snapshot is None or self._dirty.is_set():
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """重新掃描 challenges/；內容有變動（產生新版本）時回傳 True。"""
+        with self._lock:
+            self._dirty.clear()
+            self.refreshes += 1
+            records = self.index.scan()
+            old_entries = self._entries
+            if self._snapshot is not None and len(records) == len(old_entries) and all(
+                old_entries.get(r.public_yml, (None,))[0] == r.signature for r in records
+            ):
+                return False
+
+            aggregates = self._aggregates
+            touched: set = set()
+            entries: Dict[Path, Tuple[Any, Optional[Dict[str, Any]]]] = {}
+            challenges = []
+            errors = []
+            for record in records:
+                key = record.public_yml
+                old = old_entries.get(key)
+                if old is not None and old[0] == record.signature:
+                    challenge_data = old[1]
+                else:
+                    if old is not None and old[1] is not None:
+                        aggregates.remove(key, old[1], touched)
+                    challenge_data = None
+                    if record.ok:
+                        challenge_data = record.copy_data()
+                        challenge_data.update(
+                            {
+                                "category": record.category,
+                                "name": record.name,
+                                "path": str(record.path),
+                            }
+                        )
+                        aggregates.add(key, challenge_data, touched)
+                    else:
+                        print(f"載入挑戰失敗 {record.path}: {record.error}")
+                entries[key] = (record.signature, challenge_data)
+                if challenge_data is None:
+                    errors.append((str(record.path), record.error))
+                else:
+                    challenges.append(challenge_data)
+
+            for key in old_entries.keys() - entries.keys():
+                removed = old_entries[key][1]
+                if removed is not None:
+                    aggregates.remove(key, removed, touched)
+
+            version = self._snapshot.version + 1 if self._snapshot is not None else 1
+            self._snapshot = ChallengeSnapshot(
+                version=version,
+                challenges=tuple(challenges),
+                errors=tuple(errors),
+                loaded_at=time.time(),
+                stats=aggregates.freeze(len(challenges), touched),
+            )
+            self._entries = entries
+            return True
+
+
+_STORES: Dict[Path, ChallengeStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(root: Path, watch: bool = True) -> ChallengeStore:
+    """取得 root 對應的行程內共用快照；第一次呼叫時載入並啟動監看。"""
+    key = Path(root).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = ChallengeStore(Path(root), index=get_index(root))
+            store.start(watch=watch)
+            _STORES[key] = store
+        return store
+
+
+def _sort_key(field_name: str):
+    """排序用的 key：數字依大小排在前，其餘依字串排序。"""
+    def key(challenge: Dict[str, Any]):
+        value = challenge.get(field_name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value, "")
+        return (1, 0, str(value))
+    return key
+
+
+def query_challenges(snapshot: ChallengeSnapshot, filters: Dict[str, Iterable[str]],
+                     sort: Optional[str] = None) -> List[Dict[str, Any]]:
+    """依 GROUP_FIELDS 篩選（同欄位多個值為 OR，不同欄位為 AND）並排序。
+
+    先取最小的索引分組，再以其他分組的成員檢查交集，不需要掃描全部題目。
+    sort 為欄位名稱，前面加 - 表示遞減；未指定時維持 (category, name) 順序。
+    """
+    filters = {f: set(values) for f, values in filters.items()}
+    if filters:
+        groups = sorted(
+            ((snapshot.stats.match(f, values), len(values) > 1) for f, values in filters.items()),
+            key=lambda item: len(item[0]),
+        )
+        candidates, merged = groups[0]
+        for other, _ in groups[1:]:
+            members = {id(c) for c in other}
+            candidates = tuple(c for c in candidates if id(c) in members)
+        result = list(candidates)
+        if merged:
+            # 多個值的分組是逐一串接的，恢復 (category, name) 順序
+            result.sort(key=lambda c: (c["category"], c["name"]))
+    else:
+        result = list(snapshot.challenges)
+
+    if sort:
+        # 缺少該欄位的題目不論遞增或遞減都排在最後
+        field_name = sort.lstrip("-")
+        present = [c for c in result if c.get(field_name) is not None]
+        missing = [c for c in result if c.get(field_name) is None]
+        present.sort(key=_sort_key(field_name), reverse=sort.startswith("-"))
+        result = present + missing
+    return result
+
+
+def project_fields(challenge: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """只保留指定欄位；category 與 name 是題目的識別，一律保留。"""
+    projected = {"category": challenge.get("category"), "name": challenge.get("name")}
+    for f in fields:
+        if f in challenge:
+            projected[f] = challenge[f]
+    return projected
@@ -0,0 +1,34 @@
+"""gzip / brotli 壓縮的共用設定。
+
+Shared by http_cache.py (Web 介面) and static_assets.py (靜態網站預壓縮).
+
+不依賴 Flask，generate-pages.py 在只安裝 pyyaml / jinja2 的 CI 中也能使用。
+"""
+from __future__ import annotations
+
+import gzip
+from typing import List
+
+try:
+    import brotli
+except ImportError:  # brotli 為選用套件，沒有安裝時只提供 gzip
+    brotli = None
+
+
+# 小於此大小的內容不壓縮（壓縮後的 header 成本可能比省下的還多）
+MIN_COMPRESS_SIZE = 1024
+
+# Content-Encoding -> 預壓縮檔副檔名
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> List[str]:
+    """可用的 Content-Encoding（優先順序由高到低）。"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6) -> bytes:
+    """以 encoding 壓縮；gzip 固定 mtime，內容相同時輸出也相同。"""
+    if encoding == "br":
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
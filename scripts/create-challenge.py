@@ -9,6 +9,8 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+from public_projection import PublicProjection
+
 class ChallengeCreator:
     def __init__(self, config_path='config.yml'):
         self.load_config(config_path)
@@ -260,24 +262,16 @@ class ChallengeCreator:
             raise
     
     def generate_public_from_private(self, private_config):
-        """從 private.yml 生成 public.yml (移除敏感資訊)"""
-        public_config = private_config.copy()
-        
-        # 移除敏感資訊
-        sensitive_fields = [
-            'flag', 'flag_description', 'solution_steps', 'internal_notes',
-        ]
-        for field in sensitive_fields:
-            public_config.pop(field, None)
-        
-        return public_config
+        """從 private.yml 生成 public.yml (移除敏感資訊，規則與 Web 介面共用)"""
+        config = self.config if isinstance(self.config, dict) else {}
+        return PublicProjection.from_config(config).project(private_config)
         
     def save_public_config(self, challenge_path, config):
         """儲存 public.yml"""
         try:
             config_file = challenge_path / 'public.yml'
             with open(config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
+                yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
             print(f"📝 Created: {config_file}")
         except IOError as e:
             print(f"❌ Failed to save public.yml: {e}")
@@ -0,0 +1,221 @@
+"""題目附件（files/）的清單與 sha256 快取（.ctf-cache/files.sqlite）。
+
+Shared by web-interface/app.py.
+
+- 每個附件以 (mtime_ns, size, inode) 作為簽章，sha256 只在簽章改變時重新計算
+  （分段讀取，不會把數 GB 的映像檔讀進記憶體），結果存在 sqlite，Web 介面
+  重新啟動後也不必重算；
+- 每個 files/ 目錄的清單快取在記憶體：目錄 mtime 沒變且距上次掃描不到
+  DEFAULT_TTL 秒時直接回傳，不會 stat 任何檔案；過期時以一次 scandir 取得
+  所有檔案的 stat；下載時另外確認該檔案的簽章；
+- 掃描（含計算 sha256）只鎖住該目錄：數 GB 的映像檔第一次計算 sha256 時，
+  其他題目的清單與下載不必等待；
+- sha256 同時作為下載的 strong ETag，搭配 send_file 的 Range / If-Range 支援
+  斷點續傳。
+
+快取檔損毀或無法寫入時會自動停用，退回每次重新計算，不影響清單結果。
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from hashing import file_sha256
+
+DEFAULT_CACHE_PATH = Path(".ctf-cache") / "files.sqlite"
+
+# 目錄 mtime 沒變時，清單最多沿用多久（秒）；原地覆寫檔案不會改變目錄 mtime
+DEFAULT_TTL = 2.0
+
+# 變更資料表時遞增，舊快取會被清空
+CACHE_VERSION = 1
+
+Signature = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    name: str
+    path: Path
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "modified": datetime.fromtimestamp(self.mtime_ns / 1e9).isoformat(),
+            "sha256": self.sha256,
+        }
+
+
+class FileManifest:
+    """files/ 目錄清單與 sha256 的快取；可在多個 request thread 之間共用。"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.hashed = 0
+        # 目錄 -> (目錄 mtime_ns, 掃描時間, {檔名: FileEntry})
+        self._listings: Dict[Path, Tuple[int, float, Dict[str, FileEntry]]] = {}
+        # _lock 只保護 _listings / _dir_locks；掃描在各目錄自己的 lock 內進行，
+        # sqlite 連線由 _db_lock 保護
+        self._lock = threading.Lock()
+        self._dir_locks: Dict[Path, threading.Lock] = {}
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+                PRAGMA user_version = {CACHE_VERSION};
+                """
+            )
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  無法開啟附件快取 {self.path}，改為每次重新計算: {e}")
+            self._disabled = True
+        return self._conn
+
+    def _disable(self, error: Exception) -> None:
+        print(f"⚠️  附件快取發生錯誤，改為每次重新計算: {error}")
+        self._disabled = True
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+
+    def _sha256(self, path: Path, signature: Signature, previous: Optional[FileEntry]) -> str:
+        """簽章沒變時沿用記憶體或 sqlite 中的 sha256，否則重新計算並寫回。"""
+        if previous is not None and (previous.mtime_ns, previous.size) == signature[:2]:
+            return previous.sha256
+        key = str(path.resolve())
+        with self._db_lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT mtime_ns, size, inode, sha256 FROM files WHERE path = ?", (key,)
+                    ).fetchone()
+                    if row is not None and tuple(row[:3]) == signature:
+                        return row[3]
+                except sqlite3.Error as e:
+                    self._disable(e)
+
+        # 計算 sha256 時不持有 _db_lock，其他目錄仍可讀寫快取
+        sha256 = file_sha256(path)
+        with self._db_lock:
+            self.hashed += 1
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (key, *signature, sha256)
+                    )
+                    conn.commit()
+                except sqlite3.Error as e:
+                    self._disable(e)
+        return sha256
+
+    def _scan(self, directory: Path, previous: Dict[str, FileEntry]) -> Dict[str, FileEntry]:
+        entries: Dict[str, FileEntry] = {}
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file():
+                    continue
+                st = dir_entry.stat()
+                signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+                path = Path(dir_entry.path)
+                sha256 = self._sha256(path, signature, previous.get(dir_entry.name))
+                entries[dir_entry.name] = FileEntry(
+                    dir_entry.name, path, st.st_size, st.st_mtime_ns, sha256
+                )
+        return dict(sorted(entries.items(), key=lambda kv: kv[0].lower()))
+
+    def _entries(self, directory: Path) -> Dict[str, FileEntry]:
+        directory = Path(directory)
+        try:
+            dir_mtime = directory.stat().st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(directory, None)
+            return {}
+        now = time.monotonic()
+        with self._lock:
+            cached = self._fresh(directory, dir_mtime, now)
+            if cached is not None:
+                return cached
+            dir_lock = self._dir_locks.setdefault(directory, threading.Lock())
+        # 同一個目錄同時只掃描一次；等待中的 request 直接使用剛完成的結果
+        with dir_lock:
+            with self._lock:
+                cached = self._fresh(directory, dir_mtime, now)
+                if cached is not None:
+                    return cached
+                previous = self._listings.get(directory)
+            entries = self._scan(directory, previous[2] if previous else {})
+            with self._lock:
+                self._listings[directory] = (dir_mtime, now, entries)
+            return entries
+
+    def _fresh(self, directory: Path, dir_mtime: int, now: float) -> Optional[Dict[str, FileEntry]]:
+        """仍然有效的快取清單；呼叫端需持有 _lock。"""
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == dir_mtime and now - cached[1] < self.ttl:
+            return cached[2]
+        return None
+
+    def listing(self, directory: Path) -> List[FileEntry]:
+        """directory 中的檔案（依名稱排序，不含子目錄）；目錄不存在時為空清單。"""
+        return list(self._entries(directory).values())
+
+    def entry(self, directory: Path, name: str) -> Optional[FileEntry]:
+        """directory 中名為 name 的檔案；只會回傳清單中的檔案，因此不會跳出 directory。
+
+        下載用：會再 stat 一次該檔案，確保 ETag 與實際送出的內容一致。
+        """
+        found = self._entries(directory).get(name)
+        if found is None:
+            return None
+        try:
+            st = found.path.stat()
+        except OSError:
+            self.invalidate(directory)
+            return None
+        if (st.st_mtime_ns, st.st_size) != (found.mtime_ns, found.size):
+            self.invalidate(directory)
+            return self._entries(directory).get(name)
+        return found
+
+    def invalidate(self, directory: Optional[Path] = None) -> None:
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(Path(directory), None)
@@ -0,0 +1,220 @@
+"""scan-secrets.py --incremental 使用的掃描結果快取（.ctf-cache/scan.sqlite）。
+
+以 (檔案 sha256, 規則集版本, 檔案類型) 為 key 記錄掃描結果；規則集版本由
+scan-secrets.py 依 sensitive_patterns、flag_prefix 與掃描器原始碼計算，任何一項
+改變都會換成新的 key，舊結果自然失效。
+
+查詢順序與 metadata_cache 相同：
+1. (絕對路徑, mtime_ns, size) 與上次相同 → 直接取出 sha256，不讀檔。
+2. 否則讀檔計算 sha256；同內容已掃描過 → 重播結果並更新路徑紀錄。
+3. 都沒有才呼叫掃描函式，並寫回快取。
+
+快取檔損毀或無法寫入時會自動停用，退回完整掃描，不影響掃描結果。
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from hashing import file_sha256
+
+DEFAULT_CACHE_PATH = Path(".ctf-cache") / "scan.sqlite"
+
+# 變更資料表或序列化格式時遞增，舊快取會被清空
+CACHE_VERSION = 1
+
+# 累積多少筆寫入後 commit 一次，避免每個檔案都 fsync
+_COMMIT_EVERY = 64
+
+
+class FindingsCache:
+    """以 sqlite 實作的掃描結果快取；可被 pickle 傳給 process pool worker。"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._pending = 0
+
+    def __getstate__(self):
+        # 連線不能跨行程傳遞，worker 會自行重新連線
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_pending"] = 0
+        state["hits"] = 0
+        state["misses"] = 0
+        return state
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CACHE_VERSION:
+                conn.executescript(
+                    """
+                    DROP TABLE IF EXISTS files;
+                    DROP TABLE IF EXISTS findings;
+                    """
+                )
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS findings (
+                    sha256 TEXT NOT NULL,
+                    ruleset TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (sha256, ruleset, kind)
+                );
+                PRAGMA user_version = {CACHE_VERSION};
+                """
+            )
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  無法開啟掃描快取 {self.path}，改為完整掃描: {e}")
+            self._disabled = True
+        return self._conn
+
+    def _disable(self, error: Exception) -> None:
+        print(f"⚠️  掃描快取發生錯誤，改為完整掃描: {error}")
+        self._disabled = True
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+
+    def _lookup(self, conn, sha256: str, ruleset: str, kind: str) -> Optional[List[list]]:
+        row = conn.execute(
+            "SELECT data FROM findings WHERE sha256 = ? AND ruleset = ? AND kind = ?",
+            (sha256, ruleset, kind),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def load(
+        self,
+        path: Path,
+        kind: str,
+        ruleset: str,
+        scan: Callable[[], List[list]],
+    ) -> List[list]:
+        """回傳 path 的掃描結果列；沒有快取時呼叫 scan() 計算並寫回。"""
+        path = Path(path)
+        conn = self._connect()
+        if conn is None:
+            self.misses += 1
+            return scan()
+
+        st = path.stat()
+        key = os.path.abspath(path)
+        try:
+            row = conn.execute(
+                "SELECT sha256 FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (key, st.st_mtime_ns, st.st_size),
+            ).fetchone()
+            rows = None if row is None else self._lookup(conn, row[0], ruleset, kind)
+        except sqlite3.Error as e:
+            self._disable(e)
+            return self.load(path, kind, ruleset, scan)
+        if rows is not None:
+            self.hits += 1
+            return rows
+
+        sha256 = file_sha256(path)
+        try:
+            rows = self._lookup(conn, sha256, ruleset, kind)
+        except sqlite3.Error as e:
+            self._disable(e)
+            return self.load(path, kind, ruleset, scan)
+        if rows is not None:
+            self.hits += 1
+            self._write(
+                conn,
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, sha256),
+            )
+            return rows
+
+        self.misses += 1
+        rows = scan()
+        self._write(
+            conn,
+            "INSERT OR REPLACE INTO findings (sha256, ruleset, kind, data) VALUES (?, ?, ?, ?)",
+            (sha256, ruleset, kind, json.dumps(rows, ensure_ascii=False)),
+        )
+        self._write(
+            conn,
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+            (key, st.st_mtime_ns, st.st_size, sha256),
+        )
+        return rows
+
+    def _write(self, conn, sql: str, params: tuple) -> None:
+        if self._conn is None:
+            return
+        try:
+            conn.execute(sql, params)
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                conn.commit()
+                self._pending = 0
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def prune(self, ruleset: str) -> None:
+        """刪除其他規則集版本留下的結果。"""
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM findings WHERE ruleset != ?", (ruleset,))
+            conn.commit()
+            self._pending = 0
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def flush(self) -> None:
+        """commit 目前累積的寫入（給 process pool worker 使用）。"""
+        if self._conn is not None and self._pending:
+            try:
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+            self._pending = 0
+
+    def close(self) -> None:
+        """寫回尚未 commit 的紀錄並關閉連線。"""
+        if self._conn is not None:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+            self._pending = 0
+
+    def __enter__(self) -> "FindingsCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def summary(self) -> str:
+        """給 CLI 輸出用的命中統計。"""
+        return f"📦 Scan cache: {self.hits} hit / {self.misses} miss ({self.path})"
@@ -6,7 +6,7 @@ from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 
-import yaml
+from challenge_index import get_index
 
 
 def generate_development_dashboard():
@@ -44,29 +44,16 @@ def get_challenge_progress():
     if not challenges_dir.exists():
         return progress
 
-    for category_dir in challenges_dir.iterdir():
-        if not category_dir.is_dir():
+    for record in get_index(challenges_dir).scan():
+        if not record.ok:
             continue
 
-        for challenge_dir in category_dir.iterdir():
-            if not challenge_dir.is_dir():
-                continue
-
-            public_yml = challenge_dir / "public.yml"
-            if public_yml.exists():
-                try:
-                    with open(public_yml, "r", encoding="utf-8") as f:
-                        data = yaml.safe_load(f)
-
-                    progress["total_challenges"] += 1
-                    progress["by_category"][category_dir.name] += 1
-                    progress["by_difficulty"][data.get("difficulty", "unknown")] += 1
-                    progress["by_status"][data.get("status", "unknown")] += 1
-                    progress["by_type"][
-                        data.get("challenge_type", "static_attachment")
-                    ] += 1
-                except:
-                    continue
+        data = record.data
+        progress["total_challenges"] += 1
+        progress["by_category"][record.category] += 1
+        progress["by_difficulty"][data.get("difficulty", "unknown")] += 1
+        progress["by_status"][data.get("status", "unknown")] += 1
+        progress["by_type"][data.get("challenge_type", "static_attachment")] += 1
 
     # 計算完成率
     completed = progress["by_status"]["completed"] + progress["by_status"]["ready"]
@@ -88,24 +75,13 @@ def get_quality_metrics():
         total_challenges = 0
         documented_challenges = 0
 
-        for category_dir in challenges_dir.iterdir():
-            if not category_dir.is_dir():
-                continue
+        # 與 get_challenge_progress 共用同一份索引，不會重新解析 public.yml
+        for record in get_index(challenges_dir).scan():
+            total_challenges += 1
 
-            for challenge_dir in category_dir.iterdir():
-                if not challenge_dir.is_dir():
-                    continue
-
-                public_yml = challenge_dir / "public.yml"
-                if public_yml.exists():
-                    total_challenges += 1
-
-                    # 檢查是否有完整文檔
-                    readme = challenge_dir / "README.md"
-                    writeup = challenge_dir / "writeup"
-
-                    if readme.exists() and writeup.exists():
-                        documented_challenges += 1
+            # 檢查是否有完整文檔
+            if record.readme.exists() and record.writeup_dir.exists():
+                documented_challenges += 1
 
         if total_challenges > 0:
             metrics["documentation_coverage"] = round(
@@ -8,23 +8,113 @@ CTF GitHub Pages Generator - 題目展示網站生成器
 3. 支援分類和搜尋
 4. 響應式設計
 
+增量生成：
+每個輸出頁面在 build manifest（.ctf-cache/build-manifests/）記錄它依賴的題目
+與 config 欄位；重新生成時只重新 render 依賴有變動的頁面，render 結果與上次
+相同時也不會重寫檔案。頁尾的「最後更新」時間只在頁面內容真的改變時更新，
+未變動的頁面內容與 mtime 都維持不變，部署時不會讓 CDN 快取全部失效。
+附件只在大小、mtime 或 sha256 不同時才重新複製。
+
+模板：
+頁面由 templates/pages/ 的 Jinja2 模板產生，編譯結果快取在 .ctf-cache/jinja/；
+nav、footer 每次執行只 render 一次，題目卡片每題只 render 一次。--templates
+可指定另一套模板（缺少的模板沿用預設），換主題不需要修改程式。
+
+靜態資源：
+style.css 與搜尋頁的 search.js 壓縮後以內容雜湊命名（style.<hash>.css），頁面以
+雜湊後的檔名引用，伺服器可對它們設定一年的 immutable 快取；HTML / CSS / JS /
+JSON 旁邊另外產生 .gz / .br（有安裝 brotli 時）預壓縮檔，供 nginx gzip_static
+直接送出（--no-precompress 可關閉）。
+
+平行 render：
+需要重新 render 的頁面先全部登記，再一次 render（頁數夠多且 --jobs > 1 時
+分散到 process pool，分類頁與題目頁一起平行處理），最後在主程序依序寫入。
+
 用法：
     python generate-pages.py --input ./public-release --output ./_site
     python generate-pages.py --input ./challenges --output ./docs --theme dark
+    python generate-pages.py --force    # 忽略 manifest，重新 render 所有頁面
+    python generate-pages.py --jobs 8   # 平行 render
+    python generate-pages.py --templates ./my-theme
+    python generate-pages.py --no-precompress
 """
 
 import argparse
+import copy
+import dataclasses
+import hashlib
 import json
 import os
+import shutil
 import sys
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from collections import defaultdict
-import html
-import re
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+from build_manifest import (
+    DEFAULT_MANIFEST_DIR,
+    BuildManifest,
+    copy_if_changed,
+    settings_key,
+    write_if_changed,
+)
+from challenge_index import get_index
+from hashing import source_hash
+from metadata_cache import MetadataCache
+from search_index import SHARD_BUCKETS, SearchIndex
+from static_assets import hashed_name, minify, precompress
+
+# 頁尾「最後更新」與 challenges.json generated_at 的佔位字串：比對內容時不含
+# 時間，內容真的改變、需要寫入時才換成當下時間
+UPDATED_AT_PLACEHOLDER = "<!--ctf-pages-updated-at-->"
+
+# 網站模板；--templates 指定的目錄優先，缺少的模板沿用這裡的預設模板
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates' / 'pages'
+
+# 各頁面使用的模板（layout / nav / footer / card 由這些模板引用或預先 render）
+PAGE_TEMPLATES = (
+    'index.html.j2',
+    'category.html.j2',
+    'challenge.html.j2',
+    'search.html.j2',
+    'card.html.j2',
+)
+
+# 靜態資源 {原始檔名: 模板}；每次執行 render 一次，壓縮後以內容雜湊命名
+ASSET_TEMPLATES = {
+    'style.css': 'style.css.j2',
+    'search.js': 'search.js.j2',
+}
+
+CATEGORY_EMOJIS = {
+    'web': '🌐',
+    'pwn': '💥',
+    'reverse': '🔄',
+    'crypto': '🔐',
+    'forensic': '🔍',
+    'forensics': '🔍',
+    'misc': '🎲',
+    'general': '📝'
+}
+
+
+def category_emoji(category: str) -> str:
+    """取得分類的 emoji"""
+    return CATEGORY_EMOJIS.get(category.lower(), '📁')
+
+
+# 需要 render 的頁面少於此值時不啟動 process pool（啟動成本高於 render 本身）
+_PARALLEL_MIN_PAGES = 64
+
+# 每個 worker 工作單位包含的頁面數
+_BATCH_SIZE = 16
 
 
 @dataclass
@@ -69,14 +159,63 @@ class Challenge:
         return f'<span class="difficulty-badge" style="background-color: {self.difficulty_color}">{emoji} {self.difficulty.title()}</span>'
 
 
+@dataclass
+class PendingPage:
+    """等待 render 的頁面"""
+    rel: str
+    task: Tuple[str, ...]
+    settings: str
+    sources: Dict[str, Any]
+    stamp: Optional[str] = None
+
+
+_worker_generator: Optional['PagesGenerator'] = None
+
+
+def _init_render_worker(template: 'PagesGenerator'):
+    """process pool initializer：每個 worker 持有一份題目資料與網站設定"""
+    global _worker_generator
+    _worker_generator = template
+
+
+def _render_page_batch(tasks: List[Tuple[str, ...]]) -> List[str]:
+    """在 worker 中 render 一批頁面"""
+    return [_worker_generator.render_task(task) for task in tasks]
+
+
 class PagesGenerator:
     """GitHub Pages 生成器"""
     
-    def __init__(self, config_path: Optional[str] = None):
-        """初始化生成器"""
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        cache: Optional[MetadataCache] = None,
+        manifest_dir: Path = DEFAULT_MANIFEST_DIR,
+        force: bool = False,
+        jobs: Optional[int] = 1,
+        template_dir: Optional[str] = None,
+        precompress: bool = True,
+    ):
+        """初始化生成器
+
+        jobs: render 頁面的平行 worker 數；None 表示使用 CPU 核心數
+        template_dir: 自訂模板目錄（例如另一套主題）；缺少的模板沿用 templates/pages
+        precompress: 是否替 HTML / CSS / JS / JSON 產生 .gz / .br 預壓縮檔
+        """
         self.config = self._load_config(config_path)
+        self.cache = cache
+        self.manifest_dir = Path(manifest_dir)
+        self.force = force
+        self.jobs = jobs or os.cpu_count() or 1
+        self.template_dirs = [Path(template_dir)] if template_dir else []
+        self.template_dirs.append(TEMPLATES_DIR)
+        self.precompress = precompress
+        self.bytecode_dir = self.manifest_dir.parent / 'jinja'
+        self._env: Optional[Environment] = None
         self.challenges: List[Challenge] = []
         self.categories: Dict[str, List[Challenge]] = defaultdict(list)
+        self.stats: Dict[str, int] = {}
+        self._cards: Dict[str, str] = {}
         
         # 預設設定
         self.site_title = self.config.get('project', {}).get('name', 'CTF Challenges')
@@ -114,45 +253,36 @@ class PagesGenerator:
         self.challenges = []
         self.categories = defaultdict(list)
         
-        for category_dir in challenges_dir.iterdir():
-            if not category_dir.is_dir():
+        for record in get_index(challenges_dir, self.cache).scan():
+            if not record.ok:
+                print(f"⚠️ 無法載入 {record.public_yml}: {record.error}")
                 continue
             
-            category = category_dir.name
+            data = record.data
+            category = record.category
             
-            for challenge_dir in category_dir.iterdir():
-                if not challenge_dir.is_dir():
-                    continue
+            try:
+                challenge = Challenge(
+                    name=record.name,
+                    title=data.get('title', record.name),
+                    category=data.get('category', category),
+                    difficulty=data.get('difficulty', 'unknown'),
+                    points=data.get('points', 0),
+                    description=data.get('description', ''),
+                    author=data.get('author', 'Unknown'),
+                    tags=data.get('tags', []),
+                    files=data.get('files', []),
+                    hints=data.get('hints', []),
+                    path=f"challenges/{category}/{record.name}",
+                    has_writeup=record.writeup_dir.exists(),
+                    created_at=data.get('created_at', '')
+                )
                 
-                public_yml = challenge_dir / 'public.yml'
-                if not public_yml.exists():
-                    continue
+                self.challenges.append(challenge)
+                self.categories[category].append(challenge)
                 
-                try:
-                    with open(public_yml, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f)
-                    
-                    challenge = Challenge(
-                        name=challenge_dir.name,
-                        title=data.get('title', challenge_dir.name),
-                        category=data.get('category', category),
-                        difficulty=data.get('difficulty', 'unknown'),
-                        points=data.get('points', 0),
-                        description=data.get('description', ''),
-                        author=data.get('author', 'Unknown'),
-                        tags=data.get('tags', []),
-                        files=data.get('files', []),
-                        hints=data.get('hints', []),
-                        path=f"challenges/{category}/{challenge_dir.name}",
-                        has_writeup=(challenge_dir / 'writeup').exists(),
-                        created_at=data.get('created_at', '')
-                    )
-                    
-                    self.challenges.append(challenge)
-                    self.categories[category].append(challenge)
-                    
-                except Exception as e:
-                    print(f"⚠️ 無法載入 {public_yml}: {e}")
+            except Exception as e:
+                print(f"⚠️ 無法載入 {record.public_yml}: {e}")
         
         # 排序
         self.challenges.sort(key=lambda c: (c.category, c.points, c.name))
@@ -175,9 +305,10 @@ class PagesGenerator:
         # 建立輸出目錄
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
+        self._begin(output_path, theme)
         
-        # 生成 CSS
-        self._generate_css(output_path, theme)
+        # 生成 CSS / JS
+        self._generate_assets(output_path)
         
         # 生成首頁
         self._generate_index(output_path)
@@ -186,7 +317,7 @@ class PagesGenerator:
         self._generate_category_pages(output_path)
         
         # 生成題目詳情頁面
-        self._generate_challenge_pages(output_path, input_dir)
+        self._generate_challenge_pages(output_path)
         
         # 生成搜尋頁面
         self._generate_search_page(output_path)
@@ -194,795 +325,355 @@ class PagesGenerator:
         # 生成 JSON 資料
         self._generate_json_data(output_path)
         
+        # render 並寫入以上登記的頁面
+        self._flush_pages()
+
         # 複製附件
         self._copy_attachments(input_dir, output_path)
         
+        # 移除已刪除的題目 / 分類留下的頁面
+        removed = self._manifest.prune(self._live)
+        self._manifest.save()
+
+        print(
+            f"   render {self.stats['rendered']} 頁（寫入 {self.stats['written']}），"
+            f"沿用 {self.stats['skipped']} 頁，複製 {self.stats['copied']} 個附件，"
+            f"移除 {len(removed)} 項"
+        )
         print(f"✅ 網站生成完成！")
     
-    def _generate_css(self, output_path: Path, theme: str):
-        """生成 CSS 樣式"""
-        is_dark = theme.lower() == 'dark'
-        
-        css = f"""
-/* CTF Challenge Archive - Styles */
-:root {{
-    --bg-color: {'#1a1a2e' if is_dark else '#f5f7fa'};
-    --card-bg: {'#16213e' if is_dark else '#ffffff'};
-    --text-color: {'#eee' if is_dark else '#333'};
-    --text-muted: {'#aaa' if is_dark else '#666'};
-    --border-color: {'#0f3460' if is_dark else '#e1e4e8'};
-    --accent-color: #e94560;
-    --accent-hover: #ff6b6b;
-    --shadow: {'0 4px 20px rgba(0,0,0,0.3)' if is_dark else '0 4px 20px rgba(0,0,0,0.1)'};
-}}
-
-* {{
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}}
-
-body {{
-    font-family: 'Segoe UI', 'Noto Sans TC', system-ui, -apple-system, sans-serif;
-    background: var(--bg-color);
-    color: var(--text-color);
-    line-height: 1.6;
-    min-height: 100vh;
-}}
-
-/* Header */
-.header {{
-    background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-    color: white;
-    padding: 3rem 2rem;
-    text-align: center;
-    position: relative;
-    overflow: hidden;
-}}
-
-.header::before {{
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    bottom: 0;
-    background: url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fill-rule='evenodd'%3E%3Cg fill='%23e94560' fill-opacity='0.05'%3E%3Cpath d='M36 34v-4h-2v4h-4v2h4v4h2v-4h4v-2h-4zm0-30V0h-2v4h-4v2h4v4h2V6h4V4h-4zM6 34v-4H4v4H0v2h4v4h2v-4h4v-2H6zM6 4V0H4v4H0v2h4v4h2V6h4V4H6z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E");
-}}
-
-.header h1 {{
-    font-size: 2.5rem;
-    margin-bottom: 0.5rem;
-    position: relative;
-}}
-
-.header p {{
-    font-size: 1.2rem;
-    opacity: 0.9;
-    position: relative;
-}}
-
-/* Navigation */
-.nav {{
-    background: var(--card-bg);
-    padding: 1rem 2rem;
-    border-bottom: 1px solid var(--border-color);
-    position: sticky;
-    top: 0;
-    z-index: 100;
-}}
-
-.nav-container {{
-    max-width: 1200px;
-    margin: 0 auto;
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-    flex-wrap: wrap;
-    gap: 1rem;
-}}
-
-.nav-links {{
-    display: flex;
-    gap: 1rem;
-    flex-wrap: wrap;
-}}
-
-.nav-links a {{
-    color: var(--text-color);
-    text-decoration: none;
-    padding: 0.5rem 1rem;
-    border-radius: 4px;
-    transition: all 0.3s;
-}}
-
-.nav-links a:hover, .nav-links a.active {{
-    background: var(--accent-color);
-    color: white;
-}}
-
-/* Search Box */
-.search-box {{
-    display: flex;
-    gap: 0.5rem;
-}}
-
-.search-box input {{
-    padding: 0.5rem 1rem;
-    border: 1px solid var(--border-color);
-    border-radius: 4px;
-    background: var(--bg-color);
-    color: var(--text-color);
-    width: 200px;
-}}
-
-/* Container */
-.container {{
-    max-width: 1200px;
-    margin: 0 auto;
-    padding: 2rem;
-}}
-
-/* Stats */
-.stats {{
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-    gap: 1rem;
-    margin-bottom: 2rem;
-}}
-
-.stat-card {{
-    background: var(--card-bg);
-    padding: 1.5rem;
-    border-radius: 8px;
-    text-align: center;
-    box-shadow: var(--shadow);
-    border: 1px solid var(--border-color);
-}}
-
-.stat-card .number {{
-    font-size: 2rem;
-    font-weight: bold;
-    color: var(--accent-color);
-}}
-
-.stat-card .label {{
-    color: var(--text-muted);
-    font-size: 0.9rem;
-}}
-
-/* Challenge Grid */
-.challenge-grid {{
-    display: grid;
-    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-    gap: 1.5rem;
-}}
-
-/* Challenge Card */
-.challenge-card {{
-    background: var(--card-bg);
-    border-radius: 12px;
-    overflow: hidden;
-    box-shadow: var(--shadow);
-    border: 1px solid var(--border-color);
-    transition: transform 0.3s, box-shadow 0.3s;
-}}
-
-.challenge-card:hover {{
-    transform: translateY(-5px);
-    box-shadow: 0 8px 30px rgba(233, 69, 96, 0.2);
-}}
-
-.challenge-card .card-header {{
-    padding: 1rem;
-    background: linear-gradient(135deg, var(--accent-color), var(--accent-hover));
-    color: white;
-}}
-
-.challenge-card .card-header h3 {{
-    margin-bottom: 0.5rem;
-}}
-
-.challenge-card .card-header .category {{
-    opacity: 0.9;
-    font-size: 0.9rem;
-}}
-
-.challenge-card .card-body {{
-    padding: 1rem;
-}}
-
-.challenge-card .meta {{
-    display: flex;
-    justify-content: space-between;
-    margin-bottom: 1rem;
-    font-size: 0.9rem;
-    color: var(--text-muted);
-}}
-
-.challenge-card .description {{
-    color: var(--text-muted);
-    font-size: 0.95rem;
-    margin-bottom: 1rem;
-    display: -webkit-box;
-    -webkit-line-clamp: 3;
-    -webkit-box-orient: vertical;
-    overflow: hidden;
-}}
-
-.challenge-card .tags {{
-    display: flex;
-    flex-wrap: wrap;
-    gap: 0.5rem;
-}}
-
-.tag {{
-    background: var(--bg-color);
-    padding: 0.25rem 0.5rem;
-    border-radius: 4px;
-    font-size: 0.8rem;
-    color: var(--text-muted);
-}}
-
-/* Difficulty Badge */
-.difficulty-badge {{
-    display: inline-block;
-    padding: 0.25rem 0.75rem;
-    border-radius: 20px;
-    font-size: 0.85rem;
-    color: white;
-    font-weight: 500;
-}}
-
-/* Points */
-.points {{
-    color: var(--accent-color);
-    font-weight: bold;
-}}
-
-/* Button */
-.btn {{
-    display: inline-block;
-    padding: 0.75rem 1.5rem;
-    background: var(--accent-color);
-    color: white;
-    text-decoration: none;
-    border-radius: 6px;
-    transition: all 0.3s;
-    border: none;
-    cursor: pointer;
-    font-size: 1rem;
-}}
-
-.btn:hover {{
-    background: var(--accent-hover);
-    transform: translateY(-2px);
-}}
-
-/* Challenge Detail */
-.challenge-detail {{
-    background: var(--card-bg);
-    border-radius: 12px;
-    padding: 2rem;
-    box-shadow: var(--shadow);
-}}
-
-.challenge-detail h1 {{
-    margin-bottom: 1rem;
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-    flex-wrap: wrap;
-}}
-
-.challenge-detail .meta-info {{
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-    gap: 1rem;
-    margin-bottom: 2rem;
-    padding: 1rem;
-    background: var(--bg-color);
-    border-radius: 8px;
-}}
-
-.challenge-detail .description {{
-    margin-bottom: 2rem;
-    white-space: pre-wrap;
-}}
-
-.challenge-detail .hints {{
-    margin-bottom: 2rem;
-}}
-
-.hint {{
-    background: var(--bg-color);
-    padding: 1rem;
-    border-radius: 8px;
-    margin-bottom: 0.5rem;
-    border-left: 3px solid var(--accent-color);
-}}
-
-.hint .hint-header {{
-    display: flex;
-    justify-content: space-between;
-    margin-bottom: 0.5rem;
-}}
-
-.hint .cost {{
-    color: var(--accent-color);
-}}
-
-/* Files */
-.files {{
-    margin-bottom: 2rem;
-}}
-
-.file-item {{
-    display: flex;
-    align-items: center;
-    gap: 0.5rem;
-    padding: 0.75rem 1rem;
-    background: var(--bg-color);
-    border-radius: 6px;
-    margin-bottom: 0.5rem;
-}}
-
-.file-item a {{
-    color: var(--accent-color);
-    text-decoration: none;
-}}
-
-.file-item a:hover {{
-    text-decoration: underline;
-}}
-
-/* Category Section */
-.category-section {{
-    margin-bottom: 3rem;
-}}
-
-.category-section h2 {{
-    margin-bottom: 1.5rem;
-    padding-bottom: 0.5rem;
-    border-bottom: 2px solid var(--accent-color);
-}}
-
-/* Footer */
-.footer {{
-    background: var(--card-bg);
-    padding: 2rem;
-    text-align: center;
-    margin-top: 3rem;
-    border-top: 1px solid var(--border-color);
-    color: var(--text-muted);
-}}
-
-/* Responsive */
-@media (max-width: 768px) {{
-    .header h1 {{
-        font-size: 1.8rem;
-    }}
+    # ----- 增量生成 -----
     
-    .nav-container {{
-        flex-direction: column;
-    }}
+    def _begin(self, output_path: Path, theme: str):
+        self._output_path = output_path
+        self._theme = theme
+        self._manifest = BuildManifest.load(output_path, 'pages', self.manifest_dir)
+        # 生成程式、模板、主題或預壓縮設定改變時所有頁面都需要重新 render
+        self._render_key = settings_key(source_hash(__file__, *self._template_files()), theme, self.precompress)
+        self._live: set = set()
+        self._pending: List[PendingPage] = []
+        self._by_path = {c.path: c for c in self.challenges}
+        self._cards: Dict[str, str] = {}
+        self._assets = self._build_assets()
+        self._layout = self._render_layout()
+        self._search: Optional[SearchIndex] = None
+        self.stats = {"rendered": 0, "written": 0, "skipped": 0, "copied": 0}
     
-    .search-box input {{
-        width: 100%;
-    }}
+    @staticmethod
+    def _untouched(path: Path, recorded: Optional[list]) -> bool:
+        """輸出檔仍是上次寫入的版本（沒有被刪除或手動修改）"""
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        return recorded == [st.st_mtime_ns, st.st_size]
     
-    .challenge-grid {{
-        grid-template-columns: 1fr;
-    }}
-}}
-"""
-        
-        css_path = output_path / 'style.css'
-        with open(css_path, 'w', encoding='utf-8') as f:
-            f.write(css)
+    def _config_deps(self) -> Dict[str, Any]:
+        """頁首 / 頁尾用到的 config 欄位"""
+        return {
+            'project.name': self.site_title,
+            'project.organization': self.organization,
+            'project.year': self.year,
+            'project.flag_prefix': self.flag_prefix,
+        }
     
-    def _generate_html_header(self, title: str, extra_head: str = "") -> str:
-        """生成 HTML 頭部"""
-        return f"""<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{html.escape(title)} | {html.escape(self.site_title)}</title>
-    <link rel="stylesheet" href="style.css">
-    {extra_head}
-</head>
-<body>
-"""
+    @staticmethod
+    def _challenge_deps(challenges: List[Challenge]) -> Dict[str, Any]:
+        return {c.path: dataclasses.asdict(c) for c in challenges}
     
-    def _generate_nav(self, active: str = "") -> str:
-        """生成導航列"""
-        categories = sorted(self.categories.keys())
-        
-        nav_links = f'<a href="index.html" class="{"active" if active == "home" else ""}">🏠 首頁</a>'
-        
-        for category in categories:
-            is_active = "active" if active == category else ""
-            emoji = self._get_category_emoji(category)
-            nav_links += f'<a href="{category}.html" class="{is_active}">{emoji} {category.title()}</a>'
-        
-        nav_links += f'<a href="search.html" class="{"active" if active == "search" else ""}">🔍 搜尋</a>'
-        
-        return f"""
-<nav class="nav">
-    <div class="nav-container">
-        <div class="nav-links">
-            {nav_links}
-        </div>
-        <div class="search-box">
-            <input type="text" id="quick-search" placeholder="快速搜尋..." onkeyup="quickSearch(this.value)">
-        </div>
-    </div>
-</nav>
-"""
+    def _emit(
+        self,
+        rel: str,
+        task: Tuple[str, ...],
+        config: bool = True,
+        challenges: Optional[List[Challenge]] = None,
+        categories: bool = False,
+        stamp: Optional[str] = None,
+        **other: Any,
+    ):
+        """登記輸出 rel；task 為 render_task() 的參數。
+
+        相依資料（config 欄位、題目、分類清單、其他參數）與上次相同且輸出檔仍在時
+        直接略過；否則留待 _flush_pages() 一起 render。
+        """
+        self._live.add(rel)
+        deps = {
+            'config': self._config_deps() if config else {},
+            'challenges': self._challenge_deps(challenges or []),
+            'categories': sorted(self.categories) if categories else [],
+            'other': other,
+        }
+        settings = settings_key(self._render_key, deps)
+        if not self.force and self._manifest.is_fresh(rel, {}, settings):
+            self.stats['skipped'] += 1
+            return
+        sources = {
+            'config': sorted(deps['config']),
+            'challenges': sorted(deps['challenges']),
+            'categories': bool(categories),
+        }
+        self._pending.append(PendingPage(rel, task, settings, sources, stamp))
+
+    def _flush_pages(self):
+        """render 所有登記的頁面，再依序寫入（內容與上次相同時不寫入）"""
+        pending, self._pending = self._pending, []
+        contents = self._render_all([page.task for page in pending])
+        for page, content in zip(pending, contents):
+            self._write_page(page, content)
+
+    def _render_all(self, tasks: List[Tuple[str, ...]]) -> List[str]:
+        """依序回傳每個 task 的 render 結果；頁面夠多且 jobs > 1 時分散到 process pool"""
+        if self.jobs <= 1 or len(tasks) < _PARALLEL_MIN_PAGES:
+            return [self.render_task(task) for task in tasks]
+
+        batches = [tasks[i:i + _BATCH_SIZE] for i in range(0, len(tasks), _BATCH_SIZE)]
+        self._warm_templates()
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(batches)),
+            initializer=_init_render_worker,
+            initargs=(self._worker_template(),),
+        ) as executor:
+            # map 依提交順序回傳，結果與單程序 render 相同
+            return [content for batch in executor.map(_render_page_batch, batches) for content in batch]
+
+    def _worker_template(self) -> 'PagesGenerator':
+        """複製一份不含快取、manifest 與 Jinja2 環境的生成器，傳給 worker"""
+        template = copy.copy(self)
+        template.cache = None
+        template._env = None
+        template._manifest = None
+        template._pending = []
+        template.jobs = 1
+        return template
+
+    def render_task(self, task: Tuple[str, ...]) -> str:
+        """render 單一頁面：('asset', 檔名)、('index',)、('category', 分類)、('challenge', 路徑)、
+        ('search',)、('search_shard', 分片)、('json',)"""
+        kind, *args = task
+        return getattr(self, f'_render_{kind}')(*args)
+
+    def _write_page(self, page: PendingPage, content: str):
+        self.stats['rendered'] += 1
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        previous = self._manifest.entries.get(page.rel) or {}
+        recorded = previous.get('outputs') or {}
+        path = self._output_path / page.rel
+        data = None
+        if previous.get('content') != digest or not self._untouched(path, recorded.get(page.rel)):
+            stamp = page.stamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            data = content.replace(UPDATED_AT_PLACEHOLDER, stamp).encode('utf-8')
+            if write_if_changed(path, data):
+                self.stats['written'] += 1
+        outputs = [page.rel]
+        if self.precompress:
+            outputs += self._write_precompressed(page.rel, data, recorded)
+        self._manifest.record(page.rel, {}, page.settings, outputs, content=digest, sources=page.sources)
     
-    def _get_category_emoji(self, category: str) -> str:
-        """取得分類的 emoji"""
-        emojis = {
-            'web': '🌐',
-            'pwn': '💥',
-            'reverse': '🔄',
-            'crypto': '🔐',
-            'forensic': '🔍',
-            'forensics': '🔍',
-            'misc': '🎲',
-            'general': '📝'
+    def _write_precompressed(self, rel: str, data: Optional[bytes], recorded: Dict[str, list]) -> List[str]:
+        """寫入 rel 的 .gz / .br；頁面沒有重寫（data 為 None）且上次的預壓縮檔都還在時沿用"""
+        variants = [name for name in recorded if name != rel]
+        if data is None:
+            if variants and all(self._untouched(self._output_path / name, recorded[name]) for name in variants):
+                return variants
+            data = (self._output_path / rel).read_bytes()
+        outputs = []
+        for suffix, blob in precompress(rel, data).items():
+            write_if_changed(self._output_path / f'{rel}{suffix}', blob)
+            outputs.append(f'{rel}{suffix}')
+        return outputs
+
+    # ----- 模板 -----
+
+    def _environment(self) -> Environment:
+        """Jinja2 環境；編譯後的模板快取在 .ctf-cache/jinja，worker 與下次執行直接載入"""
+        if self._env is None:
+            self.bytecode_dir.mkdir(parents=True, exist_ok=True)
+            env = Environment(
+                loader=FileSystemLoader([str(d) for d in self.template_dirs]),
+                autoescape=select_autoescape(enabled_extensions=('html.j2',), default_for_string=False),
+                bytecode_cache=FileSystemBytecodeCache(str(self.bytecode_dir)),
+                trim_blocks=True,
+                lstrip_blocks=True,
+                keep_trailing_newline=True,
+            )
+            env.filters['category_emoji'] = category_emoji
+            env.policies['json.dumps_kwargs'] = {'ensure_ascii': False, 'sort_keys': False}
+            self._env = env
+        return self._env
+
+    def _template_files(self) -> List[Path]:
+        """所有模板目錄中的模板檔（模板改變時所有頁面都需要重新 render）"""
+        return [f for d in self.template_dirs for f in sorted(Path(d).glob('*.j2'))]
+
+    def _render_layout(self) -> Dict[str, Any]:
+        """各頁共用的 nav 與 footer；每次執行只 render 一次"""
+        env = self._environment()
+        site = {
+            'title': self.site_title,
+            'organization': self.organization,
+            'year': self.year,
+            'flag_prefix': self.flag_prefix,
+        }
+        categories = sorted(self.categories)
+        assets = {name: hashed for name, (hashed, _) in self._assets.items()}
+        nav = env.get_template('nav.html.j2')
+        footer = env.get_template('footer.html.j2')
+        return {
+            'site': site,
+            'assets': assets,
+            'nav': {
+                active: Markup(nav.render(active=active, categories=categories))
+                for active in ['home', 'search', *categories]
+            },
+            'footer': Markup(footer.render(site=site, updated_at=Markup(UPDATED_AT_PLACEHOLDER))),
         }
-        return emojis.get(category.lower(), '📁')
     
-    def _generate_footer(self) -> str:
-        """生成頁腳"""
-        return f"""
-<footer class="footer">
-    <p>🚩 {html.escape(self.site_title)} - {html.escape(self.organization)} {self.year}</p>
-    <p>Flag 格式: <code>{html.escape(self.flag_prefix)}{{...}}</code></p>
-    <p>📅 最後更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-</footer>
-
-<script>
-function quickSearch(query) {{
-    if (query.length > 2) {{
-        window.location.href = 'search.html?q=' + encodeURIComponent(query);
-    }}
-}}
-
-document.getElementById('quick-search').addEventListener('keypress', function(e) {{
-    if (e.key === 'Enter') {{
-        quickSearch(this.value);
-    }}
-}});
-</script>
-</body>
-</html>
-"""
+    def _render_template(self, name: str, **context: Any) -> str:
+        template = self._environment().get_template(name)
+        return template.render(**self._layout, cards=self._generate_challenge_cards, **context)
+
+    def _warm_templates(self):
+        """在啟動 process pool 前編譯所有頁面模板，worker 直接讀取 bytecode 快取"""
+        env = self._environment()
+        for name in PAGE_TEMPLATES:
+            env.get_template(name)
+
+    # ----- 頁面 -----
+
+    def _build_assets(self) -> Dict[str, Tuple[str, str]]:
+        """render 並壓縮 ASSET_TEMPLATES，回傳 {原始檔名: (雜湊檔名, 內容)}"""
+        env = self._environment()
+        assets = {}
+        for name, template in ASSET_TEMPLATES.items():
+            text = env.get_template(template).render(dark=self._theme.lower() == 'dark')
+            text = minify(text, Path(name).suffix)
+            assets[name] = (hashed_name(name, text.encode('utf-8')), text)
+        return assets
+
+    def _generate_assets(self, output_path: Path):
+        """生成 CSS 樣式與搜尋頁 JS（檔名含內容雜湊，內容改變時舊檔案會被移除）"""
+        for name, (hashed, _) in self._assets.items():
+            self._emit(hashed, ('asset', name), config=False)
+
+    def _render_asset(self, name: str) -> str:
+        return self._assets[name][1]
     
     def _generate_index(self, output_path: Path):
         """生成首頁"""
-        # 統計資料
-        total_challenges = len(self.challenges)
-        total_points = sum(c.points for c in self.challenges)
-        categories_count = len(self.categories)
-        
-        difficulty_counts = defaultdict(int)
-        for c in self.challenges:
-            difficulty_counts[c.difficulty] += 1
-        
-        # 統計卡片
-        stats_html = f"""
-<div class="stats">
-    <div class="stat-card">
-        <div class="number">{total_challenges}</div>
-        <div class="label">總題目數</div>
-    </div>
-    <div class="stat-card">
-        <div class="number">{total_points}</div>
-        <div class="label">總分數</div>
-    </div>
-    <div class="stat-card">
-        <div class="number">{categories_count}</div>
-        <div class="label">分類數</div>
-    </div>
-</div>
-"""
-        
-        # 最新題目
-        recent_challenges = sorted(self.challenges, key=lambda c: c.created_at or '', reverse=True)[:6]
-        recent_html = self._generate_challenge_cards(recent_challenges)
-        
-        # 按分類顯示
-        categories_html = ""
-        for category in sorted(self.categories.keys()):
-            challenges = self.categories[category]
-            emoji = self._get_category_emoji(category)
-            categories_html += f"""
-<div class="category-section">
-    <h2>{emoji} {category.title()} ({len(challenges)} 題)</h2>
-    <div class="challenge-grid">
-        {self._generate_challenge_cards(challenges[:4])}
-    </div>
-    <p style="margin-top: 1rem;"><a href="{category}.html" class="btn">查看全部 →</a></p>
-</div>
-"""
-        
-        content = f"""
-{self._generate_html_header('首頁')}
-<header class="header">
-    <h1>🚩 {html.escape(self.site_title)}</h1>
-    <p>{html.escape(self.organization)} {self.year} - Challenge Archive</p>
-</header>
-
-{self._generate_nav('home')}
-
-<div class="container">
-    {stats_html}
+        self._emit('index.html', ('index',), challenges=self.challenges, categories=True)
     
-    <h2 style="margin-bottom: 1.5rem;">📌 最新題目</h2>
-    <div class="challenge-grid" style="margin-bottom: 3rem;">
-        {recent_html}
-    </div>
+    def _render_index(self) -> str:
+        recent = sorted(self.challenges, key=lambda c: c.created_at or '', reverse=True)[:6]
+        return self._render_template(
+            'index.html.j2',
+            title='首頁',
+            active='home',
+            root='',
+            challenges=self.challenges,
+            categories={category: self.categories[category] for category in sorted(self.categories)},
+            recent=recent,
+        )
     
-    {categories_html}
-</div>
-
-{self._generate_footer()}
-"""
-        
-        index_path = output_path / 'index.html'
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-    
-    def _generate_challenge_cards(self, challenges: List[Challenge]) -> str:
+    def _generate_challenge_cards(self, challenges: List[Challenge]) -> Markup:
         """生成題目卡片 HTML"""
-        cards = ""
-        for c in challenges:
-            tags_html = ''.join(f'<span class="tag">{html.escape(tag)}</span>' for tag in c.tags[:3])
-            
-            cards += f"""
-<div class="challenge-card">
-    <div class="card-header">
-        <h3>{html.escape(c.title)}</h3>
-        <div class="category">{self._get_category_emoji(c.category)} {c.category.title()}</div>
-    </div>
-    <div class="card-body">
-        <div class="meta">
-            {c.difficulty_badge}
-            <span class="points">{c.points} pts</span>
-        </div>
-        <p class="description">{html.escape(c.description[:150])}{'...' if len(c.description) > 150 else ''}</p>
-        <div class="tags">{tags_html}</div>
-        <p style="margin-top: 1rem;"><a href="{c.path}/index.html" class="btn">查看詳情</a></p>
-    </div>
-</div>
-"""
-        return cards
+        return Markup(''.join(self._challenge_card(c) for c in challenges))
+
+    def _challenge_card(self, c: Challenge) -> str:
+        """單一題目卡片；首頁、分類頁與搜尋頁共用，每題只 render 一次"""
+        card = self._cards.get(c.path)
+        if card is None:
+            card = self._cards[c.path] = self._environment().get_template('card.html.j2').render(c=c)
+        return card
     
     def _generate_category_pages(self, output_path: Path):
         """生成分類頁面"""
         for category, challenges in self.categories.items():
-            emoji = self._get_category_emoji(category)
-            cards_html = self._generate_challenge_cards(challenges)
-            
-            content = f"""
-{self._generate_html_header(f'{category.title()} 題目')}
-<header class="header">
-    <h1>{emoji} {category.title()}</h1>
-    <p>{len(challenges)} 個題目 | 總分: {sum(c.points for c in challenges)} pts</p>
-</header>
-
-{self._generate_nav(category)}
-
-<div class="container">
-    <div class="challenge-grid">
-        {cards_html}
-    </div>
-</div>
-
-{self._generate_footer()}
-"""
-            
-            page_path = output_path / f'{category}.html'
-            with open(page_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            self._emit(
+                f'{category}.html',
+                ('category', category),
+                challenges=challenges,
+                categories=True,
+                category=category,
+            )
+
+    def _render_category(self, category: str) -> str:
+        return self._render_template(
+            'category.html.j2',
+            title=f'{category.title()} 題目',
+            active=category,
+            root='',
+            category=category,
+            challenges=self.categories[category],
+        )
     
-    def _generate_challenge_pages(self, output_path: Path, input_dir: str):
+    def _generate_challenge_pages(self, output_path: Path):
         """生成題目詳情頁面"""
         for challenge in self.challenges:
-            challenge_dir = output_path / challenge.path
-            challenge_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 讀取 README
-            readme_content = ""
-            readme_path = Path(input_dir) / challenge.path / 'README.md'
-            if readme_path.exists():
-                try:
-                    with open(readme_path, 'r', encoding='utf-8') as f:
-                        readme_content = f.read()
-                except Exception:
-                    pass
-            
-            # 生成提示 HTML
-            hints_html = ""
-            if challenge.hints:
-                hints_html = '<div class="hints"><h3>💡 提示</h3>'
-                for hint in challenge.hints:
-                    hints_html += f"""
-<div class="hint">
-    <div class="hint-header">
-        <span>Level {hint.get('level', '?')}</span>
-        <span class="cost">💰 -{hint.get('cost', 0)} pts</span>
-    </div>
-    <p>{html.escape(str(hint.get('content', '')))}</p>
-</div>
-"""
-                hints_html += '</div>'
-            
-            # 生成檔案列表
-            files_html = ""
-            if challenge.files:
-                files_html = '<div class="files"><h3>📎 附件</h3>'
-                for file in challenge.files:
-                    files_html += f"""
-<div class="file-item">
-    <span>📄</span>
-    <a href="files/{html.escape(file)}" download>{html.escape(file)}</a>
-</div>
-"""
-                files_html += '</div>'
-            
-            content = f"""
-{self._generate_html_header(challenge.title, '<link rel="stylesheet" href="../../style.css">')}
-<header class="header">
-    <h1>{html.escape(challenge.title)}</h1>
-    <p>{self._get_category_emoji(challenge.category)} {challenge.category.title()} | {challenge.difficulty_badge}</p>
-</header>
-
-<div class="container">
-    <a href="../../{challenge.category}.html" style="color: var(--accent-color); text-decoration: none; display: inline-block; margin-bottom: 1rem;">← 返回 {challenge.category.title()}</a>
+            self._emit(
+                f'{challenge.path}/index.html',
+                ('challenge', challenge.path),
+                challenges=[challenge],
+            )
     
-    <div class="challenge-detail">
-        <div class="meta-info">
-            <div><strong>分數</strong><br><span class="points">{challenge.points} pts</span></div>
-            <div><strong>難度</strong><br>{challenge.difficulty_badge}</div>
-            <div><strong>作者</strong><br>{html.escape(challenge.author)}</div>
-            <div><strong>分類</strong><br>{html.escape(challenge.category)}</div>
-        </div>
-        
-        <h3>📝 題目描述</h3>
-        <div class="description">{html.escape(challenge.description)}</div>
-        
-        {files_html}
-        
-        {hints_html}
-        
-        <div class="tags" style="margin-top: 2rem;">
-            {''.join(f'<span class="tag">{html.escape(tag)}</span>' for tag in challenge.tags)}
-        </div>
-    </div>
-</div>
-
-{self._generate_footer()}
-"""
-            
-            page_path = challenge_dir / 'index.html'
-            with open(page_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    def _render_challenge(self, path: str) -> str:
+        challenge = self._by_path[path]
+        return self._render_template(
+            'challenge.html.j2',
+            title=challenge.title,
+            active=None,
+            root='../' * (path.count('/') + 1),
+            c=challenge,
+        )
     
     def _generate_search_page(self, output_path: Path):
-        """生成搜尋頁面"""
-        content = f"""
-{self._generate_html_header('搜尋')}
-<header class="header">
-    <h1>🔍 搜尋題目</h1>
-    <p>搜尋所有 {len(self.challenges)} 個題目</p>
-</header>
-
-{self._generate_nav('search')}
-
-<div class="container">
-    <div style="margin-bottom: 2rem;">
-        <input type="text" id="search-input" placeholder="輸入關鍵字搜尋..." 
-               style="width: 100%; padding: 1rem; font-size: 1.1rem; border: 2px solid var(--border-color); border-radius: 8px; background: var(--card-bg); color: var(--text-color);">
-    </div>
+        """生成搜尋頁面與搜尋索引分片（search/<分片>.json）"""
+        self._emit('search.html', ('search',), challenges=self.challenges, categories=True)
+        # 分片以內容雜湊作為相依資料：題目變動時只有內容改變的分片會重新寫入
+        for key, digest in self._search_index().manifest().items():
+            self._emit(f'search/{key}.json', ('search_shard', key), config=False, digest=digest)
     
-    <div id="search-results" class="challenge-grid">
-        {self._generate_challenge_cards(self.challenges)}
-    </div>
-</div>
-
-<script>
-const challenges = {json.dumps([{
-    'name': c.name,
-    'title': c.title,
-    'category': c.category,
-    'difficulty': c.difficulty,
-    'points': c.points,
-    'description': c.description,
-    'author': c.author,
-    'tags': c.tags,
-    'path': c.path
-} for c in self.challenges], ensure_ascii=False)};
-
-const searchInput = document.getElementById('search-input');
-const resultsContainer = document.getElementById('search-results');
-
-// 從 URL 參數讀取搜尋詞
-const urlParams = new URLSearchParams(window.location.search);
-const initialQuery = urlParams.get('q');
-if (initialQuery) {{
-    searchInput.value = initialQuery;
-    performSearch(initialQuery);
-}}
-
-searchInput.addEventListener('input', function() {{
-    performSearch(this.value);
-}});
-
-function performSearch(query) {{
-    query = query.toLowerCase().trim();
+    def _search_index(self) -> SearchIndex:
+        """搜尋索引（每次執行建立一次；題目編號即搜尋頁卡片的順序）"""
+        if self._search is None:
+            self._search = SearchIndex.build(
+                {
+                    'title': c.title,
+                    'tags': c.tags,
+                    'author': c.author,
+                    'category': c.category,
+                    'description': c.description,
+                }
+                for c in self.challenges
+            )
+        return self._search
     
-    if (query.length < 2) {{
-        // 顯示所有題目
-        resultsContainer.innerHTML = generateCards(challenges);
-        return;
-    }}
+    def _render_search(self) -> str:
+        return self._render_template(
+            'search.html.j2',
+            title='搜尋',
+            active='search',
+            root='',
+            challenges=self.challenges,
+            search_shards=self._search_index().manifest(),
+            shard_buckets=SHARD_BUCKETS,
+        )
     
-    const results = challenges.filter(c => {{
-        return c.title.toLowerCase().includes(query) ||
-               c.description.toLowerCase().includes(query) ||
-               c.category.toLowerCase().includes(query) ||
-               c.author.toLowerCase().includes(query) ||
-               c.tags.some(t => t.toLowerCase().includes(query));
-    }});
-    
-    if (results.length > 0) {{
-        resultsContainer.innerHTML = generateCards(results);
-    }} else {{
-        resultsContainer.innerHTML = '<p style="text-align: center; color: var(--text-muted);">未找到符合的題目</p>';
-    }}
-}}
-
-function generateCards(items) {{
-    return items.map(c => `
-        <div class="challenge-card">
-            <div class="card-header">
-                <h3>${{escapeHtml(c.title)}}</h3>
-                <div class="category">${{c.category.charAt(0).toUpperCase() + c.category.slice(1)}}</div>
-            </div>
-            <div class="card-body">
-                <div class="meta">
-                    <span class="difficulty-badge">${{c.difficulty}}</span>
-                    <span class="points">${{c.points}} pts</span>
-                </div>
-                <p class="description">${{escapeHtml(c.description.substring(0, 150))}}...</p>
-                <p style="margin-top: 1rem;"><a href="${{c.path}}/index.html" class="btn">查看詳情</a></p>
-            </div>
-        </div>
-    `).join('');
-}}
-
-function escapeHtml(text) {{
-    const div = document.createElement('div');
-    div.textContent = text;
-    return div.innerHTML;
-}}
-</script>
-
-{self._generate_footer()}
-"""
-        
-        search_path = output_path / 'search.html'
-        with open(search_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+    def _render_search_shard(self, key: str) -> str:
+        return self._search_index().shard_json(key)
     
     def _generate_json_data(self, output_path: Path):
         """生成 JSON 資料檔案"""
+        self._emit(
+            'challenges.json',
+            ('json',),
+            challenges=self.challenges,
+            categories=True,
+            stamp=datetime.now().isoformat(),
+        )
+
+    def _render_json(self) -> str:
         data = {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': UPDATED_AT_PLACEHOLDER,
             'site': {
                 'title': self.site_title,
                 'organization': self.organization,
@@ -1009,24 +700,40 @@ function escapeHtml(text) {{
             ]
         }
         
-        json_path = output_path / 'challenges.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        return json.dumps(data, indent=2, ensure_ascii=False)
     
     def _copy_attachments(self, input_dir: str, output_path: Path):
-        """複製附件檔案"""
-        import shutil
-        
+        """複製附件檔案（大小、mtime 或 sha256 有變動時才複製）"""
         for challenge in self.challenges:
             src_files_dir = Path(input_dir) / challenge.path / 'files'
-            dst_files_dir = output_path / challenge.path / 'files'
+            if not src_files_dir.is_dir():
+                continue
             
-            if src_files_dir.exists():
-                dst_files_dir.mkdir(parents=True, exist_ok=True)
-                
-                for file in src_files_dir.iterdir():
-                    if file.is_file():
-                        shutil.copy2(file, dst_files_dir / file.name)
+            key = f'{challenge.path}/files/'
+            self._live.add(key)
+            names = sorted(f.name for f in src_files_dir.iterdir() if f.is_file())
+            inputs = self._manifest.hash_inputs(key, src_files_dir, names)
+            entry = self._manifest.entries.get(key) or {}
+            previous = entry.get('inputs') or {}
+            recorded = entry.get('outputs') or {}
+
+            outputs = [key]
+            for name in names:
+                dst = output_path / challenge.path / 'files' / name
+                same = name in previous and previous[name][2] == inputs[name][2]
+                if same and self._untouched(dst, recorded.get(f'{key}{name}')):
+                    # sha256 相同且輸出檔未被動過：重新 checkout 後 mtime 改變也不必複製
+                    copied = False
+                elif name in previous and not same:
+                    # 內容變了但大小與 mtime 剛好相同時，copy_if_changed 看不出差異
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(src_files_dir / name, dst)
+                    copied = True
+                else:
+                    copied = copy_if_changed(src_files_dir / name, dst)
+                self.stats['copied'] += copied
+                outputs.append(f'{key}{name}')
+            self._manifest.record(key, inputs, self._render_key, outputs)
 
 
 def main():
@@ -1043,11 +750,29 @@ def main():
                        help='配置檔案路徑 (預設: config.yml)')
     parser.add_argument('--theme', '-t', choices=['light', 'dark'],
                        default='dark', help='主題 (預設: dark)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不使用 .ctf-cache 的 metadata 快取')
+    parser.add_argument('--templates', default=None,
+                       help='自訂模板目錄，缺少的模板沿用 templates/pages (預設: 不使用)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='render 頁面的平行 worker 數 (預設: CPU 核心數)')
+    parser.add_argument('--no-precompress', action='store_true',
+                       help='不產生 .gz / .br 預壓縮檔')
+    parser.add_argument('--force', action='store_true',
+                       help='忽略 build manifest，重新 render 所有頁面（內容相同的檔案仍不會重寫）')
     
     args = parser.parse_args()
     
-    generator = PagesGenerator(args.config)
-    generator.generate(args.input, args.output, args.theme)
+    cache = None if args.no_cache else MetadataCache()
+    generator = PagesGenerator(args.config, cache=cache, force=args.force, jobs=args.jobs,
+                               template_dir=args.templates, precompress=not args.no_precompress)
+    try:
+        generator.generate(args.input, args.output, args.theme)
+    finally:
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        print(f"   {cache.summary()}")
 
 
 if __name__ == "__main__":
@@ -30,6 +30,10 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+from challenge_index import ChallengeRecord, get_index
+from metadata_cache import MetadataCache
+from public_projection import PublicProjection
+
 
 DEFAULT_STATUSES = ["planning", "developing", "testing", "completed", "deployed"]
 DEFAULT_DIFFICULTIES = ["baby", "easy", "middle", "hard", "impossible"]
@@ -75,46 +79,6 @@ def file_mtime_iso(path: Path) -> str:
     return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-def sanitize_public_yml(data: Dict[str, Any], extra_sensitive_keys: Optional[List[str]] = None) -> Dict[str, Any]:
-    # Defense-in-depth: even though we only read public.yml, strip any sensitive keys.
-    sensitive_keys = {
-        "flag",
-        "flags",
-        "real_flag",
-        "actual_flag",
-        "flag_description",
-        "flag_type",
-        "dynamic_flag",
-        "solution_steps",
-        "solution",
-        "solutions",
-        "internal_notes",
-        "internal_note",
-        "private_notes",
-        "test_credentials",
-        "credentials",
-        "admin_password",
-        "deploy_secrets",
-        "secrets",
-        "secret_key",
-        "verified_solutions",
-        "exploits",
-        "token",
-        "password",
-        "api_key",
-    }
-    if extra_sensitive_keys:
-        sensitive_keys.update(extra_sensitive_keys)
-
-    sanitized: Dict[str, Any] = {}
-    for key, value in data.items():
-        if key in sensitive_keys:
-            continue
-        sanitized[key] = value
-
-    return sanitized
-
-
 def list_attachments(files_dir: Path) -> List[Dict[str, Any]]:
     if not files_dir.exists() or not files_dir.is_dir():
         return []
@@ -179,41 +143,33 @@ def normalize_username(s: str) -> str:
     return s.strip().lstrip("@").strip()
 
 
-def collect_challenges(challenges_dir: Path) -> List[Tuple[Path, Path]]:
-    pairs: List[Tuple[Path, Path]] = []
+def collect_challenges(challenges_dir: Path, cache: Optional[MetadataCache] = None) -> List[ChallengeRecord]:
     if not challenges_dir.exists():
-        return pairs
-
-    for category_dir in sorted(challenges_dir.iterdir()):
-        if not category_dir.is_dir():
-            continue
-        for challenge_dir in sorted(category_dir.iterdir()):
-            if not challenge_dir.is_dir():
-                continue
-            public_yml = challenge_dir / "public.yml"
-            readme = challenge_dir / "README.md"
-            if public_yml.exists() and readme.exists():
-                pairs.append((public_yml, readme))
-    return pairs
+        return []
+    return [r for r in get_index(challenges_dir, cache).scan() if r.readme.exists()]
 
 
 def build_entries(
     config: Dict[str, Any],
     challenges_dir: Path,
     output_data_dir: Path,
+    cache: Optional[MetadataCache] = None,
 ) -> Tuple[List[ChallengeEntry], Dict[str, Any]]:
-    extra_sensitive_keys = config.get("security", {}).get("sensitive_yaml_fields", [])
+    # Defense-in-depth: even though we only read public.yml, strip any sensitive keys.
+    projection = PublicProjection.from_config(config)
 
     entries: List[ChallengeEntry] = []
 
-    pairs = collect_challenges(challenges_dir)
-    for public_yml_path, readme_path in pairs:
-        challenge_dir = public_yml_path.parent
-        category = challenge_dir.parent.name
-        name = challenge_dir.name
+    for record in collect_challenges(challenges_dir, cache):
+        if not record.ok:
+            raise ValueError(record.error)
+        challenge_dir = record.path
+        category = record.category
+        name = record.name
+        readme_path = record.readme
 
-        public_raw = load_yaml(public_yml_path)
-        public_data = sanitize_public_yml(public_raw, extra_sensitive_keys=extra_sensitive_keys)
+        public_raw = record.data
+        public_data = projection.sanitize(public_raw)
 
         title = str(public_data.get("title") or name)
         difficulty = str(public_data.get("difficulty") or "")
@@ -358,6 +314,7 @@ def main() -> int:
     parser.add_argument("--challenges", default="challenges")
     parser.add_argument("--output", default="viewer/data")
     parser.add_argument("--clean", action="store_true", help="Remove output directory before generating")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the .ctf-cache metadata cache")
 
     args = parser.parse_args()
 
@@ -372,12 +329,19 @@ def main() -> int:
 
     ensure_dir(output_data_dir)
 
-    entries, stats = build_entries(config, challenges_dir, output_data_dir)
+    cache = None if args.no_cache else MetadataCache()
+    try:
+        entries, stats = build_entries(config, challenges_dir, output_data_dir, cache)
+    finally:
+        if cache is not None:
+            cache.close()
     write_index(output_data_dir, entries)
     write_progress(output_data_dir, stats)
 
     print(f"✅ Generated viewer data: {output_data_dir}")
     print(f"   Challenges: {len(entries)}")
+    if cache is not None:
+        print(f"   {cache.summary()}")
     return 0
 
 
@@ -0,0 +1,30 @@
+"""檔案與原始碼的 sha256。
+
+Shared by build_manifest.py, file_manifest.py, findings_cache.py, public_build.py,
+sync-to-public.py, generate-pages.py and scan-secrets.py.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+# 計算 sha256 時每次讀取的大小（大型附件不會整個讀進記憶體）
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """檔案內容的 sha256（分段讀取）。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(*paths) -> str:
+    """多個原始碼檔案合併的 sha256；程式邏輯改變時依賴它的快取會自動失效。"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
@@ -0,0 +1,184 @@
+"""Web 介面的 HTTP 快取與壓縮。
+
+Shared by web-interface/app.py.
+
+- versioned()：以「資料版本」（題目快照、config.yml）產生 strong ETag 的 view
+  decorator，If-None-Match 相符時在 render 之前就回傳 304；
+- HTTPCache(app)：after_request 時替其餘 GET 回應補上內容雜湊 ETag 並處理
+  304，再依 Accept-Encoding 以 br（有安裝 brotli 時）或 gzip 壓縮；壓縮後的
+  ETag 加上 -br / -gz 後綴，避免不同編碼共用同一個 strong ETag；壓縮設定
+  （門檻、編碼）與 static_assets.py 共用 compression.py；
+- send_static()：靜態檔案。網址帶版本（Flask-Assets 的 ?<hash>）時以
+  immutable 長期快取，否則每次重新驗證；可壓縮的檔案會在旁邊產生 .gz / .br
+  預壓縮檔（來源較新時重新產生），之後直接送出不再即時壓縮。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mimetypes
+import os
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from flask import Response, make_response, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from compression import MIN_COMPRESS_SIZE, PRECOMPRESSED_SUFFIXES, available_encodings, compress
+
+
+# 長期快取（一年）；只用在網址帶內容版本的靜態檔案
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+# Content-Encoding -> ETag 後綴
+_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """依 Accept-Encoding（werkzeug Accept 物件）選擇壓縮方式；同分時優先 br。"""
+    return accept_encodings.best_match(available_encodings())
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and (mimetype in COMPRESSIBLE_MIMETYPES or mimetype.startswith("text/"))
+
+
+def etag_for(*parts: Any) -> str:
+    """由任意可 JSON 序列化的資料產生 ETag。"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _client_has(etag: str) -> bool:
+    """If-None-Match 是否包含 etag（含壓縮後綴的變體）。"""
+    tags = request.if_none_match
+    if tags.star_tag:
+        return True
+    candidates = {etag} | {etag + suffix for suffix in _ETAG_SUFFIXES.values()}
+    return any(tags.contains_weak(tag) for tag in candidates)
+
+
+def _not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def versioned(version: Callable[[], Any]) -> Callable:
+    """view decorator：以 version() 與完整網址產生 strong ETag。
+
+    version() 應回傳能代表頁面所有資料來源的值（例如題目快照版本、config.yml
+    的 mtime）；相符時直接回傳 304，不會執行 view。
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_for(version(), request.full_path)
+            if _client_has(etag):
+                return _not_modified(etag)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers.setdefault("Cache-Control", "no-cache")
+            return response
+        return wrapper
+    return decorator
+
+
+def precompressed(path: Path, encoding: str) -> Path:
+    """回傳 path 的預壓縮檔；不存在或比來源舊時先產生。"""
+    variant = path.with_name(path.name + PRECOMPRESSED_SUFFIXES[encoding])
+    src_mtime = path.stat().st_mtime_ns
+    try:
+        if variant.stat().st_mtime_ns >= src_mtime:
+            return variant
+    except OSError:
+        pass
+    tmp = variant.with_name(f".{variant.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(compress(path.read_bytes(), encoding))
+    os.utime(tmp, ns=(src_mtime, src_mtime))
+    os.replace(tmp, variant)
+    return variant
+
+
+def send_static(directory: Path, filename: str) -> Response:
+    """送出靜態檔案；帶版本的網址使用 immutable 快取，可壓縮的檔案送出預壓縮版本。"""
+    joined = safe_join(str(directory), filename)
+    if joined is None or not os.path.isfile(joined):
+        raise NotFound()
+    path = Path(joined)
+    mimetype = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+    encoding = None
+    if is_compressible(mimetype) and path.stat().st_size >= MIN_COMPRESS_SIZE:
+        encoding = choose_encoding(request.accept_encodings)
+    body = precompressed(path, encoding) if encoding else path
+
+    response = send_file(body, mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if is_compressible(mimetype):
+        response.vary.add("Accept-Encoding")
+    if request.query_string:
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+class HTTPCache:
+    """替動態回應補上 ETag / 304 並壓縮（SSE 等串流回應不處理）。"""
+
+    def __init__(self, app=None, min_size: int = MIN_COMPRESS_SIZE):
+        self.min_size = min_size
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.after_request(self.process_response)
+
+    def process_response(self, response: Response) -> Response:
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        if request.method == "GET" and "ETag" not in response.headers:
+            etag = hashlib.sha256(response.get_data()).hexdigest()[:32]
+            if _client_has(etag):
+                return _not_modified(etag)
+            response.set_etag(etag)
+            response.headers.setdefault("Cache-Control", "no-cache")
+
+        if not is_compressible(response.mimetype):
+            return response
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None or len(data) < self.min_size:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + _ETAG_SUFFIXES[encoding], weak=weak)
+        return response
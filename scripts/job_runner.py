@@ -0,0 +1,417 @@
+"""Web 介面的背景工作（掃描、建置、同步）執行器。
+
+Shared by web-interface/app.py.
+
+- 固定大小的 thread pool，長時間的建置不會佔住 Flask 的 request thread；
+- 每個工作有 job id，可用 /api/jobs/<id> 查詢狀態，或以 SSE 逐行取得輸出；
+- 相同 key 的工作（例如兩個人同時按「建置全部」）在前一個還沒結束前會合併
+  成同一個 job；
+- 指定相同 lock 的工作（例如都會寫入 public-release/）依序執行，不會互相覆蓋。
+
+工作函式的簽章為 fn(emit) -> dict，emit(line) 會即時附加一行輸出；回傳值
+（與 CTFManager.run_* 相同格式）存放在 job.result。
+
+以多個 worker 行程執行（serve.py --workers N）時，傳入 SharedJobStore 讓
+工作狀態與輸出寫入 .ctf-cache/jobs.sqlite：任何 worker 都能查詢 / 串流其他
+worker 的工作，合併與 lock 也改以 sqlite 與檔案鎖跨行程生效。
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from atomic_io import FileLock
+
+# 同時執行的工作數量
+DEFAULT_WORKERS = 2
+
+# 保留多少個已結束的工作供查詢
+DEFAULT_HISTORY = 100
+
+DEFAULT_STORE_PATH = Path(".ctf-cache") / "jobs.sqlite"
+
+# 其他 worker 的工作以輪詢 sqlite 的方式跟隨輸出（秒）
+REMOTE_POLL_INTERVAL = 0.5
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCESS = "success"
+ERROR = "error"
+
+JobFunc = Callable[[Callable[[str], None]], Dict[str, Any]]
+
+
+@dataclass
+class Job:
+    """單一背景工作的狀態與輸出。"""
+    id: str
+    kind: str
+    key: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    output: List[str] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    exception: Optional[str] = None
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+    _store: Optional["SharedJobStore"] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCESS, ERROR)
+
+    def emit(self, line: str) -> None:
+        lines = str(line).rstrip("\n").split("\n")
+        with self._cond:
+            start = len(self.output)
+            self.output.extend(lines)
+            if self._store is not None:
+                self._store.append(self.id, start, lines)
+            self._cond.notify_all()
+
+    def _set(self, status: str, result: Optional[Dict[str, Any]] = None) -> None:
+        with self._cond:
+            self.status = status
+            now = time.time()
+            if status == RUNNING:
+                self.started_at = now
+            else:
+                self.finished_at = now
+                self.result = result
+            if self._store is not None:
+                self._store.save(self)
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待工作結束；逾時回傳 False。"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout)
+
+    def follow(self, start: int = 0, heartbeat: float = 15.0) -> Iterator[Tuple[int, Optional[str]]]:
+        """逐行產生 (行號, 內容)，直到工作結束；等待超過 heartbeat 秒時產生 (行號, None)。"""
+        index = start
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self.output) > index or self.done, heartbeat)
+                lines = self.output[index:]
+                finished = self.done
+            if not lines and not finished:
+                yield index, None
+            for line in lines:
+                yield index, line
+                index += 1
+            if finished and index >= len(self.output):
+                return
+
+    def to_dict(self, include_output: bool = True) -> Dict[str, Any]:
+        with self._cond:
+            data = {
+                "id": self.id,
+                "kind": self.kind,
+                "key": self.key,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "lines": len(self.output),
+                "result": self.result,
+            }
+            if include_output:
+                data["output"] = "\n".join(self.output)
+            return data
+
+
+class JobRunner:
+    """以有上限的 thread pool 執行背景工作，並合併重複的工作。"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, history: int = DEFAULT_HISTORY,
+                 store: Optional["SharedJobStore"] = None):
+        self.history = history
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ctf-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, key: str, fn: JobFunc, lock: Optional[str] = None) -> Tuple[Job, bool]:
+        """提交工作；相同 key 的工作尚未結束時回傳既有的 job。回傳 (job, 是否為新工作)。"""
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None and not active.done:
+                return active, False
+            if self.store is not None:
+                with self.store.lock("submit"):
+                    remote = self.store.active(key)
+                    if remote is not None:
+                        return remote, False
+                    job = self._new_job(kind, key)
+            else:
+                job = self._new_job(kind, key)
+            if self.store is not None:
+                run_lock = self.store.lock(lock) if lock else None
+            else:
+                run_lock = self._locks.setdefault(lock, threading.Lock()) if lock else None
+        self._executor.submit(self._run, job, fn, run_lock)
+        return job, True
+
+    def _new_job(self, kind: str, key: str) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, key=key, _store=self.store)
+        if self.store is not None:
+            self.store.save(job)
+            self.store.trim(self.history)
+        self._active[key] = job
+        self._jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str):
+        """取得工作；其他 worker 的工作回傳 RemoteJob。"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            return self.store.get(job_id)
+        return job
+
+    def list(self) -> List[Job]:
+        """最近的工作（新的在前）。"""
+        if self.store is not None:
+            return self.store.recent(self.history)
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _trim(self) -> None:
+        """只保留 history 個已結束的工作；執行中的工作不會被移除。"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, fn: JobFunc, run_lock) -> None:
+        if run_lock is not None:
+            run_lock.__enter__()
+        try:
+            job._set(RUNNING)
+            try:
+                result = fn(job.emit)
+            except Exception as job_error:
+                job.emit(traceback.format_exc())
+                job.exception = repr(job_error)
+                job._set(ERROR, {"status": "error", "message": str(job_error)})
+                return
+            status = SUCCESS if (result or {}).get("status") == "success" else ERROR
+            job._set(status, result)
+        finally:
+            if run_lock is not None:
+                run_lock.__exit__(None, None, None)
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid or os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedJobStore:
+    """以 sqlite 在多個 worker 行程之間共用工作狀態與輸出。"""
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    exception TEXT,
+                    pid INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+                CREATE TABLE IF NOT EXISTS lines (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    line TEXT NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                );
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def lock(self, name: str) -> FileLock:
+        return FileLock(self.path.parent / "locks" / f"{name}.lock")
+
+    def save(self, job: Job) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.id, job.kind, job.key, job.status, job.created_at, job.started_at,
+                job.finished_at, json.dumps(job.result, ensure_ascii=False) if job.result is not None else None,
+                job.exception, os.getpid(),
+            ),
+        )
+
+    def append(self, job_id: str, start: int, lines: List[str]) -> None:
+        self._conn().executemany(
+            "INSERT OR REPLACE INTO lines VALUES (?, ?, ?)",
+            [(job_id, start + i, line) for i, line in enumerate(lines)],
+        )
+
+    def read_lines(self, job_id: str, start: int = 0) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT line FROM lines WHERE job_id = ? AND idx >= ? ORDER BY idx", (job_id, start)
+        )
+        return [row[0] for row in rows]
+
+    def _row(self, job_id: str) -> Optional[tuple]:
+        return self._conn().execute(
+            "SELECT id, kind, key, status, created_at, started_at, finished_at, result, exception, pid "
+            "FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+
+    def get(self, job_id: str) -> Optional["RemoteJob"]:
+        row = self._row(job_id)
+        return RemoteJob(self, row) if row else None
+
+    def active(self, key: str) -> Optional["RemoteJob"]:
+        """key 相同且尚未結束的工作；執行它的 worker 已不存在時標記為失敗。"""
+        rows = self._conn().execute(
+            "SELECT id, kind, key, status, created_at, started_at, finished_at, result, exception, pid "
+            "FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created_at DESC",
+            (key, QUEUED, RUNNING),
+        ).fetchall()
+        for row in rows:
+            if _pid_alive(row[9]):
+                return RemoteJob(self, row)
+            self._conn().execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ? WHERE id = ?",
+                (ERROR, time.time(), json.dumps({"status": "error", "message": "worker 已結束"}), row[0]),
+            )
+        return None
+
+    def recent(self, limit: int) -> List["RemoteJob"]:
+        rows = self._conn().execute(
+            "SELECT id, kind, key, status, created_at, started_at, finished_at, result, exception, pid "
+            "FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [RemoteJob(self, row) for row in rows]
+
+    def trim(self, history: int) -> None:
+        """只保留最近 history 個已結束的工作。"""
+        conn = self._conn()
+        stale = [row[0] for row in conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+            (SUCCESS, ERROR, history),
+        )]
+        for job_id in stale:
+            conn.execute("DELETE FROM lines WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+
+class RemoteJob:
+    """SharedJobStore 中的工作（可能由其他 worker 執行）；介面與 Job 相同。"""
+
+    def __init__(self, store: SharedJobStore, row: tuple):
+        self.store = store
+        self._load(row)
+
+    def _load(self, row: tuple) -> None:
+        (self.id, self.kind, self.key, self.status, self.created_at, self.started_at,
+         self.finished_at, result, self.exception, _) = row
+        self.result = json.loads(result) if result else None
+
+    def _refresh(self) -> None:
+        row = self.store._row(self.id)
+        if row:
+            self._load(row)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCESS, ERROR)
+
+    @property
+    def output(self) -> List[str]:
+        return self.store.read_lines(self.id)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            self._refresh()
+            if self.done:
+                return True
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(REMOTE_POLL_INTERVAL)
+
+    def follow(self, start: int = 0, heartbeat: float = 15.0) -> Iterator[Tuple[int, Optional[str]]]:
+        index = start
+        idle_since = time.time()
+        while True:
+            self._refresh()
+            finished = self.done
+            lines = self.store.read_lines(self.id, index)
+            for line in lines:
+                yield index, line
+                index += 1
+            if finished and not self.store.read_lines(self.id, index):
+                return
+            if lines:
+                idle_since = time.time()
+            elif time.time() - idle_since >= heartbeat:
+                idle_since = time.time()
+                yield index, None
+            time.sleep(REMOTE_POLL_INTERVAL)
+
+    def to_dict(self, include_output: bool = True) -> Dict[str, Any]:
+        self._refresh()
+        output = self.store.read_lines(self.id)
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "lines": len(output),
+            "result": self.result,
+        }
+        if include_output:
+            data["output"] = "\n".join(output)
+        return data
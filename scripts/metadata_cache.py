@@ -0,0 +1,258 @@
+"""public.yml / private.yml 解析結果的持久化快取（.ctf-cache/meta.sqlite）。
+
+Shared by generate-viewer-data.py, generate-pages.py, update-readme.py,
+validate-all-challenges.py and validate-challenge.py through challenge_index.
+
+查詢順序：
+1. (絕對路徑, mtime_ns, size) 與上次相同 → 直接取出結果，不讀檔。
+2. 否則讀檔計算 sha256；同內容已解析過（例如 CI 重新 checkout 後 mtime
+   改變）→ 取出結果並更新路徑紀錄。
+3. 都沒有才呼叫 yaml.safe_load，並寫回快取。
+
+YAML 語法錯誤也會被快取，之後以 yaml.YAMLError 重新拋出。
+快取檔損毀或無法寫入時會自動停用，退回直接解析，不影響腳本結果。
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+
+DEFAULT_CACHE_PATH = Path(".ctf-cache") / "meta.sqlite"
+
+# 變更編碼格式或正規化方式時遞增，舊快取會被清空
+CACHE_VERSION = 1
+
+# 累積多少筆寫入後 commit 一次，避免每個檔案都 fsync
+_COMMIT_EVERY = 64
+
+_TAGS = ("__date__", "__datetime__", "__bytes__")
+
+_MISSING = object()
+
+
+class _Unencodable(Exception):
+    """YAML 內容含有無法無損存成 JSON 的型別（例如非字串 key、set）。"""
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        if len(obj) == 1 and next(iter(obj)) in _TAGS:
+            raise _Unencodable("ambiguous tagged mapping")
+        out = {}
+        for k, v in obj.items():
+            if not isinstance(k, str):
+                raise _Unencodable(f"non-string key: {k!r}")
+            out[k] = _encode(v)
+        return out
+    if isinstance(obj, list):
+        return [_encode(v) for v in obj]
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"__date__": obj.isoformat()}
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    raise _Unencodable(f"unsupported type: {type(obj).__name__}")
+
+
+def _decode(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        if len(obj) == 1:
+            tag, value = next(iter(obj.items()))
+            if tag == "__datetime__":
+                return datetime.fromisoformat(value)
+            if tag == "__date__":
+                return date.fromisoformat(value)
+            if tag == "__bytes__":
+                return base64.b64decode(value)
+        return {k: _decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    return obj
+
+
+class MetadataCache:
+    """以 sqlite 實作的 YAML 解析快取。"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._pending = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CACHE_VERSION:
+                conn.executescript(
+                    """
+                    DROP TABLE IF EXISTS files;
+                    DROP TABLE IF EXISTS blobs;
+                    """
+                )
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    data TEXT,
+                    error TEXT
+                );
+                PRAGMA user_version = {CACHE_VERSION};
+                """
+            )
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  無法開啟 metadata 快取 {self.path}，改為直接解析: {e}")
+            self._disabled = True
+        return self._conn
+
+    def _disable(self, error: Exception) -> None:
+        print(f"⚠️  metadata 快取發生錯誤，改為直接解析: {error}")
+        self._disabled = True
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+
+    def _lookup_blob(self, conn: sqlite3.Connection, sha256: str) -> Any:
+        row = conn.execute(
+            "SELECT data, error FROM blobs WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        return row
+
+    def _hit(self, row) -> Any:
+        self.hits += 1
+        data, error = row
+        if error is not None:
+            raise yaml.YAMLError(error)
+        return _decode(json.loads(data))
+
+    def load(self, path: Path) -> Any:
+        """回傳 path 的 yaml.safe_load 結果；語法錯誤時拋出 yaml.YAMLError。"""
+        path = Path(path)
+        st = path.stat()
+        conn = self._connect()
+        if conn is None:
+            self.misses += 1
+            with open(path, "r", encoding="utf-8") as f:
+                return yaml.safe_load(f)
+
+        key = os.path.abspath(path)
+        try:
+            row = conn.execute(
+                "SELECT sha256 FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (key, st.st_mtime_ns, st.st_size),
+            ).fetchone()
+            blob = _MISSING if row is None else self._lookup_blob(conn, row[0])
+        except sqlite3.Error as e:
+            self._disable(e)
+            return self.load(path)
+        if blob is not _MISSING:
+            return self._hit(blob)
+
+        raw = path.read_bytes()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        try:
+            blob = self._lookup_blob(conn, sha256)
+        except sqlite3.Error as e:
+            self._disable(e)
+            return self.load(path)
+        if blob is not _MISSING:
+            self._remember_file(conn, key, st, sha256)
+            return self._hit(blob)
+
+        self.misses += 1
+        try:
+            result = yaml.safe_load(raw.decode("utf-8"))
+        except yaml.YAMLError as e:
+            self._store(conn, key, st, sha256, None, str(e))
+            raise
+        try:
+            encoded = json.dumps(_encode(result), ensure_ascii=False)
+        except _Unencodable:
+            return result
+        self._store(conn, key, st, sha256, encoded, None)
+        return result
+
+    def _remember_file(self, conn, key, st, sha256) -> None:
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, sha256),
+            )
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                conn.commit()
+                self._pending = 0
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def _store(self, conn, key, st, sha256, data, error) -> None:
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs (sha256, data, error) VALUES (?, ?, ?)",
+                (sha256, data, error),
+            )
+        except sqlite3.Error as e:
+            self._disable(e)
+            return
+        self._remember_file(conn, key, st, sha256)
+
+    def flush(self) -> None:
+        """commit 目前累積的寫入（給長時間執行的 worker 使用）。"""
+        if self._conn is not None and self._pending:
+            try:
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+            self._pending = 0
+
+    def close(self) -> None:
+        """寫回尚未 commit 的紀錄並關閉連線。"""
+        if self._conn is not None:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+            self._pending = 0
+
+    def __enter__(self) -> "MetadataCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def summary(self) -> str:
+        """給 CLI 輸出用的命中統計。"""
+        return f"📦 Metadata cache: {self.hits} hit / {self.misses} miss ({self.path})"
@@ -0,0 +1,188 @@
+"""regex 預篩：找出 pattern 任何命中都必定包含的字面字串或字元連續段。
+
+Shared by scan-secrets.py and stream_scan.py.
+
+re.IGNORECASE 的 regex 無法使用 sre 內建的字面前綴搜尋，逐行或逐段執行
+很慢；先以 str.find／bytes.find 找出必含片段，只在可能命中的行或區段執行
+完整 regex，結果不變。
+
+語意前提：
+- str 內容必須是 ASCII，此時 lower()／translate 與 IGNORECASE 一致；
+  其他內容改用 Trigger.finder（同條件的 IGNORECASE regex）
+- bytes 內容的 IGNORECASE 本來就只涵蓋 ASCII，可直接用 bytes.lower()
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern
+
+
+class Trigger(NamedTuple):
+    """pattern 的預篩條件。"""
+    mask_key: Optional[str]             # None 表示字面字串；否則為字元集合
+    needle: str                         # 小寫字面字串，或 N 個 RUN_MARK
+    table: Optional[Dict[int, str]]     # str.translate 用的對照表
+    byte_table: Optional[bytes]         # bytes.translate 用的對照表
+    finder: Pattern[str]                # 非 ASCII 內容使用的等價 regex
+
+    @property
+    def byte_needle(self) -> bytes:
+        return self.needle.encode('ascii')
+
+
+# 預篩用：字元連續段在 translate 後的標記字元
+RUN_MARK = '#'
+
+# 太短的字面字串／連續段篩不掉多少行，不值得使用
+_MIN_LITERAL = 3
+_MIN_RUN = 16
+
+_QUANTIFIER_RE = re.compile(r'[*+?]|\{\d*(,\d*)?\}')
+
+# 跳脫序列：後面固定位數十六進位的字母，與只佔一個字元的字母
+_HEX_ESCAPES = {'x': 2, 'u': 4, 'U': 8}
+_SIMPLE_ESCAPES = frozenset('afnrtvdDsSwWAbBZ')
+
+
+def _skip_bracket(pattern: str, i: int) -> int:
+    """回傳從 pattern[i] == '[' 開始的字元集合結束後的位置"""
+    j = i + 1
+    if j < len(pattern) and pattern[j] == '^':
+        j += 1
+    if j < len(pattern) and pattern[j] == ']':
+        j += 1
+    while j < len(pattern) and pattern[j] != ']':
+        j += 2 if pattern[j] == '\\' else 1
+    return j + 1
+
+
+def _escape_end(pattern: str, i: int) -> Optional[int]:
+    """回傳從 pattern[i] == '\\' 開始的跳脫序列結束後的位置；無法辨識時回傳 None
+
+    \\xhh、\\uXXXX、\\UXXXXXXXX、\\N{...}、\\0oo 與群組參照 \\1..\\99 的後續字元
+    都屬於同一個跳脫序列，不能當成字面字串。
+    """
+    j = i + 1
+    if j >= len(pattern):
+        return None
+    c = pattern[j]
+    if not c.isalnum():
+        return j + 1
+    if c in _HEX_ESCAPES:
+        return j + 1 + _HEX_ESCAPES[c]
+    if c == 'N':
+        end = pattern.find('}', j)
+        return None if end < 0 else end + 1
+    if c.isdigit():
+        digits = '01234567' if c == '0' else '0123456789'
+        end = j + 1
+        while end < len(pattern) and end - j < 3 and pattern[end] in digits:
+            end += 1
+        return end
+    if c in _SIMPLE_ESCAPES:
+        return j + 1
+    return None
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """回傳從 pattern[i] == '(' 開始的群組結束後的位置"""
+    depth = 0
+    j = i
+    while j < len(pattern):
+        c = pattern[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '[':
+            j = _skip_bracket(pattern, j)
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return j
+
+
+def pattern_trigger(pattern: str) -> Optional[Trigger]:
+    """找出 pattern 任何命中都必定包含的片段，作為預篩條件
+
+    - 字面字串：Trigger.mask_key 為 None，needle 為小寫字面字串
+    - 字元連續段：mask_key 為字元集合，needle 為 N 個 RUN_MARK，
+      table／byte_table 把集合內的字元轉成 RUN_MARK
+    無法確定時回傳 None（呼叫端應退回完整比對）。
+    """
+    if re.search(r'\(\?[aiLmsu]*x', pattern):
+        return None
+
+    literals: List[str] = []
+    runs: List[tuple] = []
+    current = ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        literal = None
+        bracket = None
+        if c == '|':
+            return None
+        if c == '\\':
+            end = _escape_end(pattern, i)
+            if end is None:
+                return None
+            if end == i + 2 and not pattern[i + 1].isalnum():
+                literal = pattern[i + 1]
+            i = end
+        elif c == '[':
+            end = _skip_bracket(pattern, i)
+            bracket = pattern[i:end]
+            i = end
+        elif c == '(':
+            i = _skip_group(pattern, i)
+        elif c in '.^${}])*+?':
+            i += 1
+        else:
+            literal = c
+            i += 1
+
+        quantifier = _QUANTIFIER_RE.match(pattern, i)
+        if quantifier:
+            i = quantifier.end()
+            if i < len(pattern) and pattern[i] in '?+':
+                i += 1
+            q = quantifier.group(0)
+            if bracket and q.startswith('{') and q[1:-1].split(',')[0].isdigit():
+                runs.append((bracket, int(q[1:-1].split(',')[0])))
+            literal = None
+
+        if literal is not None and literal.isascii():
+            current += literal
+        else:
+            literals.append(current)
+            current = ''
+    literals.append(current)
+
+    best = max(literals, key=len)
+    if len(best) >= _MIN_LITERAL:
+        finder = re.compile(re.escape(best), re.IGNORECASE)
+        return Trigger(None, best.lower(), None, None, finder)
+
+    runs = [(b, n) for b, n in runs if n >= _MIN_RUN]
+    if runs:
+        bracket, length = max(runs, key=lambda r: r[1])
+        try:
+            member = re.compile(bracket, re.IGNORECASE)
+        except re.error:
+            return None
+        if member.fullmatch('\n'):
+            return None
+        table = str.maketrans({
+            chr(c): (RUN_MARK if member.fullmatch(chr(c)) else ' ') for c in range(128)
+        })
+        byte_table = bytes(
+            ord(RUN_MARK) if c < 128 and table[c] == RUN_MARK else ord(' ') for c in range(256)
+        )
+        finder = re.compile(f'{bracket}{{{length}}}', re.IGNORECASE)
+        return Trigger(bracket, RUN_MARK * length, table, byte_table, finder)
+    return None
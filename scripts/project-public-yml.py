@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""CLI: 依 private.yml 與 config.yml 的 security.sensitive_yaml_fields 重新產生所有 public.yml。
+
+修改 sensitive_yaml_fields 後執行一次即可；內容沒變的 public.yml 不會被改寫。
+
+Usage:
+    uv run python scripts/project-public-yml.py --dry-run
+    uv run python scripts/project-public-yml.py --apply
+    uv run python scripts/project-public-yml.py --apply --root path/to/challenges --config path/to/config.yml
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import yaml
+
+# 讓 public_projection 可被 import
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from public_projection import PublicProjection, project_tree  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--dry-run", action="store_true", help="只預覽，不寫檔（有需要更新的檔案時 exit code 為 1）")
+    mode.add_argument("--apply", action="store_true", help="實際寫檔")
+    parser.add_argument(
+        "--root",
+        default=str(SCRIPT_DIR.parent / "challenges"),
+        help="challenges 目錄路徑（預設 ./challenges）",
+    )
+    parser.add_argument(
+        "--config",
+        default=str(SCRIPT_DIR.parent / "config.yml"),
+        help="config.yml 路徑（預設 ./config.yml）",
+    )
+    args = parser.parse_args()
+
+    challenges_root = Path(args.root).resolve()
+    if not challenges_root.exists():
+        print(f"❌ challenges 目錄不存在: {challenges_root}")
+        return 1
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            raw_config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        print(f"⚠️  找不到 {args.config}，只使用內建的敏感欄位清單")
+        raw_config = {}
+
+    report = project_tree(
+        challenges_root,
+        PublicProjection.from_config(raw_config),
+        SCRIPT_DIR.parent / ".ctf-cache" / "locks",
+        dry_run=args.dry_run,
+    )
+
+    label = "DRY RUN" if args.dry_run else "APPLIED"
+    print(f"=== {label} ===")
+    print(f"掃描根目錄: {challenges_root}")
+    print(f"{'需要更新' if args.dry_run else '已更新'}: {len(report.written)}，未變更: {len(report.unchanged)}")
+    for path in report.written:
+        print(f"  {path.relative_to(challenges_root)}")
+    for path, error in report.errors:
+        print(f"❌ {path.relative_to(challenges_root)}: {error}")
+    if args.dry_run and report.written:
+        print("\n💡 確認無誤後請改用 --apply 實際寫檔。")
+    if report.errors or (args.dry_run and report.written):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
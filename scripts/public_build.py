@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+"""CTF Public Release 建置引擎（scripts/build.sh 的 Python 實作）。
+
+Used by scripts/build.sh (CLI); web-interface/app.py runs it as a subprocess.
+
+功能與輸出和原本的 build.sh 相同：
+1. 把 ready_for_release 的題目複製到 public-release/challenges/<category>/<name>/
+   （README / writeup 移除 flag，docker-compose.yml 替換 FLAG、密碼等值，
+   含敏感內容的附件不複製）
+2. 對輸出目錄做安全掃描：flag 格式與敏感檔名在同一次走訪中檢查，再於行程內
+   執行 scan-secrets.py 的 SecretsScanner
+3. 產生 public-release/README.md 與 build-report.md
+
+題目數量多時以 process pool 平行處理；每個題目的 log 會依題目順序輸出，
+結果與逐一處理相同。
+
+--force 時以 build_manifest 做增量建置：來源檔案與設定都沒變的題目直接沿用
+上次的輸出（不重寫、mtime 不變），已刪除或不再發布的題目會移除輸出；
+--clean 則清空輸出目錄後完整重建。
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from build_manifest import BuildManifest, copy_if_changed, settings_key, write_if_changed
+from hashing import source_hash
+from findings_cache import FindingsCache
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# 附件內出現這些關鍵字（不分大小寫）就不會被複製
+SENSITIVE_KEYWORDS = (
+    "flag:",
+    "flag_description:",
+    "solution_steps:",
+    "internal_notes:",
+    "test_credentials:",
+    "deploy_secrets:",
+    "verified_solutions:",
+    "real_flag",
+    "actual_flag",
+)
+
+# 輸出目錄中不應出現的檔名
+SENSITIVE_FILENAMES = {
+    "private.yml",
+    "flag.txt",
+    "solution.py",
+    "exploit.py",
+    ".env",
+    "secrets.json",
+}
+
+# 安全掃描後才產生的總覽 README（內含 `flag_prefix{...}` 格式說明），不列入掃描
+GENERATED_README = "README.md"
+
+# 題目數少於此值時不啟動 process pool（啟動成本高於處理本身）
+_PARALLEL_MIN_CHALLENGES = 16
+
+_COLORS = {
+    "INFO": "\033[0;34m",
+    "SUCCESS": "\033[0;32m",
+    "WARNING": "\033[1;33m",
+    "ERROR": "\033[0;31m",
+    "STEP": "\033[0;36m",
+}
+_NC = "\033[0m"
+
+_READY_RE = re.compile(rb"^[ \t]*ready_for_release:.*true", re.MULTILINE | re.IGNORECASE)
+
+LogLine = Tuple[str, str]
+
+# 建置程式的原始碼雜湊；程式邏輯改變時 manifest 內的題目都會重新建置
+_BUILD_SOURCE_HASH = source_hash(__file__)
+
+
+class BuildError(Exception):
+    """建置無法繼續（輸出目錄已存在、找不到題目、安全掃描失敗）。"""
+
+
+@dataclass
+class BuildOptions:
+    """建置選項，對應 build.sh 的命令列參數。"""
+    output_dir: Path = PROJECT_ROOT / "public-release"
+    challenges_dir: Path = PROJECT_ROOT / "challenges"
+    config_file: Path = PROJECT_ROOT / "config.yml"
+    report_file: Path = PROJECT_ROOT / "build-report.md"
+    # build manifest 與掃描快取的位置；None 表示不做增量建置
+    cache_dir: Optional[Path] = PROJECT_ROOT / ".ctf-cache"
+    challenge: Optional[Path] = None
+    force: bool = False
+    clean: bool = False
+    dry_run: bool = False
+    verbose: bool = False
+    skip_scan: bool = False
+    include_writeups: bool = False
+    jobs: Optional[int] = None
+
+
+@dataclass
+class ChallengeOutcome:
+    """單一題目的處理結果與 log。"""
+    skipped: bool = False
+    failures: int = 0
+    logs: List[LogLine] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)   # 相對於輸出目錄；目錄以 / 結尾
+    clean_files: Dict[str, list] = field(default_factory=dict)   # 通過檢查的附件 {檔名: [mtime_ns, size]}
+
+
+@dataclass
+class BuildResult:
+    total: int = 0
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    scan_passed: Optional[bool] = None   # None 表示已跳過掃描
+    reused: int = 0                      # 沿用上次輸出的題目數
+
+
+class BuildLogger:
+    """收集建置 log；echo 時同步輸出到 stdout。"""
+
+    def __init__(self, echo: bool = True, color: bool = True):
+        self.echo = echo
+        self.color = color
+        self.lines: List[str] = []
+
+    def __call__(self, level: str, message: str) -> None:
+        if level == "PLAIN":
+            line = message
+        elif self.color:
+            line = f"{_COLORS[level]}[{level}]{_NC} {message}"
+        else:
+            line = f"[{level}] {message}"
+        self.lines.append(line)
+        if self.echo:
+            print(line, flush=True)
+
+    @property
+    def output(self) -> str:
+        return "\n".join(self.lines)
+
+
+def read_config(config_file: Path) -> dict:
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def flag_regex(flag_prefix: str) -> "re.Pattern[bytes]":
+    """build.sh 使用的 `PREFIX\\{[^}]+\\}`（逐行比對，不跨行）。"""
+    return re.compile(re.escape(flag_prefix.encode("utf-8")) + rb"\{[^}\n]+\}")
+
+
+def _filter_file(src: Path, dst: Path, rules, log) -> None:
+    """依序套用 (regex, replacement) 後寫入 dst（對應 safe_sed_filter）；內容相同時不重寫。"""
+    data = src.read_bytes()
+    for regex, replacement in rules:
+        data = regex.sub(replacement, data)
+    write_if_changed(dst, data)
+    if not data:
+        log("WARNING", f"sed 輸出為空: {dst}")
+
+
+def check_sensitive_content(path: Path, flag_re, verbose: bool, log) -> bool:
+    """附件不含 flag 與敏感關鍵字時回傳 True。"""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return True
+    clean = True
+    if flag_re.search(data):
+        log("WARNING", f"發現 flag 格式: {path}")
+        clean = False
+    lowered = data.lower()
+    for keyword in SENSITIVE_KEYWORDS:
+        if keyword.encode("ascii") in lowered:
+            if verbose:
+                log("WARNING", f"發現敏感關鍵字 '{keyword}' 在: {path}")
+            clean = False
+    return clean
+
+
+def challenge_inputs(challenge_path: Path) -> List[str]:
+    """會影響 process_challenge 輸出的來源檔案（相對於題目目錄）。"""
+    inputs = [
+        rel for rel in ("public.yml", "README.md", "writeup/README.md", "docker/docker-compose.yml")
+        if (challenge_path / rel).is_file()
+    ]
+    files_dir = challenge_path / "files"
+    if files_dir.is_dir():
+        inputs += [
+            f"files/{e.name}" for e in os.scandir(files_dir)
+            if not e.name.startswith(".") and e.is_file()
+        ]
+    return inputs
+
+
+def process_challenge(challenge_path: Path, options: BuildOptions, flag_prefix: str,
+                      known_clean: Optional[Dict[str, list]] = None) -> ChallengeOutcome:
+    """處理單個題目（對應 build.sh 的 process_challenge）。
+
+    known_clean 為上次建置時通過敏感內容檢查的附件 {檔名: [mtime_ns, size]}；
+    stat 未變的附件不會再讀取檢查。內容相同的輸出檔不會重寫。
+    """
+    outcome = ChallengeOutcome()
+    known_clean = known_clean or {}
+
+    def log(level: str, message: str) -> None:
+        outcome.logs.append((level, message))
+
+    challenge_path = Path(challenge_path)
+    name = challenge_path.name
+    category = challenge_path.parent.name
+    log("STEP", f"處理題目: {category}/{name}")
+
+    public_yml = challenge_path / "public.yml"
+    if not public_yml.is_file():
+        log("WARNING", f"跳過 {name}: 缺少 public.yml")
+        outcome.skipped = True
+        return outcome
+    if not _READY_RE.search(public_yml.read_bytes()):
+        log("WARNING", f"跳過 {name}: 尚未標記為準備發布")
+        outcome.skipped = True
+        return outcome
+
+    if options.dry_run:
+        log("SUCCESS", f"完成處理: {category}/{name}")
+        return outcome
+
+    flag_re = flag_regex(flag_prefix)
+    rel_dir = f"challenges/{category}/{name}"
+    out_dir = Path(options.output_dir) / rel_dir
+    (out_dir / "files").mkdir(parents=True, exist_ok=True)
+    outcome.outputs += [f"{rel_dir}/", f"{rel_dir}/files/"]
+
+    copy_if_changed(public_yml, out_dir / "public.yml")
+    outcome.outputs.append(f"{rel_dir}/public.yml")
+    log("INFO", "  ✓ 複製 public.yml")
+
+    readme = challenge_path / "README.md"
+    if readme.is_file():
+        try:
+            _filter_file(readme, out_dir / "README.md", [(flag_re, b"[REDACTED]")], log)
+            outcome.outputs.append(f"{rel_dir}/README.md")
+            log("INFO", "  ✓ 複製 README.md（已過濾）")
+        except OSError:
+            log("ERROR", f"sed 過濾失敗: {readme}")
+            log("WARNING", "  ✗ README.md 過濾失敗")
+            outcome.failures += 1
+
+    files_dir = challenge_path / "files"
+    if files_dir.is_dir():
+        for entry in sorted(os.scandir(files_dir), key=lambda e: e.name):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            st = entry.stat()
+            stat = [st.st_mtime_ns, st.st_size]
+            if known_clean.get(entry.name) == stat or check_sensitive_content(
+                Path(entry.path), flag_re, options.verbose, log
+            ):
+                copy_if_changed(entry.path, out_dir / "files" / entry.name)
+                outcome.outputs.append(f"{rel_dir}/files/{entry.name}")
+                outcome.clean_files[entry.name] = stat
+                log("INFO", f"  ✓ 複製附件: {entry.name}")
+            else:
+                log("WARNING", f"  ✗ 跳過敏感附件: {entry.name}")
+
+    writeup_dir = challenge_path / "writeup"
+    if options.include_writeups and writeup_dir.is_dir():
+        (out_dir / "writeup").mkdir(exist_ok=True)
+        outcome.outputs.append(f"{rel_dir}/writeup/")
+        writeup = writeup_dir / "README.md"
+        if writeup.is_file():
+            try:
+                _filter_file(writeup, out_dir / "writeup" / "README.md",
+                             [(flag_re, b"[FLAG REDACTED]")], log)
+                outcome.outputs.append(f"{rel_dir}/writeup/README.md")
+                log("INFO", "  ✓ 複製 writeup（已過濾 flag）")
+            except OSError:
+                log("ERROR", f"sed 過濾失敗: {writeup}")
+                log("WARNING", "  ✗ writeup 過濾失敗")
+
+    compose = challenge_path / "docker" / "docker-compose.yml"
+    if compose.is_file():
+        (out_dir / "docker").mkdir(exist_ok=True)
+        outcome.outputs.append(f"{rel_dir}/docker/")
+        rules = [
+            (re.compile(rb"(FLAG=).*"), rb"\1${FLAG}"),
+            (flag_re, b"${FLAG}"),
+            (re.compile(rb"(password:).*"), rb"\1 ${PASSWORD}"),
+            (re.compile(rb"(secret_key:).*"), rb"\1 ${SECRET_KEY}"),
+        ]
+        try:
+            _filter_file(compose, out_dir / "docker" / "docker-compose.yml", rules, log)
+            outcome.outputs.append(f"{rel_dir}/docker/docker-compose.yml")
+            log("INFO", "  ✓ 複製 docker-compose.yml（已過濾）")
+        except OSError:
+            log("ERROR", f"sed 過濾失敗: {compose}")
+            log("WARNING", "  ✗ docker-compose.yml 過濾失敗")
+            outcome.failures += 1
+
+    log("SUCCESS", f"完成處理: {category}/{name}")
+    return outcome
+
+
+_worker_options: Optional[BuildOptions] = None
+_worker_flag_prefix = ""
+
+
+def _init_build_worker(options: BuildOptions, flag_prefix: str) -> None:
+    """process pool initializer：每個 worker 持有一份建置選項"""
+    global _worker_options, _worker_flag_prefix
+    _worker_options = options
+    _worker_flag_prefix = flag_prefix
+
+
+def _process_challenge_worker(task: Tuple[str, Dict[str, list]]) -> ChallengeOutcome:
+    challenge_path, known_clean = task
+    return process_challenge(Path(challenge_path), _worker_options, _worker_flag_prefix, known_clean)
+
+
+_SCAN_SECRETS_MODULE = None
+
+
+def load_scan_secrets_module():
+    """載入 scan-secrets.py（每個行程只載入一次）"""
+    global _SCAN_SECRETS_MODULE
+    if _SCAN_SECRETS_MODULE is None:
+        spec = importlib.util.spec_from_file_location("scan_secrets", str(SCRIPT_DIR / "scan-secrets.py"))
+        module = importlib.util.module_from_spec(spec)
+        # 掃描器的 process pool 需要能以模組名稱找回 worker 函式
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        _SCAN_SECRETS_MODULE = module
+    return _SCAN_SECRETS_MODULE
+
+
+class PublicBuilder:
+    """public-release 建置流程。"""
+
+    def __init__(self, options: BuildOptions, log: Optional[Callable[[str, str], None]] = None):
+        self.options = options
+        self.log = log or BuildLogger()
+        self.config = read_config(options.config_file)
+        self.flag_prefix = (self.config.get("project") or {}).get("flag_prefix") or "is1abCTF"
+        self.jobs = options.jobs or os.cpu_count() or 1
+        self.result = BuildResult()
+        self.settings = settings_key(
+            _BUILD_SOURCE_HASH, self.flag_prefix, options.include_writeups, options.verbose
+        )
+        # dry-run 或未指定 cache_dir 時不使用 manifest（每次完整建置）
+        self.manifest: Optional[BuildManifest] = None
+        if options.cache_dir is not None and not options.dry_run:
+            self.manifest = BuildManifest.load(
+                options.output_dir, "build", Path(options.cache_dir) / "build-manifests"
+            )
+
+    def build(self) -> BuildResult:
+        """執行完整建置；無法繼續時拋出 BuildError。"""
+        options = self.options
+        log = self.log
+        log("PLAIN", "")
+        log("PLAIN", "========================================")
+        log("PLAIN", "  CTF Public Release Build Script")
+        log("PLAIN", "========================================")
+        log("PLAIN", "")
+        if options.dry_run:
+            log("WARNING", "模擬執行模式 - 不會建立任何檔案")
+        if not Path(options.challenges_dir).is_dir():
+            self._fail(f"找不到題目目錄: {options.challenges_dir}")
+
+        log("INFO", f"Flag 前綴: {self.flag_prefix}")
+        self.prepare_output_dir()
+        self.process_all_challenges()
+        self.run_security_scan()
+        self.generate_public_readme()
+        self.generate_build_report()
+
+        r = self.result
+        log("PLAIN", "")
+        log("PLAIN", "========================================")
+        log("PLAIN", "  建置完成！")
+        log("PLAIN", "========================================")
+        log("PLAIN", "")
+        log("PLAIN", "📊 統計:")
+        log("PLAIN", f"  - 總題目: {r.total}")
+        log("PLAIN", f"  - 已處理: {r.processed}")
+        log("PLAIN", f"  - 已跳過: {r.skipped}")
+        log("PLAIN", "")
+        log("PLAIN", f"📁 輸出目錄: {options.output_dir}")
+        log("PLAIN", f"📄 建置報告: {options.report_file}")
+        log("PLAIN", "")
+        if options.dry_run:
+            log("WARNING", "這是模擬執行。移除 --dry-run 選項以實際建置。")
+        return r
+
+    def _fail(self, message: str) -> None:
+        self.log("ERROR", message)
+        raise BuildError(message)
+
+    def prepare_output_dir(self) -> None:
+        out = Path(self.options.output_dir)
+        self.log("STEP", f"準備輸出目錄: {out}")
+        if out.is_dir():
+            if not self.options.force:
+                self._fail("輸出目錄已存在。使用 -f/--force 覆蓋或指定不同目錄。")
+            if self.manifest is not None and self.manifest.entries and not self.options.clean:
+                self.log("INFO", "增量建置：沿用未變動題目的輸出（--clean 可完整重建）")
+            else:
+                self.log("WARNING", "強制覆蓋現有目錄")
+                if not self.options.dry_run:
+                    shutil.rmtree(out)
+                if self.manifest is not None:
+                    self.manifest.entries.clear()
+                    self.manifest.extra.clear()
+        if not self.options.dry_run:
+            for sub in ("challenges", "docs", "attachments"):
+                (out / sub).mkdir(parents=True, exist_ok=True)
+        self.log("SUCCESS", "輸出目錄已準備完成")
+
+    def find_challenges(self) -> List[Path]:
+        """challenges/<category>/<name>/（不含隱藏目錄），依名稱排序。"""
+        if self.options.challenge is not None:
+            path = Path(self.options.challenge)
+            if not path.is_dir():
+                self._fail(f"找不到題目: {path}")
+            return [path]
+        challenges = []
+        for category in _sorted_dirs(Path(self.options.challenges_dir)):
+            challenges.extend(_sorted_dirs(category))
+        return challenges
+
+    def process_all_challenges(self) -> None:
+        self.log("STEP", "開始處理題目...")
+        paths = self.find_challenges()
+        manifest = self.manifest
+        keys = [f"{p.parent.name}/{p.name}" for p in paths]
+
+        # 來源與設定都沒變的題目直接重播上次的結果，其餘交給 _run 處理
+        outcomes: Dict[int, ChallengeOutcome] = {}
+        inputs: Dict[int, Dict[str, list]] = {}
+        dirty: List[Tuple[Path, Dict[str, list]]] = []
+        dirty_index: List[int] = []
+        for i, (path, key) in enumerate(zip(paths, keys)):
+            known_clean: Dict[str, list] = {}
+            if manifest is not None:
+                inputs[i] = manifest.hash_inputs(key, path, challenge_inputs(path))
+                entry = manifest.entries.get(key) or {}
+                if manifest.is_fresh(key, inputs[i], self.settings):
+                    outcomes[i] = ChallengeOutcome(
+                        skipped=entry["skipped"],
+                        failures=entry["failures"],
+                        logs=[tuple(line) for line in entry["logs"]],
+                    )
+                    self.result.reused += 1
+                    continue
+                if entry.get("settings") == self.settings:
+                    known_clean = entry.get("clean_files") or {}
+            dirty.append((path, known_clean))
+            dirty_index.append(i)
+
+        for i, outcome in zip(dirty_index, self._run(dirty)):
+            outcomes[i] = outcome
+            if manifest is not None:
+                manifest.record(
+                    keys[i], inputs[i], self.settings, outcome.outputs,
+                    skipped=outcome.skipped, failures=outcome.failures,
+                    logs=outcome.logs, clean_files=outcome.clean_files,
+                )
+
+        for i in range(len(paths)):
+            outcome = outcomes[i]
+            for level, message in outcome.logs:
+                self.log(level, message)
+            self.result.total += 1
+            self.result.failed += outcome.failures
+            if outcome.skipped:
+                self.result.skipped += 1
+            else:
+                self.result.processed += 1
+
+        if manifest is not None:
+            if self.options.challenge is None:
+                for key in manifest.prune(keys):
+                    self.log("INFO", f"移除已刪除題目的輸出: {key}")
+            manifest.save()
+            if self.result.reused:
+                self.log("INFO", f"沿用上次建置結果: {self.result.reused}/{self.result.total} 題")
+
+    def _run(self, tasks: List[Tuple[Path, Dict[str, list]]]):
+        """依序回傳每個題目的處理結果（順序與 tasks 相同）"""
+        if self.jobs <= 1 or len(tasks) <= 1 or len(tasks) < _PARALLEL_MIN_CHALLENGES:
+            return (process_challenge(p, self.options, self.flag_prefix, clean) for p, clean in tasks)
+        workers = min(self.jobs, len(tasks))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_build_worker,
+            initargs=(self.options, self.flag_prefix),
+        ) as executor:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            return list(executor.map(_process_challenge_worker,
+                                     [(str(p), clean) for p, clean in tasks],
+                                     chunksize=chunksize))
+
+    def run_security_scan(self) -> None:
+        log = self.log
+        if self.options.skip_scan:
+            log("WARNING", "跳過安全掃描（不建議在正式發布時使用）")
+            return
+        log("STEP", "執行安全掃描...")
+        out = Path(self.options.output_dir)
+        flag_hits, sensitive = self.walk_output(out)
+
+        log("INFO", "掃描 flag 格式...")
+        if flag_hits:
+            log("ERROR", "發現未移除的 flag！")
+            for hit in flag_hits:
+                log("PLAIN", hit)
+        else:
+            log("SUCCESS", "未發現 flag 洩漏")
+
+        log("INFO", "檢查敏感檔案...")
+        for path in sensitive:
+            log("ERROR", f"發現敏感檔案: {path}")
+        scan_failed = bool(flag_hits or sensitive)
+        if not scan_failed:
+            log("SUCCESS", "安全掃描通過 ✓")
+
+        if (SCRIPT_DIR / "scan-secrets.py").is_file() and out.is_dir():
+            log("INFO", "執行進階安全掃描...")
+            module = load_scan_secrets_module()
+            # 增量建置時沿用掃描快取，未變動的輸出檔不會重新掃描
+            findings_cache = None
+            if self.manifest is not None:
+                findings_cache = FindingsCache(Path(self.options.cache_dir) / "scan.sqlite")
+            scanner = module.SecretsScanner(
+                str(self.options.config_file), jobs=self.jobs, findings_cache=findings_cache
+            )
+            try:
+                for entry in _scan_targets(out):
+                    scanner.scan(str(entry))
+                has_critical = scanner.result.has_critical
+            finally:
+                if findings_cache is not None:
+                    findings_cache.close()
+            if has_critical:
+                log("ERROR", "進階安全掃描發現問題")
+                for finding in scanner.result.findings:
+                    if finding.severity == module.Severity.CRITICAL:
+                        log("PLAIN", f"  {finding.file_path}:{finding.line_number} {finding.description}")
+                scan_failed = True
+            else:
+                log("SUCCESS", "進階安全掃描通過 ✓")
+
+        self.result.scan_passed = not scan_failed
+        if scan_failed:
+            self._fail("安全掃描失敗！請修復問題後重新建置。")
+
+    def walk_output(self, out: Path) -> Tuple[List[str], List[str]]:
+        """走訪輸出目錄一次，回傳 (含 flag 的檔案與行, 敏感檔名路徑)。
+
+        使用 manifest 時，上次已確認不含 flag 且 stat 未變的檔案不會再讀取。
+        """
+        flag_re = flag_regex(self.flag_prefix)
+        flag_hits: List[str] = []
+        sensitive: List[str] = []
+        previous: Dict[str, list] = {}
+        verified: Dict[str, list] = {}
+        if self.manifest is not None and self.manifest.extra.get("settings") == self.settings:
+            previous = self.manifest.extra.get("scanned") or {}
+        for root, dirs, files in os.walk(out):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if name in SENSITIVE_FILENAMES:
+                    sensitive.append(path)
+                rel = os.path.relpath(path, out)
+                if rel == GENERATED_README:
+                    continue
+                try:
+                    st = os.stat(path)
+                    stat = [st.st_mtime_ns, st.st_size]
+                    if previous.get(rel) == stat:
+                        verified[rel] = stat
+                        continue
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                if not flag_re.search(data):
+                    verified[rel] = stat
+                    continue
+                if b"\0" in data:
+                    flag_hits.append(f"Binary file {path} matches")
+                    continue
+                for line in data.splitlines():
+                    if flag_re.search(line):
+                        flag_hits.append(f"{path}:{line.decode('utf-8', errors='replace')}")
+        if self.manifest is not None:
+            self.manifest.extra["settings"] = self.settings
+            self.manifest.extra["scanned"] = verified
+            self.manifest.save()
+        return flag_hits, sensitive
+
+    def generate_public_readme(self) -> None:
+        self.log("STEP", "生成公開 README...")
+        if self.options.dry_run:
+            return
+        out = Path(self.options.output_dir)
+        project = self.config.get("project") or {}
+        name = project.get("name") or "CTF Competition"
+        organization = project.get("organization") or "Organization"
+        year = project.get("year") or datetime.now().year
+
+        lines = [
+            f"# {name} - Public Challenges",
+            "",
+            f"🚀 **{organization} CTF {year}** - 公開題目與附件",
+            "",
+            "## 📋 比賽資訊",
+            "",
+            f"- **比賽名稱**: {name}",
+            f"- **主辦單位**: {organization}",
+            f"- **Flag 格式**: `{self.flag_prefix}{{...}}`",
+            "",
+            "## 📁 題目列表",
+            "",
+        ]
+        for category_dir in _sorted_dirs(out / "challenges"):
+            challenges = _sorted_dirs(category_dir)
+            category = category_dir.name
+            lines.append(f"### {category[:1].upper()}{category[1:]} ({len(challenges)} 題)")
+            lines.append("")
+            for challenge_dir in challenges:
+                data = read_config(challenge_dir / "public.yml")
+                title = data.get("title") or challenge_dir.name
+                difficulty = data.get("difficulty") or ""
+                lines.append(
+                    f"- [{title}](challenges/{category}/{challenge_dir.name}/) - `{difficulty}`"
+                )
+            lines.append("")
+        lines += [
+            "## 📞 聯絡資訊",
+            "",
+            "如有問題，請聯繫比賽主辦單位。",
+            "",
+            "## 📄 授權條款",
+            "",
+            "本倉庫內容遵循 MIT License 授權條款。",
+            "",
+            "---",
+        ]
+        # 題目列表沒變時不重寫（建置時間也維持上次的值），README 的 mtime 不變
+        body = "\n".join(lines)
+        readme = out / "README.md"
+        body_key = settings_key(body)
+        if self.manifest is None or self.manifest.extra.get("readme") != body_key or not readme.is_file():
+            footer = [f"📅 建置時間：{_utc_now()}  ", "🤖 此檔案由 build.sh 自動生成", ""]
+            readme.write_text("\n".join(lines + footer), encoding="utf-8")
+            if self.manifest is not None:
+                self.manifest.extra["readme"] = body_key
+                self.manifest.save()
+        self.log("SUCCESS", "README.md 已生成")
+
+    def generate_build_report(self) -> None:
+        self.log("STEP", "生成建置報告...")
+        if self.options.dry_run:
+            return
+        options = self.options
+        r = self.result
+        out = Path(options.output_dir)
+        files = []
+        if out.is_dir():
+            for root, dirs, names in os.walk(out):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names))
+        report = f"""# CTF Public Release Build Report
+
+## 📊 建置統計
+
+| 項目 | 數量 |
+|------|------|
+| 總題目數 | {r.total} |
+| 已處理 | {r.processed} |
+| 已跳過 | {r.skipped} |
+| 失敗 | {r.failed} |
+
+## 📅 建置資訊
+
+- **建置時間**: {_utc_now()}
+- **輸出目錄**: {options.output_dir}
+- **Flag 前綴**: {self.flag_prefix}
+- **包含 Writeup**: {str(options.include_writeups).lower()}
+
+## 🔒 安全檢查
+
+- 安全掃描: {"已跳過 ⚠️" if options.skip_scan else "通過 ✓"}
+- Flag 洩漏檢查: 通過 ✓
+- 敏感檔案檢查: 通過 ✓
+
+## 📁 輸出結構
+
+```
+{chr(10).join(files[:20])}
+```
+
+---
+🤖 由 build.sh 自動生成
+"""
+        Path(options.report_file).write_text(report, encoding="utf-8")
+        self.log("SUCCESS", f"建置報告已生成: {options.report_file}")
+
+
+def _scan_targets(out: Path) -> List[Path]:
+    """輸出目錄中要交給 SecretsScanner 的項目（不含產生的 README.md）。"""
+    return [p for p in sorted(out.iterdir()) if p.name != GENERATED_README]
+
+
+def _sorted_dirs(path: Path) -> List[Path]:
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return []
+    return [Path(e.path) for e in sorted(entries, key=lambda e: e.name)
+            if e.is_dir() and not e.name.startswith(".")]
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="build.sh",
+        description="CTF Public Release Build Script",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""範例:
+    build.sh                              # 建置所有題目
+    build.sh -c challenges/web/sqli       # 只建置特定題目
+    build.sh -o /tmp/public --force       # 輸出到指定目錄（只重建有變動的題目）
+    build.sh --force --clean              # 清空輸出目錄後完整重建
+    build.sh --dry-run                    # 模擬執行
+""",
+    )
+    parser.add_argument("-o", "--output", default=str(PROJECT_ROOT / "public-release"),
+                        help="指定輸出目錄 (預設: public-release)")
+    parser.add_argument("-c", "--challenge", help="只建置指定的題目")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="覆蓋現有輸出（只重建有變動的題目）")
+    parser.add_argument("--clean", action="store_true",
+                        help="與 --force 併用：清空輸出目錄後完整重建")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="模擬執行，不實際建立檔案")
+    parser.add_argument("-v", "--verbose", action="store_true", help="顯示詳細輸出")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="處理題目與安全掃描的平行 worker 數 (預設: CPU 核心數)")
+    parser.add_argument("--skip-scan", action="store_true", help="跳過安全掃描（不建議）")
+    parser.add_argument("--include-writeups", action="store_true",
+                        help="包含 writeup（比賽結束後使用）")
+    args = parser.parse_args(argv)
+
+    options = BuildOptions(
+        output_dir=Path(args.output),
+        challenge=Path(args.challenge) if args.challenge else None,
+        force=args.force,
+        clean=args.clean,
+        dry_run=args.dry_run,
+        verbose=args.verbose,
+        skip_scan=args.skip_scan,
+        include_writeups=args.include_writeups,
+        jobs=args.jobs,
+    )
+    try:
+        PublicBuilder(options, BuildLogger(color=sys.stdout.isatty())).build()
+    except BuildError:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""private.yml → public.yml 的投影規則。
+
+Shared by web-interface/app.py, create-challenge.py, generate-viewer-data.py and
+project-public-yml.py.
+
+- 欄位黑名單：內建的敏感欄位 + config.yml 的 security.sensitive_yaml_fields，
+  另外以前綴排除 flag* / solution_* / internal_* / testing*；比對不分大小寫，
+  建立 PublicProjection 時一次編譯好，之後每個欄位只需一次 set 查詢；
+- project()：由 private.yml 產生 public.yml 內容（hints 只保留 level / cost）；
+- sanitize()：只套用黑名單，給讀取 public.yml 的工具做 defense-in-depth；
+- write()：投影結果與現有 public.yml 完全相同時不寫入，mtime 不變，下游以
+  mtime 判斷的快取（題目索引、build manifest）仍然有效；
+- project_tree()：config 變更後一次重新投影整個 challenges/；每題的讀取、投影
+  與寫入都在 private.yml / public.yml 的 lock 內，與 Web 介面的編輯互斥。
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+from atomic_io import atomic_write_text, locked, render_yaml
+
+# 與 config.yml 範本的 security.sensitive_yaml_fields 及 scan-secrets.py 一致
+DEFAULT_SENSITIVE_FIELDS: FrozenSet[str] = frozenset({
+    "flag", "flags", "real_flag", "actual_flag",
+    "flag_description", "flag_type", "dynamic_flag",
+    "solution_steps", "solution", "solutions",
+    "internal_notes", "internal_note", "private_notes",
+    "test_credentials", "credentials", "admin_password",
+    "deploy_secrets", "secrets", "secret_key", "secret",
+    "verified_solutions", "exploits",
+    "token", "password", "api_key",
+})
+
+SENSITIVE_PREFIXES: Tuple[str, ...] = ("flag", "solution_", "internal_", "testing")
+
+# 公開的 hints 只保留這些欄位（提示內容只存在 private.yml）
+PUBLIC_HINT_FIELDS = ("level", "cost")
+
+
+class PublicProjection:
+    """編譯好的欄位過濾規則。"""
+
+    def __init__(
+        self,
+        sensitive_fields: Iterable[str] = (),
+        prefixes: Tuple[str, ...] = SENSITIVE_PREFIXES,
+    ):
+        extra = {str(f).strip().lower() for f in sensitive_fields if str(f).strip()}
+        self.denied: FrozenSet[str] = DEFAULT_SENSITIVE_FIELDS | extra
+        self.prefixes = tuple(p.lower() for p in prefixes)
+
+    @classmethod
+    def from_config(cls, raw_config: Optional[Dict[str, Any]]) -> "PublicProjection":
+        """由 config.yml 的原始內容建立（讀取 security.sensitive_yaml_fields）。"""
+        security = (raw_config or {}).get("security") or {}
+        return cls(security.get("sensitive_yaml_fields") or [])
+
+    @property
+    def signature(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """規則的簽章；規則改變時需要重新投影。"""
+        return tuple(sorted(self.denied)), self.prefixes
+
+    def allows(self, key: Any) -> bool:
+        lowered = str(key).lower()
+        return lowered not in self.denied and not lowered.startswith(self.prefixes)
+
+    def sanitize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """移除敏感欄位（不修改 data）。"""
+        return {k: v for k, v in data.items() if self.allows(k)}
+
+    def project(self, private: Dict[str, Any]) -> Dict[str, Any]:
+        """由 private.yml 內容產生 public.yml 內容。"""
+        public = self.sanitize(private)
+        hints = public.get("hints")
+        if isinstance(hints, list):
+            public["hints"] = [
+                {k: hint[k] for k in PUBLIC_HINT_FIELDS if k in hint} if isinstance(hint, dict) else hint
+                for hint in hints
+            ]
+        return public
+
+    def write(self, public_yml: Path, private: Dict[str, Any]) -> bool:
+        """寫入投影結果；內容與現有檔案相同時不寫入。回傳是否有寫入。"""
+        text = render_yaml(self.project(private))
+        try:
+            if Path(public_yml).read_text(encoding="utf-8") == text:
+                return False
+        except (OSError, UnicodeDecodeError):
+            pass
+        atomic_write_text(public_yml, text)
+        return True
+
+
+@dataclass
+class ProjectionReport:
+    written: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    errors: List[Tuple[Path, str]] = field(default_factory=list)
+
+
+def iter_private_ymls(challenges_dir: Path) -> Iterator[Path]:
+    """challenges/ 底下所有 private.yml（略過隱藏目錄），依路徑排序。"""
+    for dirpath, dirnames, filenames in os.walk(challenges_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if "private.yml" in filenames:
+            yield Path(dirpath) / "private.yml"
+
+
+def project_tree(
+    challenges_dir: Path, projection: PublicProjection, lock_dir: Path, dry_run: bool = False
+) -> ProjectionReport:
+    """重新投影整個 challenges/；dry_run 時只回報哪些 public.yml 會改變。
+
+    lock_dir 需與 Web 介面相同（.ctf-cache/locks），才會與其編輯互斥。
+    """
+    report = ProjectionReport()
+    for private_yml in iter_private_ymls(Path(challenges_dir)):
+        public_yml = private_yml.with_name("public.yml")
+        try:
+            with locked([private_yml, public_yml], lock_dir):
+                with open(private_yml, "r", encoding="utf-8") as f:
+                    private = yaml.safe_load(f) or {}
+                if not isinstance(private, dict):
+                    raise ValueError("private.yml 頂層必須是 mapping")
+                if dry_run:
+                    try:
+                        current = public_yml.read_text(encoding="utf-8")
+                    except OSError:
+                        current = None
+                    changed = current != render_yaml(projection.project(private))
+                else:
+                    changed = projection.write(public_yml, private)
+        except (OSError, ValueError, yaml.YAMLError) as project_error:
+            report.errors.append((private_yml, str(project_error)))
+            continue
+        (report.written if changed else report.unchanged).append(public_yml)
+    return report
@@ -11,22 +11,38 @@ CTF Secrets Scanner - 敏感資料掃描工具
 
 用法：
     python scan-secrets.py --path ./public-release
+    python scan-secrets.py --path ./public-release --jobs 8  # 平行掃描
+    python scan-secrets.py --path ./challenges --incremental  # 只掃描有變動的檔案
+    python scan-secrets.py --path ./public-release --binary-budget 256  # 壓縮檔/圖片每檔最多讀 256 MiB
     python scan-secrets.py --path ./challenges --verbose
     python scan-secrets.py --path . --fix  # 嘗試自動修復
 """
 
 import argparse
+import bisect
+import copy
+import hashlib
 import os
 import re
 import sys
 import json
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Set
 from datetime import datetime
 from enum import Enum
 
+import binary_scan
+import pattern_prefilter
+import stream_scan
+from binary_scan import BinaryScanner, is_binary_scannable
+from findings_cache import DEFAULT_CACHE_PATH, FindingsCache
+from hashing import source_hash
+from pattern_prefilter import Trigger, pattern_trigger
+from stream_scan import compile_bytes_pattern, iter_file_matches, should_stream
+
 
 class Severity(Enum):
     """問題嚴重程度"""
@@ -73,12 +89,58 @@ class ScanResult:
         return counts
 
 
+# 掃描器（含共用模組）原始碼的雜湊；程式邏輯改變時 --incremental 的快取會自動失效
+_SCANNER_SOURCE_HASH = source_hash(
+    __file__, binary_scan.__file__, pattern_prefilter.__file__, stream_scan.__file__
+)
+
+# 檔案數少於此值時不啟動 process pool（啟動成本高於掃描本身）
+_PARALLEL_MIN_FILES = 256
+
+# 每個 worker 工作單位包含的檔案數
+_BATCH_SIZE = 64
+
+_worker_scanner: Optional['SecretsScanner'] = None
+_worker_verbose = False
+
+
+def _init_scan_worker(template: 'SecretsScanner', verbose: bool):
+    """process pool initializer：每個 worker 持有一份掃描器設定"""
+    global _worker_scanner, _worker_verbose
+    _worker_scanner = template
+    _worker_verbose = verbose
+
+
+def _scan_file_batch(paths: List[str]):
+    """在 worker 中掃描一批檔案，回傳 (ScanResult, 快取命中數, 快取未命中數)"""
+    scanner = _worker_scanner
+    scanner.result = ScanResult()
+    cache = scanner.findings_cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    for path in paths:
+        scanner._scan_file(Path(path), _worker_verbose)
+    if cache is None:
+        return scanner.result, 0, 0
+    cache.flush()
+    return scanner.result, cache.hits - hits, cache.misses - misses
+
+
 class SecretsScanner:
     """敏感資料掃描器"""
     
-    def __init__(self, config_path: Optional[str] = None):
-        """初始化掃描器"""
+    def __init__(self, config_path: Optional[str] = None, jobs: Optional[int] = 1,
+                 findings_cache: Optional[FindingsCache] = None,
+                 binary_budget: int = binary_scan.DEFAULT_BUDGET):
+        """初始化掃描器
+
+        jobs: 掃描目錄時的平行 worker 數；None 表示使用 CPU 核心數
+        findings_cache: 增量掃描快取；內容與規則集都未變的檔案直接重播結果
+        binary_budget: 壓縮檔、圖片等二進位檔每個檔案最多讀取的位元組數
+        """
         self.config = self._load_config(config_path)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.findings_cache = findings_cache
+        self.binary_budget = binary_budget
         self.flag_prefix = self.config.get('flag_prefix', 'is1abCTF')
         self.result = ScanResult()
         
@@ -134,10 +196,10 @@ class SecretsScanner:
         # 要跳過的目錄
         self.skip_dirs = {
             '.git', '__pycache__', 'node_modules', '.venv', 'venv',
-            '.idea', '.vscode', '.cache', 'dist', 'build',
+            '.idea', '.vscode', '.cache', '.ctf-cache', 'dist', 'build',
         }
         
-        # 要跳過的檔案類型
+        # 要跳過的檔案類型（壓縮檔、圖片、PDF 等仍會以 binary_scan 搜尋 flag）
         self.skip_extensions = {
             '.pyc', '.pyo', '.so', '.dll', '.exe', '.bin',
             '.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg',
@@ -146,6 +208,10 @@ class SecretsScanner:
             '.zip', '.tar', '.gz', '.rar', '.7z',
             '.woff', '.woff2', '.ttf', '.eot',
         }
+
+        # 編譯後的 sensitive_patterns（見 _get_pattern_engine）
+        self._pattern_engine = None
+        self._ruleset = None
     
     def _load_config(self, config_path: Optional[str]) -> dict:
         """載入配置檔案"""
@@ -178,23 +244,64 @@ class SecretsScanner:
         return self.result
     
     def _scan_directory(self, dir_path: Path, verbose: bool = False):
-        """掃描目錄"""
+        """掃描目錄；檔案數夠多且 jobs > 1 時分散到 process pool"""
+        files = list(self._iter_files(dir_path, verbose))
+
+        if self.jobs <= 1 or len(files) < _PARALLEL_MIN_FILES:
+            for file_path in files:
+                self._scan_file(Path(file_path), verbose)
+            return
+
+        batches = [files[i:i + _BATCH_SIZE] for i in range(0, len(files), _BATCH_SIZE)]
+        if self.findings_cache is not None:
+            # worker 會各自開啟同一個快取檔，先把目前的寫入 commit
+            self.findings_cache.flush()
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(batches)),
+            initializer=_init_scan_worker,
+            initargs=(self._worker_template(), verbose),
+        ) as executor:
+            # map 依提交順序回傳，合併結果與單程序掃描相同
+            for batch_result, hits, misses in executor.map(_scan_file_batch, batches):
+                self.result.scanned_files += batch_result.scanned_files
+                self.result.findings.extend(batch_result.findings)
+                self.result.skipped_files.extend(batch_result.skipped_files)
+                if self.findings_cache is not None:
+                    self.findings_cache.hits += hits
+                    self.findings_cache.misses += misses
+
+    def _iter_files(self, dir_path: Path, verbose: bool = False):
+        """以 os.scandir 走訪目錄（依名稱排序），產生要掃描的檔案路徑"""
         self.result.scanned_dirs += 1
+        try:
+            entries = sorted(os.scandir(dir_path), key=lambda e: e.name)
+        except OSError as e:
+            if verbose:
+                print(f"  ⚠️  無法讀取目錄: {dir_path} ({e})")
+            return
         
-        for item in dir_path.iterdir():
-            if item.is_dir():
-                if item.name in self.skip_dirs:
+        for entry in entries:
+            if entry.is_dir():
+                if entry.name in self.skip_dirs:
                     if verbose:
-                        print(f"  ⏭️  跳過目錄: {item}")
+                        print(f"  ⏭️  跳過目錄: {entry.path}")
                     continue
-                self._scan_directory(item, verbose)
-            elif item.is_file():
-                self._scan_file(item, verbose)
+                yield from self._iter_files(Path(entry.path), verbose)
+            elif entry.is_file():
+                yield entry.path
+
+    def _worker_template(self) -> 'SecretsScanner':
+        """複製一份不含掃描結果的掃描器，傳給 worker"""
+        template = copy.copy(self)
+        template.result = ScanResult()
+        template._pattern_engine = None
+        template.jobs = 1
+        return template
     
     def _scan_file(self, file_path: Path, verbose: bool = False):
         """掃描單一檔案"""
         # 檢查是否應該跳過
-        if file_path.suffix.lower() in self.skip_extensions:
+        if file_path.suffix.lower() in self.skip_extensions and not is_binary_scannable(file_path):
             self.result.skipped_files.append(str(file_path))
             return
         
@@ -215,42 +322,235 @@ class SecretsScanner:
             print(f"  📄 掃描: {file_path}")
         
         try:
-            # 讀取檔案內容
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                lines = content.split('\n')
-            
-            # 根據檔案類型進行特殊處理
-            if file_path.suffix.lower() in ('.yml', '.yaml'):
-                self._scan_yaml_file(file_path, content)
-            elif file_path.suffix.lower() == '.json':
-                self._scan_json_file(file_path, content)
-            elif file_path.name == 'Dockerfile':
-                self._scan_dockerfile(file_path, content)
-            elif file_path.name == 'docker-compose.yml':
-                self._scan_docker_compose(file_path, content)
-            
-            # 掃描敏感模式
-            self._scan_patterns(file_path, lines)
+            kind = self._content_kind(file_path)
+            if self.findings_cache is not None:
+                self._scan_file_cached(file_path, kind)
+            else:
+                self._scan_file_content(file_path, kind)
             
         except Exception as e:
             if verbose:
                 print(f"  ⚠️  無法讀取: {file_path} ({e})")
             self.result.skipped_files.append(str(file_path))
     
-    def _scan_patterns(self, file_path: Path, lines: List[str]):
-        """掃描敏感模式"""
-        for line_num, line in enumerate(lines, 1):
-            for pattern, severity, category in self.sensitive_patterns:
-                matches = re.findall(pattern, line, re.IGNORECASE)
-                for match in matches:
+    def _content_kind(self, file_path: Path) -> str:
+        """依檔名與大小決定要套用的處理（也是掃描快取 key 的一部分）"""
+        if file_path.suffix.lower() in self.skip_extensions:
+            return 'binary'
+        if should_stream(file_path):
+            return 'stream'
+        if file_path.suffix.lower() in ('.yml', '.yaml'):
+            return 'yaml'
+        if file_path.suffix.lower() == '.json':
+            return 'json'
+        if file_path.name == 'Dockerfile':
+            return 'dockerfile'
+        if file_path.name == 'docker-compose.yml':
+            return 'docker-compose'
+        return 'text'
+
+    def _scan_file_content(self, file_path: Path, kind: str):
+        """讀取並掃描檔案；大型檔案以 mmap 串流掃描，不整個讀進記憶體"""
+        if kind == 'binary':
+            self._scan_binary_file(file_path)
+            return
+        if kind == 'stream':
+            self._scan_large_file(file_path)
+            return
+        # 讀取檔案內容
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        self._scan_content(file_path, kind, content)
+
+    def _scan_large_file(self, file_path: Path):
+        """以 bytes regex 在 mmap 上分段掃描 sensitive_patterns
+
+        行號由換行數推算；不解析 YAML/JSON 結構。
+        """
+        rules = self._get_pattern_engine()
+        byte_patterns = self._get_byte_patterns()
+        for m in iter_file_matches(file_path, byte_patterns):
+            match = m.text
+            if self._is_false_positive(match, m.line):
+                continue
+            _, severity, category, _ = rules[m.index]
+            self.result.findings.append(Finding(
+                file_path=str(file_path),
+                line_number=m.line_number,
+                severity=severity,
+                category=category,
+                description=f'發現敏感內容',
+                matched_content=match[:50] + ('...' if len(match) > 50 else ''),
+                suggestion='請移除或替換此敏感內容'
+            ))
+
+    def _scan_binary_file(self, file_path: Path):
+        """在壓縮檔成員與二進位檔的原始位元組中搜尋 flag
+
+        鑑識題常刻意把 flag 藏在附件裡，因此 flag 命中列為 HIGH 而非
+        CRITICAL；壓縮檔內出現 solve.py、flag.txt 等敏感檔名則視為誤放解答，
+        列為 CRITICAL。
+        """
+        result = BinaryScanner(self.flag_prefix, self.binary_budget).scan_path(file_path)
+
+        for member in result.members:
+            name = member.rsplit('!', 1)[-1].rsplit('/', 1)[-1]
+            if name in self.sensitive_filenames:
+                self.result.findings.append(Finding(
+                    file_path=f'{file_path}!{member}',
+                    line_number=0,
+                    severity=Severity.CRITICAL,
+                    category='敏感檔案',
+                    description=f'壓縮檔內含敏感檔案: {name}',
+                    suggestion='此檔案不應該出現在公開附件中'
+                ))
+
+        for hit in result.hits:
+            encoded = hit.encoding not in ('raw', 'utf-16-le', 'utf-16-be')
+            self.result.findings.append(Finding(
+                file_path=str(file_path) if hit.member is None else f'{file_path}!{hit.member}',
+                line_number=0,
+                severity=Severity.MEDIUM if encoded else Severity.HIGH,
+                category='Flag 洩漏',
+                description=f'二進位內容中發現 Flag ({hit.encoding}, offset {hit.offset})',
+                matched_content=hit.preview[:50] + ('...' if len(hit.preview) > 50 else ''),
+                suggestion='若非題目刻意藏放的 flag，請從附件中移除'
+            ))
+
+        if result.truncated:
+            self.result.findings.append(Finding(
+                file_path=str(file_path),
+                line_number=0,
+                severity=Severity.INFO,
+                category='二進位掃描',
+                description=f'超過掃描上限 {self.binary_budget // (1024 * 1024)} MiB，僅掃描部分內容',
+                suggestion='可用 --binary-budget 提高上限'
+            ))
+
+    def _scan_content(self, file_path: Path, kind: str, content: str):
+        """掃描檔案內容，結果加入 self.result.findings"""
+        # 根據檔案類型進行特殊處理
+        if kind == 'yaml':
+            self._scan_yaml_file(file_path, content)
+        elif kind == 'json':
+            self._scan_json_file(file_path, content)
+        elif kind == 'dockerfile':
+            self._scan_dockerfile(file_path, content)
+        elif kind == 'docker-compose':
+            self._scan_docker_compose(file_path, content)
+
+        # 掃描敏感模式
+        self._scan_patterns(file_path, content)
+
+    def _scan_file_cached(self, file_path: Path, kind: str):
+        """透過 findings_cache 掃描；內容與規則集都未變時直接重播結果
+
+        每筆結果另外記錄 file_path 之後的部分（壓縮檔成員的 !member），重播時
+        接回目前的路徑。
+        """
+        def scan() -> List[list]:
+            start = len(self.result.findings)
+            self._scan_file_content(file_path, kind)
+            prefix = len(str(file_path))
+            rows = [
+                [f.file_path[prefix:], f.line_number, f.severity.value, f.category,
+                 f.description, f.matched_content, f.suggestion]
+                for f in self.result.findings[start:]
+            ]
+            del self.result.findings[start:]
+            return rows
+
+        rows = self.findings_cache.load(file_path, kind, self.ruleset_version(), scan)
+        for member, line_number, severity, category, description, matched_content, suggestion in rows:
+            self.result.findings.append(Finding(
+                file_path=f'{file_path}{member}',
+                line_number=line_number,
+                severity=Severity(severity),
+                category=category,
+                description=description,
+                matched_content=matched_content,
+                suggestion=suggestion,
+            ))
+
+    def ruleset_version(self) -> str:
+        """目前規則集的版本雜湊（sensitive_patterns、敏感欄位與檔名、flag_prefix、
+        二進位掃描上限、掃描器原始碼）"""
+        key = (
+            tuple((p, sev.value, cat) for p, sev, cat in self.sensitive_patterns),
+            tuple(sorted(self.sensitive_yaml_fields)),
+            tuple(sorted(self.sensitive_filenames)),
+            self.flag_prefix,
+            self.binary_budget,
+        )
+        if self._ruleset is None or self._ruleset[0] != key:
+            payload = json.dumps([_SCANNER_SOURCE_HASH, key], ensure_ascii=False)
+            self._ruleset = (key, hashlib.sha256(payload.encode('utf-8')).hexdigest())
+        return self._ruleset[1]
+
+    def _get_pattern_engine(self):
+        """編譯 sensitive_patterns；清單內容改變時自動重新編譯
+
+        回傳 [(regex, severity, category, trigger), ...]，trigger 見 pattern_prefilter。
+        """
+        key = tuple(self.sensitive_patterns)
+        if self._pattern_engine is None or self._pattern_engine[0] != key:
+            rules = [
+                (re.compile(p, re.IGNORECASE), sev, cat, pattern_trigger(p))
+                for p, sev, cat in key
+            ]
+            self._pattern_engine = (key, rules, None)
+        return self._pattern_engine[1]
+
+    def _get_byte_patterns(self):
+        """串流掃描用的 bytes 版 sensitive_patterns（無法轉換的項目為 None）"""
+        self._get_pattern_engine()
+        key, rules, byte_patterns = self._pattern_engine
+        if byte_patterns is None:
+            byte_patterns = [compile_bytes_pattern(p) for p, _, _ in key]
+            self._pattern_engine = (key, rules, byte_patterns)
+        return byte_patterns
+
+    def _scan_patterns(self, file_path: Path, content: str):
+        """掃描敏感模式
+
+        每個 pattern 先以必含的字面字串（AKIA、-----BEGIN、eyJ、CTF{、://
+        ...）或字元連續段對整個檔案做一次預篩，只對候選行套用該 pattern；
+        找到的匹配與逐行 × 逐 pattern 比對相同，但 matched_content 一律是整段
+        匹配（m.group(0)），不再是 re.findall 回傳的捕獲群組內容。ASCII 內容
+        直接以 str.find 預篩，沒有命中的行不會進入 Python 迴圈。
+        """
+        rules = self._get_pattern_engine()
+        newlines = [m.start() for m in re.finditer('\n', content)]
+        line_count = len(newlines) + 1
+
+        is_ascii = content.isascii()
+        lowered = content.lower() if is_ascii else None
+        masks = {}
+
+        candidates: Dict[int, List[int]] = {}
+        for rule_idx, (_, _, _, trigger) in enumerate(rules):
+            if trigger is None:
+                lines = range(line_count)
+            else:
+                lines = self._trigger_lines(trigger, content, lowered, masks, newlines)
+            for line_idx in lines:
+                candidates.setdefault(line_idx, []).append(rule_idx)
+
+        for line_idx in sorted(candidates):
+            start = newlines[line_idx - 1] + 1 if line_idx > 0 else 0
+            end = newlines[line_idx] if line_idx < len(newlines) else len(content)
+            line = content[start:end]
+            for rule_idx in candidates[line_idx]:
+                regex, severity, category, _ = rules[rule_idx]
+                for m in regex.finditer(line):
+                    match = m.group(0)
                     # 排除明顯的假陽性
                     if self._is_false_positive(match, line):
                         continue
                     
                     self.result.findings.append(Finding(
                         file_path=str(file_path),
-                        line_number=line_num,
+                        line_number=line_idx + 1,
                         severity=severity,
                         category=category,
                         description=f'發現敏感內容',
@@ -258,6 +558,34 @@ class SecretsScanner:
                         suggestion='請移除或替換此敏感內容'
                     ))
     
+    def _trigger_lines(self, trigger: Trigger, content: str, lowered: Optional[str],
+                       masks: Dict[str, str], newlines: List[int]) -> Set[int]:
+        """回傳包含 trigger 的行號（從 0 起算）；每行只找第一個命中"""
+        if lowered is not None:
+            if trigger.mask_key is None:
+                haystack = lowered
+            else:
+                haystack = masks.get(trigger.mask_key)
+                if haystack is None:
+                    haystack = masks[trigger.mask_key] = content.translate(trigger.table)
+
+            def search(pos: int) -> int:
+                return haystack.find(trigger.needle, pos)
+        else:
+            def search(pos: int) -> int:
+                m = trigger.finder.search(content, pos)
+                return m.start() if m else -1
+
+        lines = set()
+        pos = search(0)
+        while pos != -1:
+            line_idx = bisect.bisect_left(newlines, pos)
+            lines.add(line_idx)
+            if line_idx >= len(newlines):
+                break
+            pos = search(newlines[line_idx] + 1)
+        return lines
+
     def _is_false_positive(self, match: str, line: str) -> bool:
         """檢查是否為假陽性"""
         # 檢查是否為範例或佔位符
@@ -532,11 +860,20 @@ def main():
                        help='發現 HIGH 等級問題時返回非零結果碼')
     parser.add_argument('--fail-on-critical', action='store_true', default=True,
                        help='發現 CRITICAL 等級問題時返回非零結果碼 (預設)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='平行掃描的 worker 數 (預設: CPU 核心數，1 為單程序)')
+    parser.add_argument('--incremental', action='store_true',
+                       help=f'使用掃描結果快取，只重新掃描有變動的檔案 ({DEFAULT_CACHE_PATH})')
+    parser.add_argument('--binary-budget', type=int,
+                       default=binary_scan.DEFAULT_BUDGET // (1024 * 1024), metavar='MIB',
+                       help='壓縮檔、圖片等二進位檔每個檔案最多讀取的 MiB 數 (預設: %(default)s)')
     
     args = parser.parse_args()
     
     # 初始化掃描器
-    scanner = SecretsScanner(args.config)
+    findings_cache = FindingsCache() if args.incremental else None
+    scanner = SecretsScanner(args.config, jobs=args.jobs, findings_cache=findings_cache,
+                             binary_budget=args.binary_budget * 1024 * 1024)
     
     if not args.quiet:
         print("🔍 CTF Secrets Scanner")
@@ -544,7 +881,14 @@ def main():
         print("")
     
     # 執行掃描
-    result = scanner.scan(args.path, args.verbose)
+    try:
+        result = scanner.scan(args.path, args.verbose)
+    finally:
+        if findings_cache is not None:
+            findings_cache.prune(scanner.ruleset_version())
+            findings_cache.close()
+    if findings_cache is not None and not args.quiet:
+        print(findings_cache.summary())
     
     # 生成報告
     report = scanner.generate_report(args.format)
@@ -0,0 +1,99 @@
+"""靜態網站搜尋頁（search.html）使用的預先建置倒排索引。
+
+Shared by generate-pages.py.
+
+- tokenize()：NFKC 正規化並轉小寫；英數字（含拉丁字母）以連續字元為一個詞，
+  查詢時以前綴比對；中日韓文字沒有空白分詞，每個字與相鄰兩字（bigram）都是
+  一個詞，查詢兩個字以上時以 bigram 完整比對，單一個字時比對該字；
+- 依詞的第一個字元分片（shard_key()），瀏覽器只下載查詢詞所在的分片，題目
+  數量增加時，第一次輸入需要下載與比對的資料量不會跟著整個網站成長；
+- 每個詞的 posting 為攤平的 [題目編號, 權重, 題目編號, 權重, ...]，權重依欄位
+  加總（標題 > 標籤 > 作者、分類 > 描述），題目編號即 search.html 中卡片的順序。
+
+templates/pages/search.js.j2 以相同規則切詞與分片，修改時兩邊
+需保持一致。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List
+
+# 欄位權重；同一個詞出現在多個欄位時權重相加
+FIELD_WEIGHTS = {
+    'title': 8,
+    'tags': 4,
+    'author': 2,
+    'category': 2,
+    'description': 1,
+}
+
+# 非英數字開頭的詞依第一個字元的 code point 分到這麼多個分片
+SHARD_BUCKETS = 64
+
+_WORD = r'[0-9a-z\u00c0-\u024f]+'
+_CJK = r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+'
+_TOKEN_RE = re.compile(f'{_WORD}|{_CJK}')
+_WORD_RE = re.compile(_WORD)
+_ASCII_SHARDS = frozenset('0123456789abcdefghijklmnopqrstuvwxyz')
+
+
+def normalize(text: Any) -> str:
+    """全形英數字轉半形並轉小寫"""
+    return unicodedata.normalize('NFKC', str(text)).lower()
+
+
+def tokenize(text: Any) -> List[str]:
+    """切詞：英數字為整個詞，中日韓文字為單字與相鄰兩字"""
+    tokens: List[str] = []
+    for run in _TOKEN_RE.findall(normalize(text)):
+        if _WORD_RE.fullmatch(run):
+            tokens.append(run)
+        else:
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def shard_key(token: str) -> str:
+    """詞所在的分片；以第一個字元決定，前綴相同的詞一定在同一個分片"""
+    first = token[0]
+    if first in _ASCII_SHARDS:
+        return first
+    return f'u{ord(first) % SHARD_BUCKETS:02x}'
+
+
+class SearchIndex:
+    """依分片存放的倒排索引"""
+
+    def __init__(self, shards: Dict[str, Dict[str, List[int]]]):
+        self.shards = shards
+
+    @classmethod
+    def build(cls, docs: Iterable[Dict[str, Any]]) -> 'SearchIndex':
+        """docs 依題目編號排列，每筆為 FIELD_WEIGHTS 中欄位的值（字串或字串清單）"""
+        shards: Dict[str, Dict[str, List[int]]] = {}
+        for doc_id, doc in enumerate(docs):
+            weights: Dict[str, int] = {}
+            for field_name, weight in FIELD_WEIGHTS.items():
+                value = doc.get(field_name) or ''
+                if isinstance(value, (list, tuple)):
+                    value = ' '.join(str(v) for v in value)
+                for token in set(tokenize(value)):
+                    weights[token] = weights.get(token, 0) + weight
+            for token in sorted(weights):
+                shards.setdefault(shard_key(token), {}).setdefault(token, []).extend((doc_id, weights[token]))
+        return cls(shards)
+
+    def shard_json(self, key: str) -> str:
+        """分片內容（依詞排序的精簡 JSON）"""
+        return json.dumps(dict(sorted(self.shards[key].items())), ensure_ascii=False, separators=(',', ':'))
+
+    def manifest(self) -> Dict[str, str]:
+        """{分片: 內容雜湊}；搜尋頁以雜湊作為快取版本，只有內容改變的分片需要重新下載"""
+        return {
+            key: hashlib.sha256(self.shard_json(key).encode('utf-8')).hexdigest()[:12]
+            for key in sorted(self.shards)
+        }
@@ -0,0 +1,176 @@
+"""靜態網站的資源處理：壓縮 CSS / JS、以內容雜湊命名、預先壓縮。
+
+Shared by generate-pages.py and build-static-assets.py.
+
+- minify()：CSS 以 cssmin、JS 以 jsmin 壓縮；jsmin 預設只把 ' 與 " 視為字串，
+  會把 template literal（`...`）內的空白與 // 當成程式碼處理，所以 ` 也列入；
+- hashed_name()：assets/app.css → assets/app.<內容雜湊>.css。內容改變時網址跟著
+  改變，伺服器可對這些檔案設定一年的 immutable 快取，
+  瀏覽器不必每次重新驗證；
+- precompress()：以 compression.py（與 Web 介面共用的設定）產生 .gz（固定
+  mtime，內容相同時輸出也相同）與 .br（有安裝 brotli 時），供 nginx 的
+  gzip_static / brotli_static 直接送出；
+- build_site()：把整個靜態網站複製到輸出目錄，CSS / JS 壓縮並改成雜湊檔名、
+  改寫 HTML 中的引用，最後預先壓縮；內容相同的檔案不會重寫。
+"""
+from __future__ import annotations
+
+import hashlib
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cssmin
+import jsmin
+
+from build_manifest import copy_if_changed, write_if_changed
+import compression
+
+# 檔名中內容雜湊的長度
+HASH_LENGTH = 10
+
+COMPRESSIBLE_SUFFIXES = frozenset({".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"})
+
+# jsmin 視為字串、內容原樣保留的引號
+_JS_QUOTE_CHARS = "'\"`"
+
+# HTML 中的 href / src 屬性
+_REFERENCE_RE = re.compile(r'''(\b(?:href|src)\s*=\s*)(["'])([^"']*)\2''', re.IGNORECASE)
+
+# 網址拆成路徑與查詢字串 / 錨點
+_URL_RE = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+
+
+def minify(text: str, suffix: str) -> str:
+    """壓縮 .css / .js 的內容；其他類型原樣回傳"""
+    if suffix == ".css":
+        return cssmin.cssmin(text)
+    if suffix == ".js":
+        return jsmin.jsmin(text, quote_chars=_JS_QUOTE_CHARS)
+    return text
+
+
+def hashed_name(rel: str, data: bytes) -> str:
+    """在副檔名前插入內容雜湊：assets/app.css → assets/app.0123456789.css"""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    stem, dot, suffix = rel.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{rel}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def precompress(rel: str, data: bytes) -> Dict[str, bytes]:
+    """{副檔名: 壓縮後內容}；不可壓縮、太小或壓縮後沒有變小時不產生"""
+    if posixpath.splitext(rel)[1] not in COMPRESSIBLE_SUFFIXES or len(data) < compression.MIN_COMPRESS_SIZE:
+        return {}
+    variants = {
+        compression.PRECOMPRESSED_SUFFIXES[encoding]: compression.compress(data, encoding, gzip_level=9)
+        for encoding in compression.available_encodings()
+    }
+    return {suffix: blob for suffix, blob in variants.items() if len(blob) < len(data)}
+
+
+def rewrite_references(html: str, html_rel: str, assets: Dict[str, str]) -> str:
+    """把 html_rel 中指向 assets（原始路徑 → 雜湊路徑）的相對引用換成雜湊路徑"""
+    base = posixpath.dirname(html_rel)
+
+    def replace(match: re.Match) -> str:
+        url = match.group(3)
+        path, rest = _URL_RE.match(url).groups()
+        if not path or path.startswith("/") or ":" in path:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target not in assets:
+            return match.group(0)
+        new = posixpath.relpath(assets[target], base or ".")
+        return f"{match.group(1)}{match.group(2)}{new}{rest}{match.group(2)}"
+
+    return _REFERENCE_RE.sub(replace, html)
+
+
+@dataclass
+class SiteReport:
+    """build_site() 的結果"""
+    assets: Dict[str, str] = field(default_factory=dict)  # 原始路徑 → 雜湊路徑
+    written: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)
+
+
+def _site_files(root: Path) -> List[str]:
+    """root 下所有檔案的相對路徑（略過 . 開頭的檔案與目錄）"""
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob("*")
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(root).parts)
+    )
+
+
+def build_site(src: Path, dst: Path, compress: bool = True) -> SiteReport:
+    """把靜態網站 src 建置到 dst。
+
+    - .css / .js 壓縮後改成雜湊檔名（檔名已含 .min. 的檔案不再壓縮，只加雜湊）；
+    - .html 中指向這些檔案的 href / src 改成雜湊檔名；HTML 本身不改名，網址不變；
+    - 其他檔案原樣複製（保留 mtime）；
+    - compress 時替可壓縮的檔案產生 .gz / .br；
+    - dst 中不屬於這次輸出的檔案（舊版雜湊檔名等）會被刪除。
+    """
+    src, dst = Path(src).resolve(), Path(dst).resolve()
+    if not src.is_dir():
+        raise FileNotFoundError(f"找不到網站目錄: {src}")
+    if dst == src or src in dst.parents or dst in src.parents:
+        raise ValueError(f"輸出目錄不可與來源目錄重疊: {dst}")
+
+    report = SiteReport()
+    files = _site_files(src)
+    outputs: Dict[str, Optional[bytes]] = {}  # None：原樣複製的檔案
+    for rel in files:
+        suffix = posixpath.splitext(rel)[1]
+        if suffix in (".css", ".js"):
+            text = (src / rel).read_text(encoding="utf-8")
+            if ".min." not in posixpath.basename(rel):
+                text = minify(text, suffix)
+            data = text.encode("utf-8")
+            report.assets[rel] = hashed_name(rel, data)
+            outputs[report.assets[rel]] = data
+    for rel in files:
+        if posixpath.splitext(rel)[1] == ".html":
+            html = (src / rel).read_text(encoding="utf-8")
+            outputs[rel] = rewrite_references(html, rel, report.assets).encode("utf-8")
+
+    live = set()
+    for rel, data in outputs.items():
+        live.add(rel)
+        _record(report, rel, write_if_changed(dst / rel, data))
+    for rel in files:
+        if rel in report.assets or rel in outputs:
+            continue
+        live.add(rel)
+        _record(report, rel, copy_if_changed(src / rel, dst / rel))
+        outputs[rel] = None
+    if compress:
+        for rel, data in list(outputs.items()):
+            if data is None and posixpath.splitext(rel)[1] in COMPRESSIBLE_SUFFIXES:
+                data = (dst / rel).read_bytes()
+            for suffix, blob in precompress(rel, data or b"").items():
+                live.add(rel + suffix)
+                _record(report, rel + suffix, write_if_changed(dst / (rel + suffix), blob))
+
+    if dst.is_dir():
+        for rel in _site_files(dst):
+            if rel not in live:
+                (dst / rel).unlink()
+                report.removed.append(rel)
+        for path in sorted(dst.rglob("*"), reverse=True):
+            if path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+    return report
+
+
+def _record(report: SiteReport, rel: str, written: bool):
+    if written:
+        report.written.append(rel)
+    else:
+        report.unchanged += 1
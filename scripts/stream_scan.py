@@ -0,0 +1,195 @@
+"""大型檔案的串流掃描：以 mmap 與重疊視窗執行 bytes regex。
+
+Shared by scan-secrets.py and validate-challenge.py.
+
+檔案不會被整個讀進記憶體：regex 直接在 mmap 上以 (pos, endpos) 分段比對，
+每段長度為 chunk_size，並向後多看 overlap 位元組，因此跨越段落邊界、長度
+不超過 overlap 的命中也能完整找到。行號以逐段計算換行數的方式遞增取得。
+
+每段比對前先以 pattern_prefilter 的必含片段做 bytes.find 預篩，區段內沒有
+該片段的 pattern 不會執行；已掃過的 mmap 頁面會以 madvise 釋放，常駐記憶體
+維持在數個 chunk 左右。
+
+bytes regex 的 IGNORECASE 與 \\s、\\w 等只涵蓋 ASCII；對鑑識映像、記憶體傾印
+這類以 ASCII 字串為主的大檔而言已足夠。
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Pattern
+
+from pattern_prefilter import Trigger, pattern_trigger
+
+# 超過此大小的檔案改用串流掃描
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+# 每段比對的長度
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# 段落之間的重疊長度，也是保證能完整比對的最大命中長度
+OVERLAP = 64 * 1024
+
+# 取得命中所在行時，前後最多各看多少位元組
+LINE_CONTEXT = 4096
+
+
+@dataclass
+class ByteMatch:
+    """串流掃描的一筆命中。"""
+    index: int          # 命中的 pattern 在清單中的位置
+    start: int          # 檔案內的位元組偏移
+    end: int
+    line_number: int
+    text: str           # 命中內容（UTF-8 解碼，忽略無法解碼的位元組）
+    line: str           # 命中所在行（最多 LINE_CONTEXT 位元組的前後文）
+
+
+@dataclass
+class BytePattern:
+    """串流掃描用的 bytes regex 與其預篩條件。"""
+    regex: Pattern[bytes]
+    trigger: Optional[Trigger] = None
+
+    def may_match(self, lowered: bytes, window: bytes, masks: Dict[str, bytes]) -> bool:
+        """區段內是否可能有命中；lowered 為 window.lower()。"""
+        if self.trigger is None:
+            return True
+        if self.trigger.mask_key is None:
+            return self.trigger.byte_needle in lowered
+        mask = masks.get(self.trigger.mask_key)
+        if mask is None:
+            mask = masks[self.trigger.mask_key] = window.translate(self.trigger.byte_table)
+        return self.trigger.byte_needle in mask
+
+
+def compile_bytes_pattern(pattern: str, flags: int = re.IGNORECASE) -> Optional[BytePattern]:
+    """把 str regex 轉成 bytes regex；含非 ASCII 字元或無法編譯時回傳 None。"""
+    try:
+        regex = re.compile(pattern.encode("ascii"), flags)
+    except (UnicodeEncodeError, re.error):
+        return None
+    return BytePattern(regex, pattern_trigger(pattern))
+
+
+def should_stream(path: Path, threshold: Optional[int] = None) -> bool:
+    """檔案大小超過門檻（預設 STREAM_THRESHOLD）時回傳 True。"""
+    if threshold is None:
+        threshold = STREAM_THRESHOLD
+    try:
+        return os.path.getsize(path) > threshold
+    except OSError:
+        return False
+
+
+class _LineCounter:
+    """依遞增的偏移量計算行號，每次最多複製 CHUNK_SIZE 位元組。"""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+        self.line = 1
+
+    def line_at(self, offset: int) -> int:
+        while self.pos < offset:
+            step = min(offset, self.pos + CHUNK_SIZE)
+            self.line += self.buf[self.pos:step].count(b"\n")
+            self.pos = step
+        return self.line
+
+
+def _line_around(buf, size: int, start: int, end: int) -> str:
+    line_start = buf.rfind(b"\n", max(0, start - LINE_CONTEXT), start) + 1
+    if line_start == 0:
+        line_start = max(0, start - LINE_CONTEXT)
+    line_end = buf.find(b"\n", end, min(size, end + LINE_CONTEXT))
+    if line_end == -1:
+        line_end = min(size, end + LINE_CONTEXT)
+    return buf[line_start:line_end].decode("utf-8", errors="ignore")
+
+
+def _window_matches(buf, patterns, next_pos, window_start, window_end, search_end):
+    """比對一個視窗，回傳依偏移排序的 (start, index, end)。
+
+    獨立成函式，讓 Match 物件（持有 buffer 參照）在回傳時就被釋放，
+    呼叫端中途停止迭代時 mmap 才能正常關閉。
+    """
+    window = buf[window_start:search_end]
+    lowered = window.lower()
+    masks: Dict[str, bytes] = {}
+    found = []
+    for index, pattern in enumerate(patterns):
+        if pattern is None or not pattern.may_match(lowered, window, masks):
+            continue
+        pos = max(window_start, next_pos[index])
+        for m in pattern.regex.finditer(buf, pos, search_end):
+            if m.start() >= window_end:
+                break
+            found.append((m.start(), index, m.end()))
+            # 空字串命中時也要前進，避免下一段重複回報
+            next_pos[index] = max(m.end(), m.start() + 1)
+    found.sort()
+    return found
+
+
+def _release(buf, start: int, end: int) -> int:
+    """通知核心 [start, end) 的 mmap 頁面不再需要；回傳實際釋放到的位置。"""
+    end -= end % mmap.PAGESIZE
+    if end <= start or not hasattr(buf, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+        return start
+    try:
+        buf.madvise(mmap.MADV_DONTNEED, start, end - start)
+    except OSError:
+        return start
+    return end
+
+
+def iter_buffer_matches(
+    buf,
+    patterns: List[Optional[BytePattern]],
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+) -> Iterator[ByteMatch]:
+    """在 bytes-like 緩衝區（通常是 mmap）上依偏移順序產生所有命中。
+
+    patterns 中為 None 的項目會被略過；同一 pattern 的命中不會重疊。
+    """
+    size = len(buf)
+    lines = _LineCounter(buf)
+    next_pos = [0] * len(patterns)
+    released = 0
+    window_start = 0
+    while window_start < size:
+        window_end = min(size, window_start + chunk_size)
+        search_end = min(size, window_end + overlap)
+        found = _window_matches(buf, patterns, next_pos, window_start, window_end, search_end)
+        for start, index, end in found:
+            yield ByteMatch(
+                index=index,
+                start=start,
+                end=end,
+                line_number=lines.line_at(start),
+                text=buf[start:end].decode("utf-8", errors="ignore"),
+                line=_line_around(buf, size, start, end),
+            )
+        # 行號計算與頁面釋放都跟著視窗前進，不必回頭讀已釋放的頁面
+        lines.line_at(window_end)
+        released = _release(buf, released, window_end - LINE_CONTEXT)
+        window_start = window_end
+
+
+def iter_file_matches(
+    path: Path,
+    patterns: List[Optional[BytePattern]],
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = OVERLAP,
+) -> Iterator[ByteMatch]:
+    """以 mmap 開啟 path，依偏移順序產生所有命中。"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_buffer_matches(mm, patterns, chunk_size, overlap)
@@ -2,6 +2,9 @@
 """
 同步到公開倉庫腳本
 用於將私有開發倉庫的安全內容同步到公開發布倉庫
+
+重複執行時以 build_manifest 做增量同步：public.yml 與 allowed_files 都沒變的
+題目不會重寫，已刪除或不再發布的題目會從公開目錄移除。
 """
 
 import argparse
@@ -13,12 +16,23 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from build_manifest import BuildManifest, copy_if_changed, settings_key
+from hashing import source_hash
+
+# 同步程式的原始碼雜湊；程式邏輯改變時所有題目都會重新同步
+_SYNC_SOURCE_HASH = source_hash(__file__)
+
 class PublicSync:
     def __init__(self, config_path="config.yml"):
         """初始化同步器"""
         self.config = self.load_config(config_path)
         self.public_dir = Path("public-release")
         self.challenges_dir = Path("challenges")
+        self.manifest = None
+        self.changed = False
+        self.settings = settings_key(
+            _SYNC_SOURCE_HASH, self.config.get('project', {}).get('flag_prefix', 'CTF')
+        )
         
     def load_config(self, config_path):
         """載入配置檔案"""
@@ -29,9 +43,13 @@ class PublicSync:
         """準備公開發布目錄"""
         print("📁 準備公開發布目錄...")
         
-        # 清理並重新建立公開目錄
-        if self.public_dir.exists():
+        # 有上次同步的 manifest 時沿用現有內容（增量同步），否則清理並重新建立
+        self.manifest = BuildManifest.load(self.public_dir, "sync")
+        if self.manifest.entries:
+            print("♻️  沿用現有公開目錄，只同步有變動的題目")
+        elif self.public_dir.exists():
             shutil.rmtree(self.public_dir)
+            self.changed = True
         self.public_dir.mkdir(exist_ok=True)
         
         # 建立基本目錄結構
@@ -45,8 +63,13 @@ class PublicSync:
         challenge_path = Path(challenge_path)
         public_yml_path = challenge_path / "public.yml"
         
+        # 計算相對路徑
+        relative_path = challenge_path.relative_to(self.challenges_dir.parent)
+        key = relative_path.as_posix()
+
         if not public_yml_path.exists():
             print(f"⚠️  跳過 {challenge_path}：沒有 public.yml")
+            self._forget(key)
             return False
         
         # 載入 public.yml
@@ -56,41 +79,66 @@ class PublicSync:
         # 檢查是否準備好發布
         if not public_config.get('ready_for_release', False):
             print(f"⚠️  跳過 {challenge_path}：尚未準備好發布")
+            self._forget(key)
             return False
         
+        inputs = None
+        if self.manifest is not None:
+            sources = ['public.yml'] + [
+                str(p.relative_to(challenge_path)) for p in self._allowed_sources(challenge_path, public_config)
+            ]
+            inputs = self.manifest.hash_inputs(key, challenge_path, sources)
+            if self.manifest.is_fresh(key, inputs, self.settings):
+                print(f"⏭️  未變動: {challenge_path}")
+                return True
+
         print(f"📦 同步題目: {challenge_path}")
+        self.changed = True
         
-        # 計算相對路徑
-        relative_path = challenge_path.relative_to(self.challenges_dir.parent)
         public_challenge_path = self.public_dir / relative_path
         public_challenge_path.mkdir(parents=True, exist_ok=True)
         
         # 同步允許的檔案
-        self.sync_allowed_files(challenge_path, public_challenge_path, public_config)
+        copied = self.sync_allowed_files(challenge_path, public_challenge_path, public_config)
         
         # 生成公開的題目描述
         self.generate_public_readme(challenge_path, public_challenge_path, public_config)
         
+        if self.manifest is not None:
+            outputs = [f"{key}/", f"{key}/README.md"] + [f"{key}/{rel.as_posix()}" for rel in copied]
+            self.manifest.record(key, inputs, self.settings, outputs)
+            self.manifest.save()
+
         return True
     
-    def sync_allowed_files(self, source_path, target_path, public_config):
-        """同步允許的檔案"""
-        allowed_files = public_config.get('allowed_files', [])
-        
-        for file_pattern in allowed_files:
-            # 使用 glob 匹配檔案
+    def _allowed_sources(self, source_path, public_config):
+        """allowed_files 對應到的來源檔案"""
+        for file_pattern in public_config.get('allowed_files', []):
             for file_path in source_path.glob(file_pattern):
                 if file_path.is_file():
-                    # 計算相對路徑
-                    relative_file = file_path.relative_to(source_path)
-                    target_file = target_path / relative_file
-                    
-                    # 建立目標目錄
-                    target_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # 複製檔案
-                    shutil.copy2(file_path, target_file)
-                    print(f"  📄 複製: {relative_file}")
+                    yield file_path
+
+    def _forget(self, key):
+        """移除不再發布的題目在公開目錄中的輸出"""
+        if self.manifest is not None and key in self.manifest.entries:
+            print(f"🗑️  移除公開輸出: {key}")
+            self.manifest.forget(key)
+            self.manifest.save()
+            self.changed = True
+
+    def sync_allowed_files(self, source_path, target_path, public_config):
+        """同步允許的檔案，回傳複製的相對路徑"""
+        copied = []
+        for file_path in self._allowed_sources(source_path, public_config):
+            # 計算相對路徑
+            relative_file = file_path.relative_to(source_path)
+            target_file = target_path / relative_file
+
+            # 複製檔案（大小與 mtime 相同時略過）
+            if copy_if_changed(file_path, target_file):
+                print(f"  📄 複製: {relative_file}")
+            copied.append(relative_file)
+        return copied
     
     def generate_public_readme(self, source_path, target_path, public_config):
         """生成公開的題目 README"""
@@ -204,13 +252,25 @@ class PublicSync:
 本倉庫內容遵循 MIT License 授權條款。
 
 ---
-📅 最後更新：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-🤖 此檔案由 sync-to-public.py 自動生成
 """
         
+        # 題目沒有變動且內容（project 設定、題目列表）相同時沿用現有 README
+        readme_path = self.public_dir / "README.md"
+        body_key = settings_key(readme_content)
+        previous_key = self.manifest.extra.get("summary") if self.manifest is not None else None
+        if not self.changed and previous_key == body_key and readme_path.exists():
+            print("⏭️  題目沒有變動，沿用總體 README")
+            return
+
+        readme_content += f"📅 最後更新：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n"
+        readme_content += "🤖 此檔案由 sync-to-public.py 自動生成\n"
+
         # 寫入公開 README
-        with open(self.public_dir / "README.md", 'w', encoding='utf-8') as f:
+        with open(readme_path, 'w', encoding='utf-8') as f:
             f.write(readme_content)
+        if self.manifest is not None:
+            self.manifest.extra["summary"] = body_key
+            self.manifest.save()
     
     def sync_all_challenges(self):
         """同步所有準備好的題目"""
@@ -220,17 +280,29 @@ class PublicSync:
         total_count = 0
         
         # 遍歷所有題目目錄
-        for challenge_dir in self.challenges_dir.rglob("*/"):
-            if (challenge_dir / "public.yml").exists():
-                total_count += 1
-                if self.sync_challenge(challenge_dir):
-                    synced_count += 1
+        challenge_dirs = sorted(p.parent for p in self.challenges_dir.rglob("public.yml"))
+        for challenge_dir in challenge_dirs:
+            total_count += 1
+            if self.sync_challenge(challenge_dir):
+                synced_count += 1
+
+        # 移除已刪除題目的輸出
+        if self.manifest is not None:
+            live = {d.relative_to(self.challenges_dir.parent).as_posix() for d in challenge_dirs}
+            for key in self.manifest.prune(live):
+                print(f"🗑️  移除公開輸出: {key}")
+                self.changed = True
+            self.manifest.save()
         
         print(f"✅ 同步完成：{synced_count}/{total_count} 個題目")
         return synced_count, total_count
     
-    def create_git_repo(self, public_repo_url=None):
-        """在公開目錄中初始化 Git 倉庫"""
+    def create_git_repo(self, public_repo_url=None, commit_message=None):
+        """在公開目錄中初始化 Git 倉庫；已存在時只提交有變動的檔案"""
+        if (self.public_dir / ".git").exists():
+            self.commit_changes(public_repo_url, commit_message)
+            return
+
         print("🔧 初始化公開倉庫...")
         
         os.chdir(self.public_dir)
@@ -257,7 +329,7 @@ Thumbs.db
         
         # 添加所有檔案
         subprocess.run(['git', 'add', '.'], check=True)
-        subprocess.run(['git', 'commit', '-m', '🎉 Initial public release'], check=True)
+        subprocess.run(['git', 'commit', '-m', commit_message or '🎉 Initial public release'], check=True)
         
         # 設置遠程倉庫
         if public_repo_url:
@@ -269,6 +341,29 @@ Thumbs.db
         
         print("✅ 公開倉庫初始化完成")
     
+    def commit_changes(self, public_repo_url=None, commit_message=None):
+        """在既有的公開倉庫中提交變動（沒有變動時不建立 commit）"""
+        print("🔧 更新公開倉庫...")
+
+        os.chdir(self.public_dir)
+
+        subprocess.run(['git', 'add', '-A', '.'], check=True)
+        status = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True, check=True)
+        if status.stdout.strip():
+            subprocess.run(['git', 'commit', '-m', commit_message or '🔄 Update public release'], check=True)
+            print("✅ 已提交變動")
+        else:
+            print("✅ 沒有變動需要提交")
+
+        if public_repo_url:
+            remotes = subprocess.run(['git', 'remote'], capture_output=True, text=True, check=True)
+            if 'origin' not in remotes.stdout.split():
+                subprocess.run(['git', 'remote', 'add', 'origin', public_repo_url], check=True)
+                print(f"✅ 遠程倉庫已設置：{public_repo_url}")
+
+        # 回到原目錄
+        os.chdir('..')
+
     def run_full_sync(self, public_repo_url=None, commit_message=None):
         """執行完整同步流程"""
         print("🚀 開始完整同步流程...")
@@ -283,7 +378,7 @@ Thumbs.db
         self.generate_public_summary()
         
         # 4. 初始化 Git 倉庫
-        self.create_git_repo(public_repo_url)
+        self.create_git_repo(public_repo_url, commit_message)
         
         print(f"🎉 同步完成！同步了 {synced_count}/{total_count} 個題目")
         print(f"📁 公開檔案位於：{self.public_dir.absolute()}")
@@ -8,9 +8,13 @@ from jinja2 import Template
 from datetime import datetime
 import argparse
 
+from challenge_index import get_index
+from metadata_cache import MetadataCache
+
 class ReadmeUpdater:
-    def __init__(self, config_path='config.yml'):
+    def __init__(self, config_path='config.yml', cache=None):
         self.load_config(config_path)
+        self.cache = cache
         self.challenges = {}
         self.stats = {}
         
@@ -29,27 +33,18 @@ class ReadmeUpdater:
             print("⚠️  No challenges directory found")
             return
             
-        for category_dir in challenges_dir.iterdir():
-            if not category_dir.is_dir():
-                continue
-                
-            category = category_dir.name
-            self.challenges[category] = []
+        for category_dir in sorted(challenges_dir.iterdir()):
+            if category_dir.is_dir():
+                self.challenges[category_dir.name] = []
             
-            for challenge_dir in category_dir.iterdir():
-                if not challenge_dir.is_dir():
-                    continue
-                    
-                public_yml = challenge_dir / 'public.yml'
-                if public_yml.exists():
-                    try:
-                        with open(public_yml, 'r', encoding='utf-8') as f:
-                            data = yaml.safe_load(f)
-                            data['folder_name'] = challenge_dir.name
-                            data['path'] = str(challenge_dir)
-                            self.challenges[category].append(data)
-                    except Exception as e:
-                        print(f"⚠️  Error reading {public_yml}: {e}")
+        for record in get_index(challenges_dir, self.cache).scan():
+            if not record.ok:
+                print(f"⚠️  Error reading {record.public_yml}: {record.error}")
+                continue
+            data = record.copy_data()
+            data['folder_name'] = record.name
+            data['path'] = str(record.path)
+            self.challenges.setdefault(record.category, []).append(data)
                         
     def calculate_stats(self):
         """計算統計資訊"""
@@ -362,11 +357,18 @@ def main():
     parser.add_argument('--config', default='config.yml', help='Config file path')
     parser.add_argument('--template', default='templates/README.md.j2', help='README template')
     parser.add_argument('--export-json', action='store_true', help='Export JSON format')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the .ctf-cache metadata cache')
     
     args = parser.parse_args()
     
-    updater = ReadmeUpdater(args.config)
-    updater.collect_challenges()
+    cache = None if args.no_cache else MetadataCache()
+    updater = ReadmeUpdater(args.config, cache=cache)
+    try:
+        updater.collect_challenges()
+    finally:
+        if cache is not None:
+            cache.close()
+            print(cache.summary())
     updater.calculate_stats()
     updater.update_readme(args.template)
     
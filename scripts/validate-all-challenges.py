@@ -1,16 +1,79 @@
 #!/usr/bin/env python3
 # scripts/validate-all-challenges.py
 
+import io
+import os
 import sys
 import yaml
 import argparse
+import importlib.util
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from collections import defaultdict
 
+from challenge_index import get_index
+from metadata_cache import MetadataCache
+
+_VALIDATOR_MODULE = None
+_WORKER_CACHE = None
+
+
+def load_validator_module():
+    """載入 validate-challenge.py（每個行程只載入一次）"""
+    global _VALIDATOR_MODULE
+    if _VALIDATOR_MODULE is None:
+        path = Path(__file__).resolve().parent / 'validate-challenge.py'
+        spec = importlib.util.spec_from_file_location('validate_challenge', str(path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _VALIDATOR_MODULE = module
+    return _VALIDATOR_MODULE
+
+
+def _init_worker(cache_path):
+    """process pool worker 初始化：預先載入驗證器與 metadata 快取"""
+    global _WORKER_CACHE
+    load_validator_module()
+    _WORKER_CACHE = MetadataCache(Path(cache_path)) if cache_path else None
+
+
+def validate_in_process(challenge_path, cache=None):
+    """在目前行程內驗證單個題目，回傳與 validate_single_challenge 相同格式"""
+    module = load_validator_module()
+    validator = module.ChallengeValidator(cache=cache)
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            success = validator.validate_challenge(challenge_path)
+            validator.print_results(Path(challenge_path))
+        return {
+            'success': success,
+            'output': output.getvalue(),
+            'error': ''
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'output': output.getvalue(),
+            'error': str(e)
+        }
+
+
+def _validate_worker(challenge_path):
+    result = validate_in_process(challenge_path, _WORKER_CACHE)
+    if _WORKER_CACHE is not None:
+        _WORKER_CACHE.flush()
+    return result
+
+
 class AllChallengesValidator:
-    def __init__(self, config_path='config.yml'):
+    def __init__(self, config_path='config.yml', cache=None, jobs=None, use_subprocess=False):
         self.load_config(config_path)
+        self.cache = cache
+        self.jobs = jobs or os.cpu_count() or 1
+        self.use_subprocess = use_subprocess
         self.challenges_dir = Path('challenges')
         self.stats = defaultdict(int)
         self.errors = []
@@ -32,31 +95,27 @@ class AllChallengesValidator:
             print(f"❌ 找不到題目目錄：{self.challenges_dir}")
             return challenges
 
-        for category_dir in self.challenges_dir.iterdir():
-            if not category_dir.is_dir():
-                continue
-
-            for challenge_dir in category_dir.iterdir():
-                if not challenge_dir.is_dir():
-                    continue
-                public_yml = challenge_dir / 'public.yml'
-                if public_yml.exists():
-                    challenges.append({
-                        'path': challenge_dir,
-                        'category': category_dir.name,
-                        'name': challenge_dir.name,
-                        'public_yml': public_yml
-                    })
+        for record in get_index(self.challenges_dir, self.cache).scan():
+            challenges.append({
+                'path': record.path,
+                'category': record.category,
+                'name': record.name,
+                'public_yml': record.public_yml,
+                'record': record
+            })
                     
         return challenges
     
     def validate_single_challenge(self, challenge):
         """驗證單個題目"""
         try:
-            result = subprocess.run([
+            cmd = [
                 sys.executable, 'scripts/validate-challenge.py', 
                 str(challenge['path'])
-            ], capture_output=True, text=True, cwd=Path.cwd())
+            ]
+            if self.cache is None:
+                cmd.append('--no-cache')
+            result = subprocess.run(cmd, capture_output=True, text=True, cwd=Path.cwd())
             
             return {
                 'success': result.returncode == 0,
@@ -70,11 +129,35 @@ class AllChallengesValidator:
                 'error': str(e)
             }
     
+    def run_validations(self, challenges):
+        """依序回傳每個題目的驗證結果（順序與 challenges 相同）"""
+        if self.use_subprocess:
+            return (self.validate_single_challenge(c) for c in challenges)
+
+        paths = [str(c['path']) for c in challenges]
+        if self.jobs <= 1 or len(paths) <= 1:
+            return (validate_in_process(p, self.cache) for p in paths)
+
+        if self.cache is not None:
+            # worker 會各自開啟同一個快取檔，先把目前的寫入 commit
+            self.cache.flush()
+        cache_path = str(self.cache.path) if self.cache is not None else None
+        workers = min(self.jobs, len(paths))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache_path,),
+        ) as executor:
+            chunksize = max(1, len(paths) // (workers * 4))
+            return list(executor.map(_validate_worker, paths, chunksize=chunksize))
+
     def analyze_challenge_config(self, challenge):
         """分析題目配置"""
         try:
-            with open(challenge['public_yml'], 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            record = challenge['record']
+            if not record.ok:
+                raise ValueError(record.error)
+            config = record.data
                 
             return {
                 'difficulty': config.get('difficulty', 'unknown'),
@@ -107,10 +190,10 @@ class AllChallengesValidator:
         print()
         
         results = []
-        for i, challenge in enumerate(challenges, 1):
+        validations = self.run_validations(challenges)
+        for i, (challenge, validation_result) in enumerate(zip(challenges, validations), 1):
             print(f"[{i}/{len(challenges)}] 驗證 {challenge['category']}/{challenge['name']}...")
             
-            validation_result = self.validate_single_challenge(challenge)
             config_analysis = self.analyze_challenge_config(challenge)
             
             result = {
@@ -143,6 +226,8 @@ class AllChallengesValidator:
         print(f"📊 總計：{self.stats['total']} 個題目")
         print(f"✅ 通過：{self.stats['valid']} 個")
         print(f"❌ 失敗：{self.stats['invalid']} 個")
+        if self.cache is not None:
+            print(self.cache.summary())
         print()
 
         return self.stats["invalid"] == 0
@@ -151,10 +236,23 @@ class AllChallengesValidator:
 def main():
     parser = argparse.ArgumentParser(description="Validate all CTF challenges")
     parser.add_argument("--config", default="config.yml", help="Config file path")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the .ctf-cache metadata cache")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--subprocess", action="store_true", help="Run validate-challenge.py once per challenge (legacy mode)")
     args = parser.parse_args()
 
-    validator = AllChallengesValidator(args.config)
-    success = validator.validate_all()
+    cache = None if args.no_cache else MetadataCache()
+    validator = AllChallengesValidator(
+        args.config,
+        cache=cache,
+        jobs=args.jobs,
+        use_subprocess=args.subprocess,
+    )
+    try:
+        success = validator.validate_all()
+    finally:
+        if cache is not None:
+            cache.close()
 
     if success:
         print("\n🎉 所有題目驗證通過！")
@@ -8,11 +8,40 @@ import argparse
 import subprocess
 import json
 import re
+from functools import lru_cache
+
+from metadata_cache import MetadataCache
+from stream_scan import compile_bytes_pattern, iter_file_matches, should_stream
+
+CONFIG_PATH = Path(__file__).parent.parent / "config.yml"
+
+
+@lru_cache(maxsize=None)
+def load_flag_prefix(config_path=CONFIG_PATH):
+    """讀取 config.yml 的 flag_prefix（同一行程只解析一次）"""
+    flag_prefix = "is1abCTF"
+    try:
+        if config_path.exists():
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f)
+                flag_prefix = config.get('project', {}).get('flag_prefix', 'is1abCTF')
+    except Exception:
+        pass
+    return flag_prefix
+
 
 class ChallengeValidator:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.errors = []
         self.warnings = []
+        self.cache = cache
+
+    def _load_yaml(self, path):
+        """讀取 YAML；有 metadata 快取時先查快取"""
+        if self.cache is not None:
+            return self.cache.load(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
         
     def validate_challenge(self, challenge_path):
         """驗證單個題目"""
@@ -65,11 +94,10 @@ class ChallengeValidator:
         public_yml = challenge_path / 'public.yml'
         if public_yml.exists():
             try:
-                with open(public_yml, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    challenge_type = data.get('challenge_type', 'static_attachment')
-                    print(f"📝 Detected challenge type: {challenge_type}")
-                    return challenge_type
+                data = self._load_yaml(public_yml)
+                challenge_type = data.get('challenge_type', 'static_attachment')
+                print(f"📝 Detected challenge type: {challenge_type}")
+                return challenge_type
             except yaml.YAMLError as e:
                 self.errors.append(f"YAML parsing error in public.yml: {e}")
                 return None
@@ -110,8 +138,7 @@ class ChallengeValidator:
             return
             
         try:
-            with open(public_yml, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = self._load_yaml(public_yml)
                 
             # 必要欄位檢查
             required_fields = ['title', 'author', 'difficulty', 'category', 'description', 'challenge_type', 'source_code_provided']
@@ -323,15 +350,7 @@ class ChallengeValidator:
     def check_sensitive_data(self, challenge_path):
         """檢查敏感資料 - 強化版本"""
         # 載入 config.yml 獲取 flag_prefix
-        flag_prefix = "is1abCTF"
-        try:
-            config_path = Path(__file__).parent.parent / "config.yml"
-            if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
-                    flag_prefix = config.get('project', {}).get('flag_prefix', 'is1abCTF')
-        except Exception:
-            pass
+        flag_prefix = load_flag_prefix()
         
         # 強化敏感資料模式
         sensitive_patterns = [
@@ -392,12 +411,12 @@ class ChallengeValidator:
         """檢查檔案中的敏感資料 - 強化版本"""
         issues = []
         try:
+            # 大型檔案（鑑識映像、記憶體傾印）以 mmap 串流掃描完整內容
+            if should_stream(file_path):
+                return self.check_large_file_for_sensitive_data(file_path, patterns)
+
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
-            
-            # 檢查檔案大小（避免檢查二進制檔案）
-            if len(content) > 1000000:  # 1MB
-                return issues
                 
             for pattern, severity, description in patterns:
                 matches = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
@@ -440,6 +459,40 @@ class ChallengeValidator:
             self.warnings.append(f"無法檢查 {file_path.name}: {e}")
         
         return issues
+
+    def check_large_file_for_sensitive_data(self, file_path, patterns):
+        """以 bytes regex 分段掃描大型檔案，每個 pattern 最多回報 3 個命中"""
+        issues = []
+        byte_patterns = [
+            compile_bytes_pattern(pattern, re.IGNORECASE | re.MULTILINE)
+            for pattern, _, _ in patterns
+        ]
+        shown = [0] * len(patterns)
+        placeholder_keywords = [
+            'placeholder', 'example', 'fake', 'demo', 'test',
+            'your_flag_here', 'flag_here', 'replace_this'
+        ]
+        for m in iter_file_matches(file_path, byte_patterns):
+            if shown[m.index] >= 3:  # 只顯示前 3 個匹配
+                continue
+            shown[m.index] += 1
+
+            # 整個檔案太大，只檢查命中所在行是否為 placeholder 或註釋
+            line = m.line.lower()
+            stripped = line.strip()
+            if any(keyword in line for keyword in placeholder_keywords):
+                continue
+            if stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*'):
+                continue
+
+            _, severity, description = patterns[m.index]
+            match_preview = m.text[:30] + '...' if len(m.text) > 30 else m.text
+            issue_msg = f"{severity}: {description} 在 {file_path.name} (第 {m.line_number} 行): {match_preview}"
+            if severity == 'CRITICAL':
+                issues.append(issue_msg)
+            else:
+                self.warnings.append(issue_msg)
+        return issues
             
     def validate_all_challenges(self):
         """驗證所有題目"""
@@ -490,15 +543,18 @@ class ChallengeValidator:
         print()
 
 def main():
+    cache = None
     try:
         parser = argparse.ArgumentParser(description='Validate CTF challenges')
         parser.add_argument('path', nargs='?', help='Path to specific challenge (optional)')
         parser.add_argument('--all', action='store_true', help='Validate all challenges')
         parser.add_argument('--pr', type=int, help='PR number to validate')
+        parser.add_argument('--no-cache', action='store_true', help='Do not use the .ctf-cache metadata cache')
         
         args = parser.parse_args()
         
-        validator = ChallengeValidator()
+        cache = None if args.no_cache else MetadataCache()
+        validator = ChallengeValidator(cache=cache)
         
         if args.pr:
             # 取得 PR 變更的檔案
@@ -566,6 +622,9 @@ def main():
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""Web 介面的效能量測（選用，預設關閉）。
+
+Shared by web-interface/app.py.
+
+以環境變數 CTF_WEB_METRICS=1 啟用後：
+- 每個 route 的延遲 histogram（依 endpoint / method / status）；
+- 每個 request 期間的 YAML 解析次數與目錄列舉次數（os.scandir / os.listdir）
+  histogram，用來找出哪些頁面會隨題目數量變慢；只計算 request 執行緒本身，
+  背景的檔案監看與工作執行緒不會被算進去；
+- 掃描 / 建置 / 同步的執行時間 histogram；
+- /api/metrics 以 Prometheus text format 輸出以上資料。
+
+另外設定 CTF_WEB_PROFILE=1 時，request 帶 X-CTF-Profile: 1 header 或
+?_profile=1 會以 pyinstrument（有安裝時，輸出 .html）或 cProfile（輸出 .prof，
+可用 snakeviz 等工具開啟）記錄該 request，檔案寫到 .ctf-cache/profiles/，
+路徑放在回應的 X-CTF-Profile header。
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument 為選用套件，沒有安裝時改用 cProfile
+    pyinstrument = None
+
+# 延遲（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每個 request 的次數（YAML 解析、目錄列舉）
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+# 掃描 / 建置 / 同步（秒）
+TASK_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+PROFILE_HEADER = "X-CTF-Profile"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Prometheus histogram（累積 bucket），以 label 組合分開計算。"""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [每個 bucket 的次數（非累積）..., 總和, 次數]
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(sorted(labels.items())))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (float("inf"),), series):
+                cumulative += hits
+                le = ("le", _format_number(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {_format_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_number(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_number(series[-1])}")
+        return lines
+
+
+class _RequestCounters(threading.local):
+    active = False
+    yaml_parses = 0
+    dir_listings = 0
+
+
+_current = _RequestCounters()
+_probes_installed = False
+_probes_lock = threading.Lock()
+
+
+def _counting(original: Callable, attr: str) -> Callable:
+    def wrapper(*args, **kwargs):
+        if _current.active:
+            setattr(_current, attr, getattr(_current, attr) + 1)
+        return original(*args, **kwargs)
+
+    wrapper.__wrapped__ = original
+    return wrapper
+
+
+def install_probes() -> None:
+    """替 yaml.safe_load、os.scandir、os.listdir 加上計數（只安裝一次）。
+
+    在 request 執行緒以外呼叫時只多一次 thread-local 判斷，不影響結果。
+    """
+    global _probes_installed
+    with _probes_lock:
+        if _probes_installed:
+            return
+        yaml.safe_load = _counting(yaml.safe_load, "yaml_parses")
+        os.scandir = _counting(os.scandir, "dir_listings")
+        os.listdir = _counting(os.listdir, "dir_listings")
+        _probes_installed = True
+
+
+class WebMetrics:
+    """收集 route 延遲、每個 request 的檔案系統活動與背景工作時間。"""
+
+    def __init__(
+        self,
+        app=None,
+        profile_dir: Optional[Callable[[], Path]] = None,
+        enable_profiling: bool = False,
+        gauges: Optional[Dict[str, Tuple[str, Callable[[], float]]]] = None,
+    ):
+        self.request_latency = Histogram(
+            "ctf_http_request_duration_seconds", "Route latency in seconds.", LATENCY_BUCKETS
+        )
+        self.request_yaml_parses = Histogram(
+            "ctf_http_request_yaml_parses", "YAML documents parsed while handling one request.", COUNT_BUCKETS
+        )
+        self.request_dir_listings = Histogram(
+            "ctf_http_request_dir_listings", "Directory listings (scandir/listdir) while handling one request.",
+            COUNT_BUCKETS,
+        )
+        self.task_duration = Histogram(
+            "ctf_task_duration_seconds", "Wall time of scan/build/sync tasks in seconds.", TASK_BUCKETS
+        )
+        self.profile_dir = profile_dir
+        self.enable_profiling = enable_profiling
+        self.gauges = gauges or {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        install_probes()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # ----- request hooks -----
+
+    def _before_request(self) -> None:
+        from flask import g, request
+
+        _current.active = True
+        _current.yaml_parses = 0
+        _current.dir_listings = 0
+        g._ctf_metrics_started = time.perf_counter()
+        if self.enable_profiling and (
+            request.headers.get(PROFILE_HEADER) == "1" or request.args.get("_profile") == "1"
+        ):
+            g._ctf_profiler = self._start_profiler()
+
+    def _after_request(self, response):
+        from flask import g, request
+
+        started = g.pop("_ctf_metrics_started", None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        self.request_latency.observe(
+            time.perf_counter() - started,
+            endpoint=endpoint,
+            method=request.method,
+            status=str(response.status_code),
+        )
+        self.request_yaml_parses.observe(_current.yaml_parses, endpoint=endpoint)
+        self.request_dir_listings.observe(_current.dir_listings, endpoint=endpoint)
+        _current.active = False
+
+        profiler = g.pop("_ctf_profiler", None)
+        if profiler is not None:
+            path = self._stop_profiler(profiler, endpoint)
+            if path is not None:
+                response.headers[PROFILE_HEADER] = str(path)
+        return response
+
+    def _teardown_request(self, _exc=None) -> None:
+        _current.active = False
+
+    # ----- profiling -----
+
+    def _start_profiler(self):
+        if pyinstrument is not None:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+            return profiler
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, endpoint: str) -> Optional[Path]:
+        if self.profile_dir is None:
+            return None
+        directory = self.profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{os.getpid()}-{threading.get_ident()}"
+        if pyinstrument is not None:
+            profiler.stop()
+            path = directory / f"{stem}.html"
+            path.write_text(profiler.output_html(), encoding="utf-8")
+        else:
+            profiler.disable()
+            path = directory / f"{stem}.prof"
+            profiler.dump_stats(str(path))
+        return path
+
+    # ----- tasks -----
+
+    def observe_task(self, task: str, seconds: float, status: str) -> None:
+        self.task_duration.observe(seconds, task=task, status=status)
+
+    # ----- export -----
+
+    def render(self) -> str:
+        """Prometheus text exposition format（0.0.4）。"""
+        lines: List[str] = []
+        for histogram in (
+            self.request_latency,
+            self.request_yaml_parses,
+            self.request_dir_listings,
+            self.task_duration,
+        ):
+            lines += histogram.render()
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            try:
+                value = read()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_format_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+def metrics_enabled() -> bool:
+    return os.environ.get("CTF_WEB_METRICS", "").lower() in ("1", "true", "yes")
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get("CTF_WEB_PROFILE", "").lower() in ("1", "true", "yes")
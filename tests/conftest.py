@@ -50,3 +50,21 @@ def scan_secrets_module():
 def validate_challenge_module():
     """Load validate-challenge.py as a module."""
     return load_script("validate_challenge", "validate-challenge.py")
+
+
+@pytest.fixture
+def validate_all_module():
+    """Load validate-all-challenges.py as a module."""
+    return load_script("validate_all_challenges", "validate-all-challenges.py")
+
+
+@pytest.fixture
+def sync_to_public_module():
+    """Load sync-to-public.py as a module."""
+    return load_script("sync_to_public", "sync-to-public.py")
+
+
+@pytest.fixture
+def generate_pages_module():
+    """Load generate-pages.py as a module."""
+    return load_script("generate_pages", "generate-pages.py")
@@ -0,0 +1,142 @@
+"""Integration tests for GET /api/challenges (filters, projection, paging, ETag)."""
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "web-interface"))
+
+import app as _app_module  # noqa: E402
+
+
+def _write_challenge(root, category, name, body):
+    d = root / category / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "public.yml").write_text(body, encoding="utf-8")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    challenges = tmp_path / "challenges"
+    for i in range(5):
+        _write_challenge(
+            challenges, "web" if i % 2 else "pwn", f"c{i}",
+            f"title: C{i}\ndifficulty: {'hard' if i > 2 else 'easy'}\npoints: {i * 100}\n"
+            f"author: {'amy' if i < 3 else 'bob'}\nstatus: developing\ndescription: long text {i}\n",
+        )
+    (tmp_path / "config.yml").write_text('project:\n  name: "t"\n', encoding="utf-8")
+    importlib.reload(_app_module)
+    monkeypatch.setattr(_app_module, "CONFIG_FILE", tmp_path / "config.yml")
+    monkeypatch.setattr(_app_module, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(_app_module, "CHALLENGES_DIR", challenges)
+    _app_module.ctf_manager = _app_module.CTFManager()
+    _app_module.app.config["TESTING"] = True
+    return _app_module.app.test_client()
+
+
+def test_unfiltered_list_is_unchanged(client):
+    data = client.get("/api/challenges").get_json()
+    assert data["status"] == "success"
+    assert data["total"] == 5
+    assert [c["name"] for c in data["data"]] == ["c0", "c2", "c4", "c1", "c3"]
+    assert data["data"][0]["description"] == "long text 0"
+
+
+def test_filters_fields_and_sort(client):
+    data = client.get("/api/challenges?difficulty=hard&author=bob&fields=points&sort=-points").get_json()
+    assert data["data"] == [
+        {"category": "pwn", "name": "c4", "points": 400},
+        {"category": "web", "name": "c3", "points": 300},
+    ]
+
+
+def test_cursor_pagination(client):
+    seen = []
+    url = "/api/challenges?limit=2&fields=title"
+    while url:
+        page = client.get(url).get_json()
+        seen += [c["name"] for c in page["data"]]
+        url = f"/api/challenges?limit=2&fields=title&cursor={page['next_cursor']}" if page["next_cursor"] else None
+    assert seen == ["c0", "c2", "c4", "c1", "c3"]
+    assert client.get("/api/challenges?limit=0").status_code == 400
+    assert client.get("/api/challenges?cursor=%%%").status_code == 400
+
+
+def test_etag_revalidation(client, tmp_path):
+    first = client.get("/api/challenges?category=web")
+    etag = first.headers["ETag"]
+    assert client.get("/api/challenges?category=web", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/challenges?category=pwn", headers={"If-None-Match": etag}).status_code == 200
+
+    _write_challenge(tmp_path / "challenges", "web", "c9", "title: New\n")
+    _app_module.ctf_manager.challenge_store().invalidate()
+    changed = client.get("/api/challenges?category=web", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert [c["name"] for c in changed.get_json()["data"]] == ["c1", "c3", "c9"]
+
+
+def test_update_challenge_rejects_stale_version(client):
+    private = _app_module.CHALLENGES_DIR / "pwn" / "c0" / "private.yml"
+    private.write_text("title: C0\nflag: f{x}\npoints: 0\n", encoding="utf-8")
+    version = client.get("/api/challenges/pwn/c0").get_json()["version"]
+
+    first = client.put("/api/challenges/pwn/c0", json={"title": "A"}, headers={"If-Match": version})
+    assert first.status_code == 200
+    second = client.put("/api/challenges/pwn/c0", json={"title": "B"}, headers={"If-Match": version})
+    assert second.status_code == 409
+    assert second.get_json()["version"] == first.get_json()["version"]
+
+    data = client.get("/api/challenges?fields=title&category=pwn").get_json()["data"]
+    assert data[0]["title"] == "A"
+
+
+def test_noop_update_leaves_files_untouched(client):
+    challenge = _app_module.CHALLENGES_DIR / "web" / "c1"
+    (challenge / "private.yml").write_text("title: C1\npoints: 100\nflag: f{x}\n", encoding="utf-8")
+    for name in ("private.yml", "public.yml"):
+        os.utime(challenge / name, ns=(1, 1))
+
+    resp = client.put("/api/challenges/web/c1", json={"title": "C1", "points": 100})
+    assert resp.status_code == 200
+    assert [(challenge / n).stat().st_mtime_ns for n in ("private.yml", "public.yml")] == [1, 1]
+
+    client.put("/api/challenges/web/c1", json={"points": 150})
+    public = yaml.safe_load((challenge / "public.yml").read_text(encoding="utf-8"))
+    assert public["points"] == 150 and "flag" not in public
+
+
+def test_attachment_download_supports_range_and_etag(client):
+    files = _app_module.CHALLENGES_DIR / "web" / "c1" / "files"
+    files.mkdir()
+    payload = bytes(range(256)) * 64
+    (files / "image.dd").write_bytes(payload)
+
+    listing = client.get("/api/challenges/web/c1/files").get_json()["data"]
+    assert listing[0]["name"] == "image.dd" and listing[0]["size"] == len(payload)
+    etag = listing[0]["sha256"]
+
+    full = client.get("/api/challenges/web/c1/files/image.dd")
+    assert full.status_code == 200 and full.data == payload
+    assert full.headers["ETag"] == f'"{etag}"' and full.headers["Accept-Ranges"] == "bytes"
+    assert "Repr-Digest" in full.headers
+
+    part = client.get(
+        "/api/challenges/web/c1/files/image.dd",
+        headers={"Range": "bytes=1000-", "If-Range": f'"{etag}"'},
+    )
+    assert part.status_code == 206 and part.data == payload[1000:]
+
+    stale = client.get(
+        "/api/challenges/web/c1/files/image.dd",
+        headers={"Range": "bytes=1000-", "If-Range": '"outdated"'},
+    )
+    assert stale.status_code == 200 and stale.data == payload
+
+    assert client.get(
+        "/api/challenges/web/c1/files/image.dd", headers={"If-None-Match": f'"{etag}"'}
+    ).status_code == 304
+    assert client.get("/api/challenges/web/c1/files/nope.bin").status_code == 404
@@ -0,0 +1,55 @@
+"""Tests for scripts/atomic_io.py (locked, atomic YAML writes)."""
+import threading
+
+import pytest
+import yaml
+
+from atomic_io import VersionConflict, check_version, dump_yaml, file_version, locked
+
+
+def test_dump_yaml_replaces_atomically(tmp_path):
+    path = tmp_path / "config.yml"
+    path.write_text("project: {name: old}\n", encoding="utf-8")
+    path.chmod(0o640)
+
+    version = dump_yaml(path, {"project": {"name": "新名稱"}})
+
+    assert yaml.safe_load(path.read_text(encoding="utf-8")) == {"project": {"name": "新名稱"}}
+    assert version == file_version(path)
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["config.yml"]
+
+
+def test_check_version_detects_concurrent_edit(tmp_path):
+    path = tmp_path / "private.yml"
+    dump_yaml(path, {"title": "a"})
+    seen = file_version(path)
+    check_version(path, seen)
+    check_version(path, None)
+
+    dump_yaml(path, {"title": "b"})
+    with pytest.raises(VersionConflict) as err:
+        check_version(path, seen)
+    assert err.value.current == file_version(path)
+
+
+def test_locked_read_modify_write_loses_no_updates(tmp_path):
+    path = tmp_path / "counter.yml"
+    lock_dir = tmp_path / "locks"
+    dump_yaml(path, {"count": 0})
+
+    def bump():
+        for _ in range(20):
+            with locked([path], lock_dir):
+                data = yaml.safe_load(path.read_text(encoding="utf-8"))
+                data["count"] += 1
+                dump_yaml(path, data)
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert yaml.safe_load(path.read_text(encoding="utf-8")) == {"count": 80}
+    assert not list(tmp_path.glob(".counter.yml.*"))
@@ -0,0 +1,83 @@
+"""Unit tests for scripts/binary_scan.py"""
+import base64
+import gzip
+import io
+import tarfile
+import zipfile
+
+import binary_scan
+from binary_scan import BinaryScanner, is_binary_scannable
+
+FLAG = b"is1abCTF{hidden_in_binary}"
+
+
+def _hits(result):
+    return sorted((h.member, h.encoding) for h in result.hits)
+
+
+def test_png_trailer_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(binary_scan, "CHUNK_SIZE", 1000)
+    path = tmp_path / "image.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 990 + FLAG + b"\x00" * 5000)
+
+    result = BinaryScanner("is1abCTF").scan_path(path)
+    assert _hits(result) == [(None, "raw")]
+    assert result.hits[0].offset == 998
+    assert result.hits[0].preview == FLAG.decode()
+
+
+def test_encoded_forms(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(
+        b"\x00" + FLAG.hex().upper().encode()
+        + b"\x00" + FLAG.decode().encode("utf-16-le")
+        + b"\x00" + base64.b64encode(b"xy" + FLAG)
+    )
+    result = BinaryScanner("is1abCTF").scan_path(path)
+    assert sorted(h.encoding for h in result.hits) == ["base64", "hex", "utf-16-le"]
+    assert {h.preview for h in result.hits if h.encoding != "base64"} == {FLAG.decode()}
+
+
+def test_zip_inside_tar_gz(tmp_path):
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("notes/readme.txt", b"nothing")
+        archive.writestr("data.bin", b"\xff" * 100 + FLAG)
+    path = tmp_path / "release.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        info = tarfile.TarInfo("dist/bundle.zip")
+        info.size = len(inner.getvalue())
+        archive.addfile(info, io.BytesIO(inner.getvalue()))
+
+    result = BinaryScanner("is1abCTF").scan_path(path)
+    assert _hits(result) == [("dist/bundle.zip!data.bin", "raw")]
+    assert result.members == [
+        "dist/bundle.zip", "dist/bundle.zip!notes/readme.txt", "dist/bundle.zip!data.bin",
+    ]
+
+
+def test_plain_gzip_and_corrupt_archive(tmp_path):
+    gz = tmp_path / "log.txt.gz"
+    gz.write_bytes(gzip.compress(b"line\n" * 1000 + FLAG))
+    broken = tmp_path / "broken.zip"
+    broken.write_bytes(b"not a zip " + FLAG)
+
+    scanner = BinaryScanner("is1abCTF")
+    assert _hits(scanner.scan_path(gz)) == [("log.txt", "raw")]
+    assert _hits(scanner.scan_path(broken)) == [(None, "raw")]
+
+
+def test_budget_truncates(tmp_path):
+    path = tmp_path / "large.bin"
+    path.write_bytes(b"\x00" * 4096 + FLAG)
+
+    result = BinaryScanner("is1abCTF", budget=4096).scan_path(path)
+    assert result.hits == [] and result.truncated
+    result = BinaryScanner("is1abCTF", budget=4096 + len(FLAG)).scan_path(path)
+    assert len(result.hits) == 1 and not result.truncated
+
+
+def test_is_binary_scannable(tmp_path):
+    assert is_binary_scannable(tmp_path / "a.PNG")
+    assert is_binary_scannable(tmp_path / "a.tar.bz2")
+    assert not is_binary_scannable(tmp_path / "font.woff2")
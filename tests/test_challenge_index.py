@@ -0,0 +1,88 @@
+"""Unit tests for scripts/challenge_index.py"""
+import os
+
+from challenge_index import ChallengeIndex, get_index
+
+
+def _write_challenge(root, category, name, body="title: T\ndifficulty: easy\n"):
+    d = root / category / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "public.yml").write_text(body, encoding="utf-8")
+    return d
+
+
+def test_scan_returns_sorted_records(tmp_path):
+    _write_challenge(tmp_path, "web", "b")
+    _write_challenge(tmp_path, "pwn", "a")
+    _write_challenge(tmp_path, "web", "a")
+    (tmp_path / "web" / "no_yml").mkdir()
+
+    records = ChallengeIndex(tmp_path).scan()
+
+    assert [(r.category, r.name) for r in records] == [
+        ("pwn", "a"), ("web", "a"), ("web", "b"),
+    ]
+    assert records[0].data["title"] == "T"
+    assert records[0].path == tmp_path / "pwn" / "a"
+
+
+def test_unchanged_files_are_not_reparsed(tmp_path):
+    _write_challenge(tmp_path, "web", "a")
+    _write_challenge(tmp_path, "web", "b")
+    index = ChallengeIndex(tmp_path)
+
+    index.scan()
+    index.scan()
+    assert index.parses == 2
+    assert index.hits == 2
+
+
+def test_changed_file_is_reparsed(tmp_path):
+    d = _write_challenge(tmp_path, "web", "a")
+    index = ChallengeIndex(tmp_path)
+    index.scan()
+
+    yml = d / "public.yml"
+    yml.write_text("title: Changed, longer\n", encoding="utf-8")
+    st = yml.stat()
+    os.utime(yml, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    records = index.scan()
+    assert index.parses == 2
+    assert records[0].data["title"] == "Changed, longer"
+
+
+def test_removed_challenge_is_dropped(tmp_path):
+    d = _write_challenge(tmp_path, "web", "a")
+    index = ChallengeIndex(tmp_path)
+    assert len(index.scan()) == 1
+
+    (d / "public.yml").unlink()
+    assert index.scan() == []
+    assert index.get("web", "a") is None
+
+
+def test_invalid_yaml_is_reported_not_raised(tmp_path):
+    _write_challenge(tmp_path, "web", "bad", body="- just\n- a list\n")
+    _write_challenge(tmp_path, "web", "broken", body="title: [unclosed\n")
+
+    records = ChallengeIndex(tmp_path).scan()
+
+    assert all(not r.ok for r in records)
+    assert all(r.data == {} for r in records)
+
+
+def test_copy_data_does_not_leak_into_cache(tmp_path):
+    _write_challenge(tmp_path, "web", "a", body="title: T\ntags: [x]\n")
+    index = ChallengeIndex(tmp_path)
+
+    data = index.scan()[0].copy_data()
+    data["tags"].append("y")
+    data["name"] = "mutated"
+
+    cached = index.scan()[0].data
+    assert cached == {"title": "T", "tags": ["x"]}
+
+
+def test_get_index_is_shared_per_root(tmp_path):
+    assert get_index(tmp_path) is get_index(tmp_path / ".")
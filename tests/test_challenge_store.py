@@ -0,0 +1,118 @@
+"""Unit tests for scripts/challenge_store.py"""
+import shutil
+
+import challenge_store
+from challenge_store import ChallengeStore
+
+
+def _write_challenge(root, category, name, body="title: T\ndifficulty: easy\n"):
+    d = root / category / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "public.yml").write_text(body, encoding="utf-8")
+    return d
+
+
+def test_snapshot_is_served_from_memory(tmp_path):
+    _write_challenge(tmp_path, "web", "a")
+    store = ChallengeStore(tmp_path).start(watch=False)
+
+    first = store.snapshot()
+    assert [(c["category"], c["name"], c["title"]) for c in first.challenges] == [("web", "a", "T")]
+    for _ in range(5):
+        assert store.snapshot() is first
+    assert store.refreshes == 1
+
+
+def test_invalidate_picks_up_changes(tmp_path):
+    _write_challenge(tmp_path, "web", "a")
+    store = ChallengeStore(tmp_path).start(watch=False)
+    first = store.snapshot()
+
+    store.invalidate()
+    assert store.snapshot() is first  # 內容沒變，不產生新版本
+
+    _write_challenge(tmp_path, "pwn", "b")
+    shutil.rmtree(tmp_path / "web" / "a")
+    store.invalidate()
+    second = store.snapshot()
+    assert second.version == first.version + 1
+    assert [c["name"] for c in second.challenges] == ["b"]
+
+
+def test_broken_yaml_is_reported_not_listed(tmp_path):
+    _write_challenge(tmp_path, "web", "a")
+    _write_challenge(tmp_path, "web", "bad", body="title: [unclosed\n")
+    snapshot = ChallengeStore(tmp_path).start(watch=False).snapshot()
+
+    assert [c["name"] for c in snapshot.challenges] == ["a"]
+    assert [path for path, _ in snapshot.errors] == [str(tmp_path / "web" / "bad")]
+
+
+def test_polling_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(challenge_store, "Observer", None)
+    _write_challenge(tmp_path, "web", "a")
+    store = ChallengeStore(tmp_path, poll_interval=0.01).start()
+    try:
+        assert store.mode == "polling"
+        _write_challenge(tmp_path, "web", "b")
+        for _ in range(500):
+            if len(store._snapshot.challenges) == 2:
+                break
+            store._stop.wait(0.01)
+        assert [c["name"] for c in store.snapshot().challenges] == ["a", "b"]
+    finally:
+        store.stop()
+
+
+def test_stats_follow_incremental_changes(tmp_path):
+    _write_challenge(tmp_path, "web", "a", "title: A\ndifficulty: easy\npoints: 100\n")
+    _write_challenge(tmp_path, "web", "b", "title: B\ndifficulty: hard\npoints: '300'\n")
+    _write_challenge(tmp_path, "pwn", "c", "title: C\npoints: oops\n")
+    store = ChallengeStore(tmp_path).start(watch=False)
+
+    stats = store.snapshot().stats
+    assert stats.as_dict() == {
+        "total_challenges": 3,
+        "by_category": {"pwn": 1, "web": 2},
+        "by_difficulty": {"easy": 1, "hard": 1, "unknown": 1},
+        "total_points": 400,
+    }
+    assert [c["name"] for c in stats.group("category", "web")] == ["a", "b"]
+    pwn_group = stats.group("category", "pwn")
+
+    _write_challenge(tmp_path, "web", "a", "title: A2\ndifficulty: hard\npoints: 150\n")
+    shutil.rmtree(tmp_path / "web" / "b")
+    store.invalidate()
+    stats = store.snapshot().stats
+
+    assert stats.as_dict() == {
+        "total_challenges": 2,
+        "by_category": {"pwn": 1, "web": 1},
+        "by_difficulty": {"hard": 1, "unknown": 1},
+        "total_points": 150,
+    }
+    assert [c["title"] for c in stats.group("difficulty", "hard")] == ["A2"]
+    assert stats.group("difficulty", "easy") == ()
+    assert stats.group("category", "pwn") is pwn_group  # 未變動的分組沿用
+
+
+def test_query_filters_sort_and_projection(tmp_path):
+    from challenge_store import project_fields, query_challenges
+
+    _write_challenge(tmp_path, "web", "a", "title: A\ndifficulty: easy\npoints: 100\nstatus: done\nauthor: amy\n")
+    _write_challenge(tmp_path, "web", "b", "title: B\ndifficulty: hard\npoints: 300\nstatus: developing\nauthor: bob\n")
+    _write_challenge(tmp_path, "pwn", "c", "title: C\ndifficulty: hard\npoints: 200\nstatus: done\nauthor: amy\n")
+    _write_challenge(tmp_path, "misc", "d", "title: D\ndifficulty: 3\n")
+    snapshot = ChallengeStore(tmp_path).start(watch=False).snapshot()
+
+    names = lambda cs: [c["name"] for c in cs]
+    assert names(query_challenges(snapshot, {"difficulty": ["hard"]})) == ["c", "b"]
+    assert names(query_challenges(snapshot, {"difficulty": ["hard"], "author": ["amy"]})) == ["c"]
+    assert names(query_challenges(snapshot, {"category": ["web", "pwn"]})) == ["c", "a", "b"]
+    assert names(query_challenges(snapshot, {"difficulty": ["3"]})) == ["d"]
+    assert names(query_challenges(snapshot, {"status": ["missing"]})) == []
+    assert names(query_challenges(snapshot, {}, sort="-points")) == ["b", "c", "a", "d"]
+    assert names(query_challenges(snapshot, {"status": ["done"]}, sort="title")) == ["a", "c"]
+    assert project_fields(snapshot.challenges[0], ["title", "nope"]) == {
+        "category": "misc", "name": "d", "title": "D",
+    }
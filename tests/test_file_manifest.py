@@ -0,0 +1,76 @@
+"""Tests for scripts/file_manifest.py (attachment listing + sha256 cache)."""
+import hashlib
+import os
+import threading
+
+import file_manifest
+from file_manifest import FileManifest
+
+
+def test_listing_hashes_once_and_survives_restart(tmp_path):
+    files = tmp_path / "files"
+    files.mkdir()
+    (files / "b.bin").write_bytes(b"x" * 3000)
+    (files / "a.txt").write_text("hello", encoding="utf-8")
+    (files / "sub").mkdir()
+
+    manifest = FileManifest(tmp_path / "files.sqlite", ttl=60)
+    listing = manifest.listing(files)
+    assert [e.name for e in listing] == ["a.txt", "b.bin"]
+    assert listing[0].sha256 == hashlib.sha256(b"hello").hexdigest()
+    assert manifest.listing(files) == listing
+    assert manifest.hashed == 2
+
+    restarted = FileManifest(tmp_path / "files.sqlite", ttl=0)
+    assert restarted.listing(files) == listing
+    assert restarted.hashed == 0
+    assert manifest.listing(tmp_path / "missing") == []
+
+
+def test_entry_detects_in_place_overwrite(tmp_path):
+    files = tmp_path / "files"
+    files.mkdir()
+    target = files / "disk.img"
+    target.write_bytes(b"old")
+    manifest = FileManifest(tmp_path / "files.sqlite", ttl=60)
+    old = manifest.entry(files, "disk.img")
+
+    target.write_bytes(b"new content")
+    os.utime(target, ns=(old.mtime_ns + 10**9, old.mtime_ns + 10**9))
+    new = manifest.entry(files, "disk.img")
+    assert new.sha256 == hashlib.sha256(b"new content").hexdigest()
+    assert manifest.entry(files, "../files.sqlite") is None
+
+
+def test_hashing_one_directory_does_not_block_others(tmp_path, monkeypatch):
+    slow, fast = tmp_path / "slow", tmp_path / "fast"
+    for directory in (slow, fast):
+        directory.mkdir()
+        (directory / "data.bin").write_bytes(directory.name.encode())
+    started, release = threading.Event(), threading.Event()
+    real_sha256 = file_manifest.file_sha256
+
+    def sha256(path):
+        if path.parent == slow:
+            started.set()
+            assert release.wait(30)
+        return real_sha256(path)
+
+    monkeypatch.setattr(file_manifest, "file_sha256", sha256)
+    manifest = FileManifest(tmp_path / "files.sqlite", ttl=60)
+    listed = []
+    worker = threading.Thread(target=manifest.listing, args=(slow,))
+    other = threading.Thread(target=lambda: listed.extend(manifest.listing(fast)))
+    worker.start()
+    try:
+        assert started.wait(10)
+        # slow/ 仍在計算 sha256 時，其他目錄的清單不必等待
+        other.start()
+        other.join(5)
+        assert [e.name for e in listed] == ["data.bin"]
+    finally:
+        release.set()
+        worker.join()
+        if other.is_alive():
+            other.join()
+    assert manifest.listing(slow)[0].sha256 == hashlib.sha256(b"slow").hexdigest()
@@ -0,0 +1,102 @@
+"""Unit tests for scripts/findings_cache.py (scan-secrets.py --incremental)"""
+import os
+import sys
+import zipfile
+
+import pytest
+
+from findings_cache import FindingsCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / ".ctf-cache" / "scan.sqlite"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "challenges"
+    (root / "web" / "a").mkdir(parents=True)
+    (root / "web" / "a" / "README.md").write_text("flag: is1abCTF{leak}\n", encoding="utf-8")
+    (root / "web" / "a" / "public.yml").write_text("title: A\nflag: x\n", encoding="utf-8")
+    (root / "web" / "a" / "notes.txt").write_text("nothing\r\nhere\n", encoding="utf-8")
+    return root
+
+
+def _scan(module, root, cache_path, **kwargs):
+    with FindingsCache(cache_path) as cache:
+        scanner = module.SecretsScanner(findings_cache=cache, **kwargs)
+        result = scanner.scan(str(root))
+    return result, cache
+
+
+def test_warm_run_replays_findings(scan_secrets_module, tree, cache_path):
+    expected = scan_secrets_module.SecretsScanner().scan(str(tree))
+
+    cold, cold_cache = _scan(scan_secrets_module, tree, cache_path)
+    warm, warm_cache = _scan(scan_secrets_module, tree, cache_path)
+
+    assert cold.findings == expected.findings
+    assert warm.findings == expected.findings
+    assert (cold_cache.hits, cold_cache.misses) == (0, 3)
+    assert (warm_cache.hits, warm_cache.misses) == (3, 0)
+
+
+def test_changed_file_is_rescanned(scan_secrets_module, tree, cache_path):
+    _scan(scan_secrets_module, tree, cache_path)
+
+    readme = tree / "web" / "a" / "README.md"
+    readme.write_text("clean now\n", encoding="utf-8")
+    st = readme.stat()
+    os.utime(readme, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    result, cache = _scan(scan_secrets_module, tree, cache_path)
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert not any(f.category == "Flag 洩漏" for f in result.findings)
+
+
+def test_ruleset_change_invalidates(scan_secrets_module, tree, cache_path):
+    _scan(scan_secrets_module, tree, cache_path)
+
+    with FindingsCache(cache_path) as cache:
+        scanner = scan_secrets_module.SecretsScanner(findings_cache=cache)
+        scanner.sensitive_patterns.append(
+            (r"nothing", scan_secrets_module.Severity.LOW, "custom")
+        )
+        result = scanner.scan(str(tree))
+    assert cache.misses == 3
+    assert any(f.category == "custom" for f in result.findings)
+
+
+def test_flag_prefix_change_invalidates(scan_secrets_module, tree, cache_path, tmp_path):
+    _scan(scan_secrets_module, tree, cache_path)
+
+    config = tmp_path / "config.yml"
+    config.write_text('project:\n  flag_prefix: "otherCTF"\n', encoding="utf-8")
+    result, cache = _scan(scan_secrets_module, tree, cache_path, config_path=str(config))
+    assert cache.misses == 3
+    assert not any(f.category == "Flag 洩漏" for f in result.findings)
+
+
+def test_parallel_workers_share_cache(scan_secrets_module, tree, cache_path, monkeypatch):
+    # process pool 需要能以模組名稱找回 worker 函式
+    monkeypatch.setitem(sys.modules, scan_secrets_module.__name__, scan_secrets_module)
+    monkeypatch.setattr(scan_secrets_module, "_PARALLEL_MIN_FILES", 0)
+    monkeypatch.setattr(scan_secrets_module, "_BATCH_SIZE", 1)
+
+    cold, _ = _scan(scan_secrets_module, tree, cache_path, jobs=2)
+    warm, cache = _scan(scan_secrets_module, tree, cache_path, jobs=2)
+    assert warm.findings == cold.findings
+    assert (cache.hits, cache.misses) == (3, 0)
+
+
+def test_archive_member_paths_survive_cache(scan_secrets_module, tree, cache_path):
+    archive = tree / "web" / "a" / "files" / "h.zip"
+    archive.parent.mkdir()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("deep/data.bin", b"\xff" * 64 + b"is1abCTF{in_zip}")
+    expected = "!deep/data.bin"
+
+    for _ in range(2):  # cache miss，接著 cache hit
+        result, _ = _scan(scan_secrets_module, tree, cache_path)
+        assert f"{archive}{expected}" in {f.file_path for f in result.findings}
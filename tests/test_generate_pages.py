@@ -0,0 +1,205 @@
+"""Tests for scripts/generate-pages.py (incremental static site generation)"""
+import gzip
+import re
+import sys
+
+import pytest
+
+
+def _challenge(root, category, name, points=100, files=None):
+    path = root / "challenges" / category / name
+    (path / "files").mkdir(parents=True)
+    (path / "public.yml").write_text(
+        f"title: {name.title()}\ncategory: {category}\ndifficulty: easy\npoints: {points}\n"
+        f"description: about {name}\n",
+        encoding="utf-8",
+    )
+    for file_name, content in (files or {}).items():
+        (path / "files" / file_name).write_text(content, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def site(tmp_path, generate_pages_module):
+    source = tmp_path / "public-release"
+    _challenge(source, "web", "sqli", files={"app.py": "print('hi')\n"})
+    _challenge(source, "pwn", "bof", points=200)
+    config = tmp_path / "config.yml"
+    config.write_text('project:\n  name: "Test CTF"\n  flag_prefix: "is1abCTF"\n', encoding="utf-8")
+    output = tmp_path / "_site"
+
+    def build(**kwargs):
+        generator = generate_pages_module.PagesGenerator(
+            str(config), manifest_dir=tmp_path / ".ctf-cache" / "build-manifests", **kwargs
+        )
+        generator.generate(str(source), str(output), "dark")
+        return generator
+
+    return source, output, build
+
+
+def _shards(output):
+    return sorted(p.name for p in (output / "search").glob("*.json"))
+
+
+def _mtimes(output):
+    return {p.relative_to(output).as_posix(): p.stat().st_mtime_ns for p in output.rglob("*") if p.is_file()}
+
+
+def test_rebuild_without_changes_writes_nothing(site):
+    _, output, build = site
+    first = build()
+    pages = 9 + len(_shards(output))  # css, js, index, 2 分類, 2 題目, search, json + 搜尋索引分片
+    assert first.stats["written"] == pages
+    assert first.stats["copied"] == 1
+    assert "<!--ctf-pages-updated-at-->" not in (output / "index.html").read_text(encoding="utf-8")
+    before = _mtimes(output)
+
+    second = build()
+    assert second.stats == {"rendered": 0, "written": 0, "skipped": pages, "copied": 0}
+    assert _mtimes(output) == before
+
+    # --force 會重新 render，但內容相同的頁面不會重寫
+    forced = build(force=True)
+    assert (forced.stats["rendered"], forced.stats["written"]) == (pages, 0)
+    assert _mtimes(output) == before
+
+
+def test_challenge_edit_rewrites_only_affected_pages(site):
+    source, output, build = site
+    build()
+    before = _mtimes(output)
+
+    public_yml = source / "challenges" / "pwn" / "bof" / "public.yml"
+    public_yml.write_text(public_yml.read_text(encoding="utf-8") + "author: alice\n", encoding="utf-8")
+    generator = build()
+
+    # web 分類頁、sqli 題目頁、CSS / JS 與其他搜尋分片不依賴 bof 的作者，不會重新 render；
+    # 首頁與 pwn 分類頁的卡片不顯示作者，render 結果相同所以不重寫
+    # 搜尋索引只有 a（新增 alice）與 u（bof 不再是 Unknown）兩個分片改變
+    unchanged_shards = len(_shards(output)) - 2
+    assert generator.stats == {"rendered": 7, "written": 5, "skipped": 4 + unchanged_shards, "copied": 0}
+    changed = {rel for rel, mtime in _mtimes(output).items() if before.get(rel) != mtime}
+    assert changed == {
+        "challenges/pwn/bof/index.html",
+        "challenges/pwn/bof/index.html.gz",
+        "challenges.json",
+        "search.html",
+        "search.html.gz",
+        "search/a.json",
+        "search/u.json",
+    }
+    assert "alice" in (output / "challenges" / "pwn" / "bof" / "index.html").read_text(encoding="utf-8")
+
+
+def test_hashed_assets_and_precompression(site):
+    _, output, build = site
+    build()
+    css = [p.name for p in output.glob("style.*.css")]
+    assert len(css) == 1 and re.fullmatch(r"style\.[0-9a-f]{10}\.css", css[0])
+    assert not (output / "style.css").exists()
+    page = (output / "challenges" / "web" / "sqli" / "index.html").read_text(encoding="utf-8")
+    assert f'href="../../../{css[0]}"' in page
+    search = (output / "search.html").read_text(encoding="utf-8")
+    script = re.search(r'<script src="(search\.[0-9a-f]{10}\.js)">', search).group(1)
+    assert "function performSearch" in (output / script).read_text(encoding="utf-8")
+
+    gz = output / "search.html.gz"
+    assert gzip.decompress(gz.read_bytes()) == (output / "search.html").read_bytes()
+    # 預壓縮檔被刪除時重新 render，頁面內容相同不重寫，只補回預壓縮檔
+    gz.unlink()
+    assert (build().stats["rendered"], gz.exists()) == (1, True)
+
+    build(precompress=False)
+    assert not list(output.rglob("*.gz"))
+
+
+def test_attachments_and_removed_challenges(site):
+    source, output, build = site
+    build()
+    sqli = source / "challenges" / "web" / "sqli"
+    copied = output / "challenges" / "web" / "sqli" / "files" / "app.py"
+    assert copied.read_text(encoding="utf-8") == "print('hi')\n"
+
+    (sqli / "files" / "app.py").write_text("print('v2')\n", encoding="utf-8")
+    (sqli / "files" / "new.txt").write_text("hello\n", encoding="utf-8")
+    assert build().stats["copied"] == 2
+    assert copied.read_text(encoding="utf-8") == "print('v2')\n"
+
+    (sqli / "files" / "new.txt").unlink()
+    build()
+    assert not (output / "challenges" / "web" / "sqli" / "files" / "new.txt").exists()
+
+    for path in sorted(sqli.rglob("*"), reverse=True):
+        path.unlink() if path.is_file() else path.rmdir()
+    sqli.rmdir()
+    build()
+    assert not (output / "challenges" / "web" / "sqli").exists()
+    assert not (output / "web.html").exists()
+    assert (output / "pwn.html").exists()
+
+
+def test_parallel_render_matches_serial(tmp_path, generate_pages_module, monkeypatch):
+    # process pool 需要能以模組名稱找回 worker 函式
+    monkeypatch.setitem(sys.modules, generate_pages_module.__name__, generate_pages_module)
+    monkeypatch.setattr(generate_pages_module, "_PARALLEL_MIN_PAGES", 0)
+    monkeypatch.setattr(generate_pages_module, "_BATCH_SIZE", 3)
+    source = tmp_path / "public-release"
+    for i in range(12):
+        _challenge(source, ("web", "pwn", "crypto")[i % 3], f"c{i}", points=i * 10, files={"a.txt": "a"})
+
+    sites = {}
+    for jobs in (1, 2):
+        output = tmp_path / f"site-{jobs}"
+        generator = generate_pages_module.PagesGenerator(
+            None, manifest_dir=tmp_path / f"manifests-{jobs}", jobs=jobs
+        )
+        generator.generate(str(source), str(output), "light")
+        # css, js, index, 3 分類, 12 題目, search, json + 搜尋索引分片
+        assert generator.stats["rendered"] == 20 + len(_shards(output))
+        sites[jobs] = {
+            p.relative_to(output).as_posix(): p.read_text(encoding="utf-8")
+            for p in [*output.rglob("*.html"), *output.glob("search/*.json")]
+        }
+
+    assert sites[1].keys() == sites[2].keys()
+    strip = re.compile(r"最後更新: [^<]*")
+    for rel in sites[1]:
+        assert strip.sub("", sites[1][rel]) == strip.sub("", sites[2][rel]), rel
+
+
+def test_template_override_and_escaping(tmp_path, generate_pages_module):
+    source = tmp_path / "public-release"
+    path = _challenge(source, "web", "xss")
+    (path / "public.yml").write_text(
+        'title: "<script>alert(1)</script>"\ndescription: "</script><b>"\n', encoding="utf-8"
+    )
+    theme = tmp_path / "theme"
+    theme.mkdir()
+    (theme / "footer.html.j2").write_text(
+        "<footer>{{ site.title }} v1 {{ updated_at }}</footer>\n</body>\n</html>\n", encoding="utf-8"
+    )
+    output = tmp_path / "_site"
+
+    def build():
+        generator = generate_pages_module.PagesGenerator(
+            None, manifest_dir=tmp_path / "manifests", template_dir=str(theme)
+        )
+        generator.generate(str(source), str(output), "dark")
+        return generator
+
+    build()
+    page = (output / "challenges" / "web" / "xss" / "index.html").read_text(encoding="utf-8")
+    assert re.search(r"<footer>[^<]* v1 \d{4}-", page)
+    assert "<script>alert(1)</script>" not in page
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in page
+    assert "</script><b>" not in (output / "search.html").read_text(encoding="utf-8")
+    assert (tmp_path / "jinja").is_dir()  # 編譯後的模板快取
+
+    # 只改模板、不改程式：所有 HTML 頁面重新 render
+    (theme / "footer.html.j2").write_text(
+        "<footer>{{ site.title }} v2 {{ updated_at }}</footer>\n</body>\n</html>\n", encoding="utf-8"
+    )
+    generator = build()
+    assert generator.stats["skipped"] == 0
+    assert re.search(r"<footer>[^<]* v2 ", (output / "index.html").read_text(encoding="utf-8"))
@@ -0,0 +1,89 @@
+"""Unit tests for scripts/http_cache.py"""
+import gzip
+import os
+
+import pytest
+from flask import Flask, jsonify
+
+from http_cache import HTTPCache, send_static, versioned
+
+
+@pytest.fixture
+def setup(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "app.js").write_text("console.log('x');\n" * 200, encoding="utf-8")
+    (static / "tiny.css").write_text("a{}", encoding="utf-8")
+
+    state = {"version": 1, "renders": 0}
+    app = Flask(__name__)
+    HTTPCache(app)
+
+    @app.route("/page")
+    @versioned(lambda: state["version"])
+    def page():
+        state["renders"] += 1
+        return "<p>" + "hello " * 500 + "</p>"
+
+    @app.route("/plain")
+    def plain():
+        return jsonify({"items": list(range(500))})
+
+    @app.route("/assets/<path:filename>")
+    def assets(filename):
+        return send_static(static, filename)
+
+    return app.test_client(), state, static
+
+
+def test_versioned_etag_skips_render(setup):
+    client, state, _ = setup
+    first = client.get("/page")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    assert client.get("/page", headers={"If-None-Match": etag}).status_code == 304
+    assert state["renders"] == 1
+
+    state["version"] = 2
+    assert client.get("/page", headers={"If-None-Match": etag}).status_code == 200
+    assert state["renders"] == 2
+
+
+def test_compressed_responses_get_distinct_etags(setup):
+    client, _, _ = setup
+    plain = client.get("/plain")
+    zipped = client.get("/plain", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gz"'
+    assert gzip.decompress(zipped.data) == plain.data
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+
+    again = client.get("/plain", headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_static_precompressed_and_immutable(setup):
+    client, _, static = setup
+    versioned_url = client.get("/assets/app.js?abc123", headers={"Accept-Encoding": "gzip"})
+    assert versioned_url.headers["Content-Encoding"] == "gzip"
+    assert versioned_url.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert gzip.decompress(versioned_url.data) == (static / "app.js").read_bytes()
+    assert (static / "app.js.gz").exists()
+
+    unversioned = client.get("/assets/app.js")
+    assert unversioned.headers["Cache-Control"] == "no-cache"
+    assert "Content-Encoding" not in unversioned.headers
+
+    # 來源更新後重新產生預壓縮檔
+    (static / "app.js").write_text("console.log('y');\n" * 200, encoding="utf-8")
+    st = (static / "app.js").stat()
+    os.utime(static / "app.js", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    fresh = client.get("/assets/app.js?def456", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(fresh.data) == (static / "app.js").read_bytes()
+
+    small = client.get("/assets/tiny.css", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert client.get("/assets/../secret").status_code == 404
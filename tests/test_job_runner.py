@@ -0,0 +1,146 @@
+"""Unit tests for scripts/job_runner.py"""
+import threading
+
+from job_runner import ERROR, SUCCESS, JobRunner
+
+
+def test_job_output_and_result():
+    runner = JobRunner(workers=1)
+
+    def work(emit):
+        emit("line 1")
+        emit("line 2\nline 3")
+        return {"status": "success", "data": {"output": "done"}}
+
+    job, created = runner.submit("build", "build:all", work)
+    assert created
+    assert job.wait(timeout=5)
+    assert job.status == SUCCESS
+    assert job.output == ["line 1", "line 2", "line 3"]
+    assert list(job.follow(1)) == [(1, "line 2"), (2, "line 3")]
+    assert runner.get(job.id) is job
+    runner.shutdown()
+
+
+def test_duplicate_jobs_are_coalesced():
+    runner = JobRunner(workers=2)
+    release = threading.Event()
+    calls = []
+
+    def work(emit):
+        calls.append(1)
+        release.wait(5)
+        return {"status": "success"}
+
+    first, created = runner.submit("build", "build:all", work)
+    second, created_again = runner.submit("build", "build:all", work)
+    assert created and not created_again
+    assert second is first
+
+    release.set()
+    first.wait(timeout=5)
+    third, created = runner.submit("build", "build:all", work)
+    assert created and third is not first
+    third.wait(timeout=5)
+    assert len(calls) == 2
+    runner.shutdown()
+
+
+def test_shared_lock_serializes_jobs():
+    runner = JobRunner(workers=2)
+    active = []
+    overlap = []
+    guard = threading.Lock()
+
+    def work(emit):
+        with guard:
+            active.append(1)
+            overlap.append(len(active))
+        threading.Event().wait(0.05)
+        with guard:
+            active.pop()
+        return {"status": "success"}
+
+    jobs = [runner.submit("build", key, work, lock="public-release")[0] for key in ("a", "b", "c")]
+    for job in jobs:
+        assert job.wait(timeout=5)
+    assert max(overlap) == 1
+    runner.shutdown()
+
+
+def test_failures_are_reported():
+    runner = JobRunner(workers=1)
+
+    def boom(emit):
+        emit("starting")
+        raise RuntimeError("disk full")
+
+    job, _ = runner.submit("sync", "sync", boom)
+    job.wait(timeout=5)
+    assert job.status == ERROR
+    assert job.result == {"status": "error", "message": "disk full"}
+    assert job.exception == "RuntimeError('disk full')"
+    assert job.output[0] == "starting"
+
+    failed, _ = runner.submit("scan", "scan:web/a", lambda emit: {"status": "error"})
+    failed.wait(timeout=5)
+    assert failed.status == ERROR and failed.exception is None
+    runner.shutdown()
+
+
+def test_history_is_bounded():
+    runner = JobRunner(workers=1, history=2)
+    jobs = []
+    for i in range(4):
+        job, _ = runner.submit("scan", f"scan:{i}", lambda emit: {"status": "success"})
+        job.wait(timeout=5)
+        jobs.append(job)
+    runner.submit("scan", "scan:last", lambda emit: {"status": "success"})[0].wait(timeout=5)
+    assert runner.get(jobs[0].id) is None
+    assert runner.get(jobs[3].id) is jobs[3]
+    runner.shutdown()
+
+
+def test_shared_store_across_workers(tmp_path):
+    from job_runner import RemoteJob, SharedJobStore
+
+    path = tmp_path / "jobs.sqlite"
+    worker_a = JobRunner(workers=1, store=SharedJobStore(path))
+    worker_b = JobRunner(workers=1, store=SharedJobStore(path))
+    release = threading.Event()
+
+    def work(emit):
+        emit("building")
+        release.wait(5)
+        emit("done")
+        return {"status": "success", "data": {"output": "ok"}}
+
+    job, created = worker_a.submit("build", "build:all", work, lock="public-release")
+    assert created
+    remote, created = worker_b.submit("build", "build:all", work, lock="public-release")
+    assert not created and isinstance(remote, RemoteJob) and remote.id == job.id
+
+    seen = worker_b.get(job.id)
+    assert seen.to_dict()["status"] in ("queued", "running")
+    release.set()
+    assert seen.wait(timeout=5)
+    assert seen.status == SUCCESS
+    assert seen.result == {"status": "success", "data": {"output": "ok"}}
+    assert [line for _, line in seen.follow(0)] == ["building", "done"]
+    assert [j.id for j in worker_b.list()] == [job.id]
+    worker_a.shutdown()
+    worker_b.shutdown()
+
+
+def test_shared_store_forgets_dead_workers(tmp_path):
+    from job_runner import SharedJobStore
+
+    store = SharedJobStore(tmp_path / "jobs.sqlite")
+    runner = JobRunner(workers=1, store=store)
+    job, _ = runner.submit("sync", "sync", lambda emit: {"status": "success"})
+    job.wait(timeout=5)
+    store._conn().execute("UPDATE jobs SET status = 'running', pid = 999999999 WHERE id = ?", (job.id,))
+
+    assert store.active("sync") is None
+    assert store.get(job.id).status == ERROR
+    runner.shutdown()
@@ -0,0 +1,97 @@
+"""Unit tests for scripts/metadata_cache.py"""
+import os
+from datetime import date
+
+import pytest
+import yaml
+
+from challenge_index import ChallengeIndex
+from metadata_cache import MetadataCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / ".ctf-cache" / "meta.sqlite"
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_warm_run_does_not_parse(tmp_path, cache_path):
+    yml = tmp_path / "public.yml"
+    yml.write_text("title: T\ncreated_at: 2025-01-02\ntags: [a, b]\n", encoding="utf-8")
+
+    with MetadataCache(cache_path) as cold:
+        first = cold.load(yml)
+    assert (cold.hits, cold.misses) == (0, 1)
+
+    with MetadataCache(cache_path) as warm:
+        second = warm.load(yml)
+    assert (warm.hits, warm.misses) == (1, 0)
+    assert second == first
+    assert second["created_at"] == date(2025, 1, 2)
+
+
+def test_touched_but_identical_file_hits_by_content(tmp_path, cache_path):
+    yml = tmp_path / "public.yml"
+    yml.write_text("title: T\n", encoding="utf-8")
+    with MetadataCache(cache_path) as cache:
+        cache.load(yml)
+
+    _bump_mtime(yml)
+    with MetadataCache(cache_path) as cache:
+        assert cache.load(yml) == {"title": "T"}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_changed_content_is_reparsed(tmp_path, cache_path):
+    yml = tmp_path / "public.yml"
+    yml.write_text("title: T\n", encoding="utf-8")
+    with MetadataCache(cache_path) as cache:
+        cache.load(yml)
+
+    yml.write_text("title: Changed\n", encoding="utf-8")
+    _bump_mtime(yml)
+    with MetadataCache(cache_path) as cache:
+        assert cache.load(yml) == {"title": "Changed"}
+    assert cache.misses == 1
+
+
+def test_yaml_errors_are_cached(tmp_path, cache_path):
+    yml = tmp_path / "public.yml"
+    yml.write_text("title: [unclosed\n", encoding="utf-8")
+    with MetadataCache(cache_path) as cache:
+        with pytest.raises(yaml.YAMLError):
+            cache.load(yml)
+
+    with MetadataCache(cache_path) as cache:
+        with pytest.raises(yaml.YAMLError):
+            cache.load(yml)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_corrupt_cache_falls_back_to_parsing(tmp_path, cache_path):
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_bytes(b"this is not a sqlite database" * 10)
+    yml = tmp_path / "public.yml"
+    yml.write_text("title: T\n", encoding="utf-8")
+
+    with MetadataCache(cache_path) as cache:
+        assert cache.load(yml) == {"title": "T"}
+
+
+def test_index_uses_cache_across_processes(tmp_path, cache_path):
+    root = tmp_path / "challenges"
+    (root / "web" / "a").mkdir(parents=True)
+    (root / "web" / "a" / "public.yml").write_text("title: A\n", encoding="utf-8")
+
+    with MetadataCache(cache_path) as cache:
+        ChallengeIndex(root, cache).scan()
+
+    # 新的 index 模擬新的行程：沒有記憶體快取，但持久化快取命中
+    with MetadataCache(cache_path) as cache:
+        records = ChallengeIndex(root, cache).scan()
+    assert records[0].data == {"title": "A"}
+    assert (cache.hits, cache.misses) == (1, 0)
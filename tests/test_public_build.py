@@ -0,0 +1,151 @@
+"""Unit tests for scripts/public_build.py (build.sh)"""
+import shutil
+
+import pytest
+
+import public_build
+from public_build import BuildError, BuildLogger, BuildOptions, PublicBuilder
+
+FLAG = "is1abCTF{real_flag_here}"
+
+
+def _challenge(root, category, name, ready=True):
+    path = root / category / name
+    (path / "files").mkdir(parents=True)
+    (path / "public.yml").write_text(
+        f"title: {name.title()}\ndifficulty: easy\nready_for_release: {str(ready).lower()}\n",
+        encoding="utf-8",
+    )
+    (path / "README.md").write_text(f"# {name}\nanswer {FLAG}\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    challenges = tmp_path / "challenges"
+    web = _challenge(challenges, "web", "sqli")
+    (web / "files" / "app.py").write_text("print('hi')\n", encoding="utf-8")
+    (web / "files" / "notes.txt").write_text(f"secret {FLAG}\n", encoding="utf-8")
+    (web / "docker").mkdir()
+    (web / "docker" / "docker-compose.yml").write_text(
+        f"environment:\n  - FLAG={FLAG}\n  password: hunter2\n", encoding="utf-8"
+    )
+    (web / "writeup").mkdir()
+    (web / "writeup" / "README.md").write_text(f"flag is {FLAG}\n", encoding="utf-8")
+    _challenge(challenges, "pwn", "bof")
+    _challenge(challenges, "pwn", "draft", ready=False)
+    (tmp_path / "config.yml").write_text(
+        'project:\n  name: "Test CTF"\n  year: 2025\n  flag_prefix: "is1abCTF"\n', encoding="utf-8"
+    )
+    return tmp_path
+
+
+def _options(project, **kwargs):
+    return BuildOptions(
+        output_dir=project / "public-release",
+        challenges_dir=project / "challenges",
+        config_file=project / "config.yml",
+        report_file=project / "build-report.md",
+        cache_dir=project / ".ctf-cache",
+        **kwargs,
+    )
+
+
+def _build(project, **kwargs):
+    log = BuildLogger(echo=False, color=False)
+    result = PublicBuilder(_options(project, **kwargs), log).build()
+    return result, log
+
+
+def test_full_build_layout(project):
+    result, _ = _build(project, include_writeups=True, jobs=1)
+    out = project / "public-release"
+
+    assert (result.total, result.processed, result.skipped, result.failed) == (3, 2, 1, 0)
+    assert result.scan_passed
+    sqli = out / "challenges" / "web" / "sqli"
+    assert sorted(p.name for p in (sqli / "files").iterdir()) == ["app.py"]
+    assert "[REDACTED]" in (sqli / "README.md").read_text(encoding="utf-8")
+    assert "[FLAG REDACTED]" in (sqli / "writeup" / "README.md").read_text(encoding="utf-8")
+    assert (sqli / "docker" / "docker-compose.yml").read_text(encoding="utf-8") == (
+        "environment:\n  - FLAG=${FLAG}\n  password: ${PASSWORD}\n"
+    )
+    assert not (out / "challenges" / "pwn" / "draft").exists()
+
+    readme = (out / "README.md").read_text(encoding="utf-8")
+    assert "### Pwn (1 題)" in readme
+    assert "- [Sqli](challenges/web/sqli/) - `easy`" in readme
+    report = (project / "build-report.md").read_text(encoding="utf-8")
+    assert "| 已處理 | 2 |" in report
+
+
+def test_parallel_matches_serial(project, monkeypatch):
+    monkeypatch.setattr(public_build, "_PARALLEL_MIN_CHALLENGES", 0)
+    _, serial = _build(project, jobs=1)
+    serial_files = sorted(p.relative_to(project) for p in (project / "public-release").rglob("*"))
+
+    _, parallel = _build(project, jobs=2, force=True, clean=True)
+    parallel_files = sorted(p.relative_to(project) for p in (project / "public-release").rglob("*"))
+
+    assert parallel_files == serial_files
+    strip = lambda lines: [l for l in lines if "強制覆蓋" not in l and "建置時間" not in l]
+    assert strip(parallel.lines) == strip(serial.lines)
+
+
+def test_existing_output_requires_force(project):
+    (project / "public-release").mkdir()
+    with pytest.raises(BuildError):
+        _build(project)
+
+
+def test_sensitive_file_fails_scan(project):
+    (project / "challenges" / "pwn" / "bof" / "files" / "solution.py").write_text(
+        "print(1)\n", encoding="utf-8"
+    )
+    with pytest.raises(BuildError):
+        _build(project, jobs=1)
+    report = project / "build-report.md"
+    assert not report.exists()
+
+
+def _snapshot(root):
+    return {
+        p.relative_to(root).as_posix(): (p.stat().st_mtime_ns, p.read_bytes())
+        for p in root.rglob("*") if p.is_file()
+    }
+
+
+def test_incremental_rebuild_keeps_untouched_outputs(project):
+    out = project / "public-release"
+    _, first = _build(project, jobs=1)
+    before = _snapshot(out)
+
+    result, second = _build(project, jobs=1, force=True)
+    assert result.reused == 3
+    assert _snapshot(out) == before
+    strip = lambda lines: [l for l in lines if "增量建置" not in l and "沿用" not in l
+                           and "建置時間" not in l]
+    assert strip(second.lines) == strip(first.lines)
+
+    readme = project / "challenges" / "web" / "sqli" / "README.md"
+    readme.write_text(f"# sqli v2\nanswer {FLAG}\n", encoding="utf-8")
+    result, _ = _build(project, jobs=1, force=True)
+    after = _snapshot(out)
+    changed = {rel for rel in after if after[rel] != before.get(rel)}
+    assert result.reused == 2
+    assert changed == {"challenges/web/sqli/README.md"}
+
+
+def test_incremental_rebuild_removes_stale_outputs(project):
+    out = project / "public-release"
+    _build(project, jobs=1)
+
+    shutil.rmtree(project / "challenges" / "pwn" / "bof")
+    (project / "challenges" / "web" / "sqli" / "files" / "app.py").unlink()
+    _, log = _build(project, jobs=1, force=True)
+
+    assert not (out / "challenges" / "pwn").exists()
+    assert (out / "challenges" / "web" / "sqli" / "files").is_dir()
+    assert list((out / "challenges" / "web" / "sqli" / "files").iterdir()) == []
+    assert "[INFO] 移除已刪除題目的輸出: pwn/bof" in log.lines
+    assert "### Pwn" not in (out / "README.md").read_text(encoding="utf-8")
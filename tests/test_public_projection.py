@@ -0,0 +1,88 @@
+"""Tests for scripts/public_projection.py (shared private.yml → public.yml rules)."""
+import os
+import threading
+
+import yaml
+
+from atomic_io import locked
+from public_projection import PublicProjection, project_tree
+
+PRIVATE = {
+    "title": "SQLi",
+    "flag": "is1abCTF{x}",
+    "flag_format": "is1abCTF{...}",
+    "solution_steps": ["a"],
+    "internal_notes": "n",
+    "testing": {"tested_by": "amy"},
+    "Deploy_Password": "hunter2",
+    "hints": [{"level": 1, "cost": 0, "content": "look at the login form"}],
+    "points": 100,
+}
+
+
+def test_project_applies_defaults_config_fields_and_hint_redaction():
+    projection = PublicProjection.from_config({"security": {"sensitive_yaml_fields": ["deploy_password"]}})
+    assert projection.project(PRIVATE) == {
+        "title": "SQLi",
+        "hints": [{"level": 1, "cost": 0}],
+        "points": 100,
+    }
+    assert projection.sanitize({"title": "t", "token": "x", "hints": PRIVATE["hints"]}) == {
+        "title": "t",
+        "hints": PRIVATE["hints"],
+    }
+    assert "content" in PRIVATE["hints"][0]
+
+
+def test_write_skips_unchanged_output(tmp_path):
+    public_yml = tmp_path / "public.yml"
+    projection = PublicProjection()
+    assert projection.write(public_yml, PRIVATE)
+    os.utime(public_yml, ns=(1, 1))
+
+    assert not projection.write(public_yml, dict(PRIVATE))
+    assert public_yml.stat().st_mtime_ns == 1
+
+    assert projection.write(public_yml, {**PRIVATE, "points": 200})
+    assert yaml.safe_load(public_yml.read_text(encoding="utf-8"))["points"] == 200
+
+
+def test_project_tree_reprojects_after_rule_change(tmp_path):
+    for name in ("a", "b"):
+        d = tmp_path / "web" / name
+        d.mkdir(parents=True)
+        (d / "private.yml").write_text(yaml.safe_dump({"title": name, "author_email": "x@y"}), encoding="utf-8")
+    (tmp_path / "web" / "c").mkdir()
+
+    first = project_tree(tmp_path, PublicProjection(), tmp_path / ".locks")
+    assert [p.parent.name for p in first.written] == ["a", "b"] and not first.errors
+    assert not project_tree(tmp_path, PublicProjection(), tmp_path / ".locks").written
+
+    stricter = PublicProjection(["author_email"])
+    preview = project_tree(tmp_path, stricter, tmp_path / ".locks", dry_run=True)
+    assert len(preview.written) == 2
+    assert "author_email" in (tmp_path / "web" / "a" / "public.yml").read_text(encoding="utf-8")
+
+    applied = project_tree(tmp_path, stricter, tmp_path / ".locks")
+    assert len(applied.written) == 2
+    assert yaml.safe_load((tmp_path / "web" / "a" / "public.yml").read_text(encoding="utf-8")) == {"title": "a"}
+
+
+def test_project_tree_waits_for_web_interface_lock(tmp_path):
+    challenge = tmp_path / "web" / "a"
+    challenge.mkdir(parents=True)
+    private_yml, public_yml = challenge / "private.yml", challenge / "public.yml"
+    private_yml.write_text(yaml.safe_dump({"title": "old"}), encoding="utf-8")
+    lock_dir = tmp_path / ".locks"
+    reports = []
+
+    batch = threading.Thread(target=lambda: reports.append(project_tree(tmp_path, PublicProjection(), lock_dir)))
+    with locked([private_yml, public_yml], lock_dir):
+        batch.start()
+        batch.join(0.5)
+        assert batch.is_alive() and not public_yml.exists()
+        private_yml.write_text(yaml.safe_dump({"title": "new"}), encoding="utf-8")
+    batch.join(5)
+
+    assert [p.parent.name for p in reports[0].written] == ["a"]
+    assert yaml.safe_load(public_yml.read_text(encoding="utf-8")) == {"title": "new"}
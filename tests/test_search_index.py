@@ -0,0 +1,37 @@
+"""Unit tests for scripts/search_index.py"""
+import json
+
+from search_index import SearchIndex, shard_key, tokenize
+
+
+def test_tokenize_words_and_cjk():
+    assert tokenize("SQL Injection 入門") == ["sql", "injection", "入", "門", "入門"]
+    assert tokenize("密碼學") == ["密", "碼", "學", "密碼", "碼學"]
+    # 全形英數字與大小寫正規化
+    assert tokenize("ＲＳＡ-2048") == ["rsa", "2048"]
+
+
+def test_shard_key_groups_prefixes():
+    assert shard_key("sql") == shard_key("sqli") == "s"
+    assert shard_key("密碼") == shard_key("密")
+    assert shard_key("密碼").startswith("u")
+
+
+def test_build_postings_and_manifest():
+    index = SearchIndex.build([
+        {"title": "SQL Injection", "tags": ["web"], "description": "登入頁面"},
+        {"title": "Baby RSA", "tags": ["密碼學"], "author": "alice", "description": "sql 不在標題"},
+    ])
+    s_shard = json.loads(index.shard_json("s"))
+    # [題目編號, 權重, ...]：標題 8、描述 1
+    assert s_shard["sql"] == [0, 8, 1, 1]
+    assert json.loads(index.shard_json(shard_key("密碼")))["密碼"] == [1, 4]
+
+    manifest = index.manifest()
+    assert set(manifest) == set(index.shards)
+    changed = SearchIndex.build([
+        {"title": "SQL Injection", "tags": ["web"], "description": "登入頁面"},
+        {"title": "Baby RSA", "tags": ["密碼學"], "author": "bob", "description": "sql 不在標題"},
+    ]).manifest()
+    # 只有 alice → bob 影響的分片版本改變
+    assert {k for k in manifest.keys() | changed.keys() if manifest.get(k) != changed.get(k)} == {"a", "b"}
@@ -347,3 +347,18 @@ def test_web_create_challenge_does_not_write_legacy_keys(temp_config, tmp_path):
     assert "reviewer" not in data
     assert "validation_status" not in data
     assert "internal_validation_notes" not in data
+
+
+def test_post_setup_with_stale_version_returns_409(client, temp_config):
+    from atomic_io import file_version
+
+    stale = file_version(temp_config)
+    ok = client.post("/setup/project", data={"project_name": "first"}, headers={"If-Match": stale})
+    assert ok.status_code == 200
+    assert ok.get_json()["version"] == file_version(temp_config)
+
+    resp = client.post("/setup/project", data={"project_name": "second"}, headers={"If-Match": stale})
+    assert resp.status_code == 409
+    body = resp.get_json()
+    assert body["conflict"] and body["version"] == file_version(temp_config)
+    assert yaml.safe_load(temp_config.read_text())["project"]["name"] == "first"
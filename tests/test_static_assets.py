@@ -0,0 +1,62 @@
+"""Unit tests for scripts/static_assets.py"""
+import gzip
+
+import pytest
+
+from static_assets import build_site, hashed_name, minify, precompress, rewrite_references
+
+
+def test_minify_keeps_template_literals():
+    js = "const url = `search/${key}.json  // not a comment`;\n// comment\nlet  x = 1;\n"
+    out = minify(js, ".js")
+    assert "`search/${key}.json  // not a comment`" in out
+    assert "comment\n" not in out.replace("not a comment", "")
+    assert minify("a {  color : red ; }\n", ".css") == "a{color:red}"
+
+
+def test_hashed_name_and_references():
+    assert hashed_name("assets/app.css", b"x").startswith("assets/app.")
+    assert hashed_name("assets/app.css", b"x") != hashed_name("assets/app.css", b"y")
+    assets = {"assets/app.css": "assets/app.0123456789.css"}
+    html = '<link href="../assets/app.css?v=1"><a href="https://x/assets/app.css"><img src="a.png">'
+    assert rewrite_references(html, "docs/index.html", assets) == (
+        '<link href="../assets/app.0123456789.css?v=1"><a href="https://x/assets/app.css"><img src="a.png">'
+    )
+
+
+def test_precompress_skips_small_and_binary_files():
+    data = b"<p>hello</p>" * 200
+    assert gzip.decompress(precompress("index.html", data)[".gz"]) == data
+    assert precompress("index.html", b"<p>hi</p>") == {}
+    assert precompress("logo.png", data) == {}
+
+
+def test_build_site(tmp_path):
+    src = tmp_path / "site"
+    (src / "assets").mkdir(parents=True)
+    (src / "index.html").write_text(
+        '<link rel="stylesheet" href="assets/app.css"><script src="assets/app.js"></script>' + "<p></p>" * 300,
+        encoding="utf-8",
+    )
+    (src / "assets" / "app.css").write_text("body {\n  margin: 0;\n}\n", encoding="utf-8")
+    (src / "assets" / "app.js").write_text("// hi\nconsole.log(1);\n", encoding="utf-8")
+    (src / "logo.png").write_bytes(b"\x89PNG")
+    dst = tmp_path / "dist"
+
+    report = build_site(src, dst)
+    css, js = report.assets["assets/app.css"], report.assets["assets/app.js"]
+    assert (dst / css).read_text(encoding="utf-8") == "body{margin:0}"
+    assert f'href="{css}"' in (dst / "index.html").read_text(encoding="utf-8")
+    assert f'src="{js}"' in (dst / "index.html").read_text(encoding="utf-8")
+    assert (dst / "index.html.gz").exists() and (dst / "logo.png").exists()
+    assert not (dst / "assets" / "app.css").exists()
+
+    assert build_site(src, dst).written == []
+
+    (src / "assets" / "app.css").write_text("body { margin: 1px; }\n", encoding="utf-8")
+    report = build_site(src, dst)
+    assert report.removed == [css]
+    assert set(report.written) == {report.assets["assets/app.css"], "index.html", "index.html.gz"}
+
+    with pytest.raises(ValueError):
+        build_site(src, src / "dist")
@@ -0,0 +1,119 @@
+"""Unit tests for scripts/sync-to-public.py (PublicSync)"""
+import shutil
+
+import pytest
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    for category, name in [("web", "xss"), ("crypto", "rsa")]:
+        path = tmp_path / "challenges" / category / name
+        (path / "files").mkdir(parents=True)
+        (path / "public.yml").write_text(
+            f"title: {name}\ncategory: {category}\nready_for_release: true\n"
+            "allowed_files:\n  - files/*\n",
+            encoding="utf-8",
+        )
+        (path / "files" / "chall.py").write_text("print(1)\n", encoding="utf-8")
+    (tmp_path / "config.yml").write_text(
+        'project:\n  name: "Test CTF"\n  flag_prefix: "is1abCTF"\n', encoding="utf-8"
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _sync(module):
+    sync = module.PublicSync("config.yml")
+    sync.prepare_public_directory()
+    sync.sync_all_challenges()
+    sync.generate_public_summary()
+    return sync
+
+
+def _snapshot(root):
+    return {
+        p.relative_to(root).as_posix(): (p.stat().st_mtime_ns, p.read_bytes())
+        for p in root.rglob("*") if p.is_file()
+    }
+
+
+def test_resync_only_touches_changed_challenges(workspace, sync_to_public_module):
+    out = workspace / "public-release"
+    _sync(sync_to_public_module)
+    before = _snapshot(out)
+    assert "challenges/web/xss/files/chall.py" in before
+
+    sync = _sync(sync_to_public_module)
+    assert not sync.changed
+    assert _snapshot(out) == before
+
+    (workspace / "challenges" / "web" / "xss" / "files" / "chall.py").write_text(
+        "print(2)\n", encoding="utf-8"
+    )
+    sync = _sync(sync_to_public_module)
+    after = _snapshot(out)
+    changed = {rel for rel in after if after[rel] != before.get(rel)}
+    assert changed == {
+        "README.md", "challenges/web/xss/README.md", "challenges/web/xss/files/chall.py",
+    }
+
+
+def test_resync_rewrites_summary_after_project_change(workspace, sync_to_public_module):
+    out = workspace / "public-release"
+    _sync(sync_to_public_module)
+    before = _snapshot(out)
+
+    (workspace / "config.yml").write_text(
+        'project:\n  name: "Renamed CTF"\n  flag_prefix: "is1abCTF"\n', encoding="utf-8"
+    )
+    sync = _sync(sync_to_public_module)
+    after = _snapshot(out)
+
+    assert not sync.changed
+    assert {rel for rel in after if after[rel] != before.get(rel)} == {"README.md"}
+    assert "# Renamed CTF" in (out / "README.md").read_text(encoding="utf-8")
+
+
+def test_resync_removes_deleted_challenges(workspace, sync_to_public_module):
+    out = workspace / "public-release"
+    _sync(sync_to_public_module)
+
+    shutil.rmtree(workspace / "challenges" / "crypto" / "rsa")
+    _sync(sync_to_public_module)
+
+    assert not (out / "challenges" / "crypto").exists()
+    assert (out / "challenges" / "web" / "xss" / "files" / "chall.py").exists()
+    assert "rsa" not in (out / "README.md").read_text(encoding="utf-8")
+
+
+def test_build_and_sync_share_output_directory(workspace, sync_to_public_module):
+    # build.sh 與 sync-to-public.py 輸出到同一個目錄時，各自的 manifest 不能互相刪除輸出
+    from public_build import BuildLogger, BuildOptions, PublicBuilder
+
+    out = workspace / "public-release"
+    for readme in ["web/xss", "crypto/rsa"]:
+        (workspace / "challenges" / readme / "README.md").write_text(f"# {readme}\n", encoding="utf-8")
+
+    def build():
+        options = BuildOptions(
+            output_dir=out,
+            challenges_dir=workspace / "challenges",
+            config_file=workspace / "config.yml",
+            report_file=workspace / "build-report.md",
+            cache_dir=workspace / ".ctf-cache",
+            jobs=1,
+            force=True,
+        )
+        PublicBuilder(options, BuildLogger(echo=False, color=False)).build()
+
+    build()
+    built = set(_snapshot(out))
+    assert "challenges/web/xss/files/chall.py" in built
+    _sync(sync_to_public_module)
+    synced = set(_snapshot(out))
+    assert synced >= {"README.md", "challenges/web/xss/README.md", "challenges/web/xss/files/chall.py"}
+
+    build()
+    assert set(_snapshot(out)) >= built | synced
+    _sync(sync_to_public_module)
+    assert set(_snapshot(out)) >= synced
@@ -0,0 +1,58 @@
+"""Tests for validate-all-challenges.py — in-process / parallel validation."""
+
+import sys
+
+import pytest
+
+
+EXAMPLE_CHALLENGES = [
+    "crypto/rsa_beginner",
+    "pwn/buffer_overflow",
+    "web/sql_injection",
+    "reverse/simple_crackme",
+    "misc/forensics_basic",
+]
+
+
+@pytest.fixture
+def example_challenges(examples_dir):
+    return [
+        {
+            "path": examples_dir / c,
+            "category": c.split("/")[0],
+            "name": c.split("/")[1],
+        }
+        for c in EXAMPLE_CHALLENGES
+    ]
+
+
+def test_in_process_matches_subprocess(validate_all_module, examples_dir, project_root, monkeypatch):
+    monkeypatch.chdir(project_root)
+    challenge = {"path": examples_dir / "web" / "sql_injection"}
+
+    validator = validate_all_module.AllChallengesValidator(use_subprocess=True)
+    expected = validator.validate_single_challenge(challenge)
+    actual = validate_all_module.validate_in_process(str(challenge["path"]))
+
+    assert actual["success"] == expected["success"]
+    assert actual["output"] == expected["output"]
+
+
+def test_in_process_reports_failure(validate_all_module, tmp_path):
+    result = validate_all_module.validate_in_process(str(tmp_path))
+    assert result["success"] is False
+    assert "Missing public.yml" in result["output"]
+
+
+def test_parallel_results_keep_order(validate_all_module, example_challenges, monkeypatch):
+    # process pool 需要能以模組名稱找回 worker 函式
+    monkeypatch.setitem(sys.modules, validate_all_module.__name__, validate_all_module)
+
+    serial = validate_all_module.AllChallengesValidator(jobs=1)
+    parallel = validate_all_module.AllChallengesValidator(jobs=2)
+
+    serial_results = list(serial.run_validations(example_challenges))
+    parallel_results = list(parallel.run_validations(example_challenges))
+
+    assert parallel_results == serial_results
+    assert len(parallel_results) == len(EXAMPLE_CHALLENGES)
@@ -64,3 +64,29 @@ class TestExampleChallengesValidation:
             data = yaml.safe_load(f)
         for field in ["title", "category", "difficulty"]:
             assert field in data, f"Missing '{field}' in {challenge_path}/public.yml"
+
+
+class TestSensitiveDataInLargeFiles:
+    PATTERNS = [(r"is1abCTF\{[^}]+\}", "CRITICAL", "Flag 洩漏")]
+
+    def _dump(self, tmp_path, size):
+        dump = tmp_path / "memory.raw"
+        with open(dump, "wb") as f:
+            f.write(b"\x00" * size)
+            f.write(b"\nis1abCTF{leaked_flag}\n")
+        return dump
+
+    def test_file_over_1mb_is_checked(self, validate_challenge_module, tmp_path):
+        dump = self._dump(tmp_path, 2 * 1024 * 1024)
+        validator = validate_challenge_module.ChallengeValidator()
+        issues = validator.check_file_for_sensitive_data(dump, self.PATTERNS, "is1abCTF")
+        assert len(issues) == 1 and "is1abCTF{leaked_flag}" in issues[0]
+
+    def test_streamed_file_reports_line(self, validate_challenge_module, tmp_path, monkeypatch):
+        import stream_scan
+
+        monkeypatch.setattr(stream_scan, "STREAM_THRESHOLD", 1024)
+        dump = self._dump(tmp_path, 64 * 1024)
+        validator = validate_challenge_module.ChallengeValidator()
+        issues = validator.check_file_for_sensitive_data(dump, self.PATTERNS, "is1abCTF")
+        assert issues == ["CRITICAL: Flag 洩漏 在 memory.raw (第 2 行): is1abCTF{leaked_flag}"]
@@ -0,0 +1,80 @@
+"""Tests for scripts/web_metrics.py and the opt-in /api/metrics endpoint."""
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+from web_metrics import Histogram
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "web-interface"))
+
+import app as _app_module  # noqa: E402
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("demo_seconds", "Demo.", (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value, endpoint='a"b')
+    assert h.render() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{endpoint="a\\"b",le="0.1"} 2',
+        'demo_seconds_bucket{endpoint="a\\"b",le="1"} 3',
+        'demo_seconds_bucket{endpoint="a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{endpoint="a\\"b"} 3.65',
+        'demo_seconds_count{endpoint="a\\"b"} 4',
+    ]
+
+
+@pytest.fixture
+def metrics_client(tmp_path, monkeypatch):
+    challenges = tmp_path / "challenges"
+    for name in ("a", "b"):
+        d = challenges / "web" / name
+        d.mkdir(parents=True)
+        (d / "public.yml").write_text(f"title: {name}\npoints: 100\n", encoding="utf-8")
+    (tmp_path / "config.yml").write_text('project:\n  name: "t"\n', encoding="utf-8")
+    monkeypatch.setenv("CTF_WEB_METRICS", "1")
+    monkeypatch.setenv("CTF_WEB_PROFILE", "1")
+    importlib.reload(_app_module)
+    monkeypatch.setattr(_app_module, "CONFIG_FILE", tmp_path / "config.yml")
+    monkeypatch.setattr(_app_module, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(_app_module, "CHALLENGES_DIR", challenges)
+    _app_module.ctf_manager = _app_module.CTFManager()
+    _app_module.app.config["TESTING"] = True
+    yield _app_module.app.test_client()
+    monkeypatch.delenv("CTF_WEB_METRICS")
+    monkeypatch.delenv("CTF_WEB_PROFILE")
+    importlib.reload(_app_module)
+
+
+def test_metrics_endpoint_reports_routes_and_fs_activity(metrics_client):
+    first = metrics_client.get("/api/challenges")
+    assert first.status_code == 200
+    assert metrics_client.get("/api/challenges", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    resp = metrics_client.get("/api/metrics")
+    assert resp.status_code == 200 and resp.mimetype == "text/plain"
+    text = resp.get_data(as_text=True)
+    assert 'ctf_http_request_duration_seconds_count{endpoint="api_challenges",method="GET",status="200"} 1' in text
+    assert 'ctf_http_request_duration_seconds_count{endpoint="api_challenges",method="GET",status="304"} 1' in text
+    assert 'ctf_http_request_yaml_parses_count{endpoint="api_challenges"} 2' in text
+    assert "ctf_challenges 2" in text
+
+    # 第一次載入快照需要列出目錄並解析 2 個 public.yml，第二次直接由快照回應
+    yaml_parses = _app_module.metrics.request_yaml_parses
+    assert yaml_parses._series[(("endpoint", "api_challenges"),)][-2] >= 2
+
+
+def test_profile_flag_writes_profile(metrics_client, tmp_path):
+    resp = metrics_client.get("/api/stats?_profile=1")
+    path = Path(resp.headers["X-CTF-Profile"])
+    assert path.parent == tmp_path / ".ctf-cache" / "profiles" and path.exists()
+    assert "X-CTF-Profile" not in metrics_client.get("/api/stats").headers
+
+
+def test_metrics_endpoint_is_off_by_default():
+    importlib.reload(_app_module)
+    assert _app_module.app.test_client().get("/api/metrics").status_code == 404
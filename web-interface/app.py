@@ -6,26 +6,38 @@ IS1AB CTF Template - 現代化 Web 介面
 
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
+import base64
+import copy
+import json
+import os
 import yaml
 import subprocess
 import time
 
-# 讓 scripts/setup_helpers.py 可被 import
+# 讓 scripts/ 下的共用模組（setup_helpers、atomic_io、public_projection、challenge_store、file_manifest、http_cache、job_runner、web_metrics）可被 import
 import sys as _sys
 _SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
 if str(_SCRIPTS_DIR) not in _sys.path:
     _sys.path.insert(0, str(_SCRIPTS_DIR))
 
+from atomic_io import VersionConflict, check_version, dump_yaml, file_version, locked
+from public_projection import PublicProjection
+from challenge_store import GROUP_FIELDS, get_store, project_fields, query_challenges
+from file_manifest import FileManifest
+from http_cache import HTTPCache, send_static, versioned
+from job_runner import SUCCESS, JobRunner, SharedJobStore
+from web_metrics import WebMetrics, metrics_enabled, profiling_enabled
+
 # Flask 相關套件
 from flask import (
     Flask,
+    Response,
     jsonify,
     render_template,
     request,
     send_file,
-    send_from_directory,
 )
 from flask_assets import Bundle, Environment
 from flask_cors import CORS
@@ -37,6 +49,25 @@ CORS(app)
 app.config["SECRET_KEY"] = "is1ab-ctf-secret-key"
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
 
+# 效能量測（CTF_WEB_METRICS=1 時啟用，/api/metrics 輸出 Prometheus 格式）
+# 需在 HTTPCache 之前註冊：after_request 反序執行，才能記錄到 304 等最終狀態碼
+metrics = None
+if metrics_enabled():
+    metrics = WebMetrics(
+        app,
+        profile_dir=lambda: BASE_DIR / ".ctf-cache" / "profiles",
+        enable_profiling=profiling_enabled(),
+        gauges={
+            "ctf_challenges": (
+                "Challenges in the current snapshot.",
+                lambda: len(ctf_manager.challenge_store().snapshot().challenges),
+            ),
+        },
+    )
+
+# ETag / 304 與 gzip、br 壓縮
+HTTPCache(app)
+
 # 配置目錄
 BASE_DIR = Path(__file__).parent.parent
 CHALLENGES_DIR = BASE_DIR / "challenges"
@@ -57,6 +88,9 @@ app.static_folder = str(STATIC_DIR)
 # 配置 Flask-Assets
 assets = Environment(app)
 assets.url = app.static_url_path
+# bundle 網址帶內容雜湊（?<hash>），static_files 會以 immutable 長期快取
+assets.versions = "hash"
+assets.url_expire = True
 
 # CSS Bundle - 包含 Bulma 和自定義樣式
 css_bundle = Bundle("css/custom.css", output="css/bundle.css", filters="cssmin")
@@ -72,12 +106,25 @@ class CTFManager:
 
     def __init__(self):
         self.config = self.load_config()
+        # (快照, config, 結果)：get_challenges_with_quota 的快取
+        self._quota_cache = None
+
+    def reload_config_if_changed(self) -> bool:
+        """config.yml 被其他 worker 或手動修改時重新載入；有重新載入時回傳 True"""
+        if _file_signature(CONFIG_FILE) == self._config_signature:
+            return False
+        self.config = self.load_config()
+        return True
 
     def load_config(self) -> Dict[str, Any]:
         """載入配置檔案"""
+        self._config_signature = _file_signature(CONFIG_FILE)
+        # private.yml → public.yml 的欄位規則（含 security.sensitive_yaml_fields）
+        self.projection = PublicProjection()
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as config_file:
                 raw_config = yaml.safe_load(config_file)
+            self.projection = PublicProjection.from_config(raw_config)
 
             # 適配配置結構
             project = raw_config.get("project", {}) or {}
@@ -299,14 +346,31 @@ class CTFManager:
 
     VALID_SETUP_STEPS = {"project", "team", "event", "quota"}
 
-    def save_setup_step(self, step: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """寫入單一 wizard 步驟的欄位至 config.yml。"""
+    def save_setup_step(
+        self, step: str, data: Dict[str, Any], expected_version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """寫入單一 wizard 步驟的欄位至 config.yml。
+
+        expected_version 為讀取時的 config 版本；檔案已被其他人修改時回傳 conflict。
+        """
         if step not in self.VALID_SETUP_STEPS:
             return {
                 "status": "error",
                 "message": f"無效步驟: {step}（合法: {sorted(self.VALID_SETUP_STEPS)}）",
             }
 
+        try:
+            with locked([CONFIG_FILE], _lock_dir()):
+                check_version(CONFIG_FILE, expected_version)
+                version = self._apply_setup_step(step, data)
+        except VersionConflict as conflict:
+            return _conflict_result(conflict)
+
+        self.config = self.load_config()
+        return {"status": "success", "message": f"已儲存 {step} 設定", "version": version}
+
+    def _apply_setup_step(self, step: str, data: Dict[str, Any]) -> str:
+        """讀取—修改—寫入 config.yml（呼叫端需持有 lock）；回傳新版本"""
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                 raw = yaml.safe_load(f) or {}
@@ -379,14 +443,28 @@ class CTFManager:
             if tt and tt.isdigit():
                 quota["total_target"] = int(tt)
 
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(raw, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        return dump_yaml(CONFIG_FILE, raw)
 
-        self.config = self.load_config()
-        return {"status": "success", "message": f"已儲存 {step} 設定"}
+    def update_config(
+        self, patch: Dict[str, Any], expected_version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """以白名單方式更新 config.yml 指定區塊。
 
-    def update_config(self, patch: Dict[str, Any]) -> Dict[str, Any]:
-        """以白名單方式更新 config.yml 指定區塊。"""
+        expected_version 為讀取時的 config 版本；檔案已被其他人修改時回傳 conflict。
+        """
+        try:
+            with locked([CONFIG_FILE], _lock_dir()):
+                check_version(CONFIG_FILE, expected_version)
+                result = self._apply_config_patch(patch)
+        except VersionConflict as conflict:
+            return _conflict_result(conflict)
+
+        if result["status"] == "success":
+            self.config = self.load_config()
+        return result
+
+    def _apply_config_patch(self, patch: Dict[str, Any]) -> Dict[str, Any]:
+        """讀取—修改—寫入 config.yml（呼叫端需持有 lock）"""
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as config_file:
                 raw_config = yaml.safe_load(config_file) or {}
@@ -514,33 +592,27 @@ class CTFManager:
         if "points" not in raw_config:
             raw_config["points"] = points
 
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            yaml.dump(
-                raw_config,
-                f,
-                default_flow_style=False,
-                allow_unicode=True,
-                sort_keys=False,
-            )
-
-        self.config = self.load_config()
-        return {"status": "success", "message": "設定已更新"}
+        version = dump_yaml(CONFIG_FILE, raw_config)
+        return {"status": "success", "message": "設定已更新", "version": version}
 
     def get_challenges_with_quota(self) -> Dict[str, Any]:
-        """獲取挑戰列表並包含配額信息"""
-        challenges = self.get_challenges()
+        """獲取挑戰列表並包含配額信息
+
+        結果依 (快照, config) 快取；題目與設定都沒變時直接回傳同一份資料。
+        """
+        snapshot = self.challenge_store().snapshot()
+        cached = self._quota_cache
+        if cached is not None and cached[0] is snapshot and cached[1] is self.config:
+            return cached[2]
+
+        stats = snapshot.stats
+        quota_config = self.config.get("challenge_quota", {})
 
         # 按類別統計已出題目
         by_category = {}
         for category in self.config.get("categories", []):
-            category_challenges = [
-                c for c in challenges if c.get("category") == category
-            ]
-            quota = (
-                self.config.get("challenge_quota", {})
-                .get("by_category", {})
-                .get(category, 0)
-            )
+            category_challenges = list(stats.group("category", category))
+            quota = quota_config.get("by_category", {}).get(category, 0)
             by_category[category] = {
                 "published": category_challenges,
                 "published_count": len(category_challenges),
@@ -551,14 +623,8 @@ class CTFManager:
         # 按難度統計已出題目
         by_difficulty = {}
         for difficulty in self.config.get("difficulties", []):
-            difficulty_challenges = [
-                c for c in challenges if c.get("difficulty") == difficulty
-            ]
-            quota = (
-                self.config.get("challenge_quota", {})
-                .get("by_difficulty", {})
-                .get(difficulty, 0)
-            )
+            difficulty_challenges = list(stats.group("difficulty", difficulty))
+            quota = quota_config.get("by_difficulty", {}).get(difficulty, 0)
             by_difficulty[difficulty] = {
                 "published": difficulty_challenges,
                 "published_count": len(difficulty_challenges),
@@ -566,84 +632,48 @@ class CTFManager:
                 "remaining": max(0, quota - len(difficulty_challenges)),
             }
 
-        return {
-            "challenges": challenges,
+        result = {
+            "challenges": list(snapshot.challenges),
             "by_category": by_category,
             "by_difficulty": by_difficulty,
-            "total_published": len(challenges),
-            "total_quota": self.config.get("challenge_quota", {}).get(
-                "total_target", 0
-            ),
+            "total_published": stats.total_challenges,
+            "total_quota": quota_config.get("total_target", 0),
+            "version": snapshot.version,
         }
+        self._quota_cache = (snapshot, self.config, result)
+        return result
 
-    def get_challenges(self) -> List[Dict[str, Any]]:
-        """獲取挑戰列表"""
-        challenges = []
+    def challenge_store(self):
+        """目前 CHALLENGES_DIR 的記憶體快照（第一次呼叫時載入並開始監看）"""
+        return get_store(CHALLENGES_DIR)
 
+    def get_challenges(self) -> List[Dict[str, Any]]:
+        """獲取挑戰列表（來自記憶體快照，回傳的 dict 不可修改）"""
         try:
-            for category_dir in CHALLENGES_DIR.iterdir():
-                if not category_dir.is_dir():
-                    continue
-
-                category = category_dir.name
-                for challenge_dir in category_dir.iterdir():
-                    if not challenge_dir.is_dir():
-                        continue
-
-                    public_yml = challenge_dir / "public.yml"
-                    if public_yml.exists():
-                        try:
-                            with open(public_yml, "r", encoding="utf-8") as yml_file:
-                                challenge_data = yaml.safe_load(yml_file)
-
-                            challenge_data.update(
-                                {
-                                    "category": category,
-                                    "name": challenge_dir.name,
-                                    "path": str(challenge_dir),
-                                }
-                            )
-                            challenges.append(challenge_data)
-                        except Exception as load_error:
-                            print(f"載入挑戰失敗 {challenge_dir}: {load_error}")
-
+            return list(self.challenge_store().snapshot().challenges)
         except Exception as list_error:
             print(f"載入挑戰列表失敗: {list_error}")
-
-        return challenges
+            return []
 
     def get_stats(self) -> Dict[str, Any]:
-        """獲取統計資料"""
-        challenges = self.get_challenges()
-
-        stats = {
-            "total_challenges": len(challenges),
-            "by_category": {},
-            "by_difficulty": {},
-            "total_points": 0,
-        }
-
-        for challenge in challenges:
-            category = challenge.get("category", "unknown")
-            difficulty = challenge.get("difficulty", "unknown")
-            points = challenge.get("points", 0)
-
-            # 確保 points 是整數類型
-            try:
-                points = int(points) if points else 0
-            except (ValueError, TypeError):
-                points = 0
-
-            stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
-            stats["by_difficulty"][difficulty] = (
-                stats["by_difficulty"].get(difficulty, 0) + 1
-            )
-            stats["total_points"] += points
-
+        """獲取統計資料（快照中已增量維護，version 為快照版本）"""
+        snapshot = self.challenge_store().snapshot()
+        stats = snapshot.stats.as_dict()
+        stats["version"] = snapshot.version
         return stats
 
-    def run_scan_secrets(self, category: str, name: str) -> Dict[str, Any]:
-        """對單一題目執行敏感資料掃描（scan-secrets.py）。"""
+    def run_scan_secrets(
+        self,
+        category: str,
+        name: str,
+        jobs: Optional[int] = None,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """對單一題目執行敏感資料掃描（scan-secrets.py）。
+
+        jobs 為平行掃描的 worker 數；未指定時由 scan-secrets.py 使用 CPU 核心數。
+        emit 會逐行收到輸出（背景工作用來串流）。
+        """
         challenge_path = CHALLENGES_DIR / category / name
         if not challenge_path.exists():
             return {"status": "error", "message": "題目不存在"}
@@ -655,88 +685,89 @@ class CTFManager:
             str(challenge_path),
             "--verbose",
         ]
+        if jobs is not None:
+            cmd += ["--jobs", str(jobs)]
+        return self._run_command(cmd, "掃描完成", "掃描失敗", emit)
+
+    def _run_command(
+        self,
+        cmd: List[str],
+        success_message: str,
+        error_message: str,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """執行子程序並逐行讀取輸出（stderr 併入 stdout），回傳 run_* 的共用格式。"""
         started = time.time()
-        proc = subprocess.run(
+        lines: List[str] = []
+        proc = subprocess.Popen(
             cmd,
             cwd=str(BASE_DIR),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
+            bufsize=1,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
         )
+        with proc.stdout:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                lines.append(line)
+                if emit is not None:
+                    emit(line)
+        returncode = proc.wait()
         elapsed_ms = int((time.time() - started) * 1000)
-        output = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
-        status = "success" if proc.returncode == 0 else "error"
+        status = "success" if returncode == 0 else "error"
+        if metrics is not None:
+            metrics.observe_task(Path(cmd[1]).stem, elapsed_ms / 1000, status)
         return {
             "status": status,
-            "message": "掃描完成" if status == "success" else "掃描失敗",
+            "message": success_message if status == "success" else error_message,
             "data": {
-                "exit_code": proc.returncode,
+                "exit_code": returncode,
                 "elapsed_ms": elapsed_ms,
-                "output": output.strip(),
+                "output": "\n".join(lines).strip(),
             },
         }
 
-    def run_build_public(self, category: str, name: str, force: bool = True) -> Dict[str, Any]:
-        """對單一題目執行 public-release 建置（build.sh）。"""
+    def run_build_public(
+        self,
+        category: str,
+        name: str,
+        force: bool = True,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """對單一題目執行 public-release 建置（public_build.py）。
+
+        與掃描、同步相同，以子程序執行：建置會啟動 process pool，在多執行緒的
+        Web 行程（gunicorn gthread worker）中 fork 可能卡在其他執行緒持有的 lock。
+        """
         challenge_path = CHALLENGES_DIR / category / name
         if not challenge_path.exists():
             return {"status": "error", "message": "題目不存在"}
 
         cmd = [
-            str(BASE_DIR / "scripts" / "build.sh"),
+            "python",
+            str(BASE_DIR / "scripts" / "public_build.py"),
             "--challenge",
             str(challenge_path),
         ]
         if force:
             cmd.append("--force")
+        return self._run_command(cmd, "建置完成", "建置失敗", emit)
 
-        started = time.time()
-        proc = subprocess.run(
-            cmd,
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-        )
-        elapsed_ms = int((time.time() - started) * 1000)
-        output = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
-        status = "success" if proc.returncode == 0 else "error"
-        return {
-            "status": status,
-            "message": "建置完成" if status == "success" else "建置失敗",
-            "data": {
-                "exit_code": proc.returncode,
-                "elapsed_ms": elapsed_ms,
-                "output": output.strip(),
-            },
-        }
-
-    def run_build_all_public(self, force: bool = True) -> Dict[str, Any]:
-        """建置所有題目到 public-release（build.sh）。"""
-        cmd = [str(BASE_DIR / "scripts" / "build.sh")]
+    def run_build_all_public(
+        self, force: bool = True, emit: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """建置所有題目到 public-release（public_build.py）。"""
+        cmd = [
+            "python",
+            str(BASE_DIR / "scripts" / "public_build.py"),
+        ]
         if force:
             cmd.append("--force")
+        return self._run_command(cmd, "建置完成", "建置失敗", emit)
 
-        started = time.time()
-        proc = subprocess.run(
-            cmd,
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-        )
-        elapsed_ms = int((time.time() - started) * 1000)
-        output = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
-
-        status = "success" if proc.returncode == 0 else "error"
-        return {
-            "status": status,
-            "message": "建置完成" if status == "success" else "建置失敗",
-            "data": {
-                "exit_code": proc.returncode,
-                "elapsed_ms": elapsed_ms,
-                "output": output.strip(),
-            },
-        }
-
-    def run_sync_to_public(self) -> Dict[str, Any]:
+    def run_sync_to_public(self, emit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """同步 ready_for_release 題目到 public-release（sync-to-public.py）。"""
         cmd = [
             "python",
@@ -744,25 +775,7 @@ class CTFManager:
             "--config",
             str(BASE_DIR / "config.yml"),
         ]
-        started = time.time()
-        proc = subprocess.run(
-            cmd,
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-        )
-        elapsed_ms = int((time.time() - started) * 1000)
-        output = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr else "")
-        status = "success" if proc.returncode == 0 else "error"
-        return {
-            "status": status,
-            "message": "同步完成" if status == "success" else "同步失敗",
-            "data": {
-                "exit_code": proc.returncode,
-                "elapsed_ms": elapsed_ms,
-                "output": output.strip(),
-            },
-        }
+        return self._run_command(cmd, "同步完成", "同步失敗", emit)
 
     def create_challenge(self, challenge_data: Dict[str, Any]) -> Dict[str, Any]:
         """創建新挑戰"""
@@ -825,11 +838,13 @@ class CTFManager:
 
             # 創建題目目錄
             challenge_path = CHALLENGES_DIR / category / name
-            if challenge_path.exists():
-                return {"status": "error", "message": f"題目 {category}/{name} 已存在"}
 
-            # 創建目錄結構
-            challenge_path.mkdir(parents=True, exist_ok=True)
+            # 創建目錄結構（mkdir 不允許已存在，兩個 request 同時建立同名題目時只有一個會成功）
+            challenge_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                challenge_path.mkdir()
+            except FileExistsError:
+                return {"status": "error", "message": f"題目 {category}/{name} 已存在"}
 
             # 創建子目錄
             subdirs = ["src", "files", "writeup"]
@@ -906,38 +921,11 @@ class CTFManager:
 
             # 保存 private.yml
             private_yml_path = challenge_path / "private.yml"
-            with open(private_yml_path, "w", encoding="utf-8") as f:
-                yaml.dump(
-                    private_config,
-                    f,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False,
-                )
+            dump_yaml(private_yml_path, private_config)
 
             # 創建 public.yml (移除敏感資訊)
-            public_config = {
-                k: v
-                for k, v in private_config.items()
-                if not k.startswith(("flag", "solution_", "internal_", "testing"))
-            }
-
-            # 移除敏感的 hints 內容
-            if "hints" in public_config:
-                public_config["hints"] = [
-                    {"level": hint["level"], "cost": hint["cost"]}
-                    for hint in public_config["hints"]
-                ]
-
-            public_yml_path = challenge_path / "public.yml"
-            with open(public_yml_path, "w", encoding="utf-8") as f:
-                yaml.dump(
-                    public_config,
-                    f,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False,
-                )
+            self.projection.write(challenge_path / "public.yml", private_config)
+            _notify_challenges_changed()
 
             # 創建 README.md
             readme_content = f"""# {name}
@@ -1069,105 +1057,104 @@ tail -f /dev/null
             return {"status": "error", "message": f"創建題目失敗: {str(create_error)}"}
 
     def update_challenge(
-        self, category: str, name: str, challenge_data: Dict[str, Any]
+        self,
+        category: str,
+        name: str,
+        challenge_data: Dict[str, Any],
+        expected_version: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """更新現有題目"""
+        """更新現有題目
+
+        expected_version 為讀取時 private.yml 的版本；已被其他人修改時回傳 conflict。
+        """
         try:
             challenge_path = CHALLENGES_DIR / category / name
             if not challenge_path.exists():
                 return {"status": "error", "message": "題目不存在"}
 
             private_yml_path = challenge_path / "private.yml"
-            if not private_yml_path.exists():
-                return {"status": "error", "message": "題目配置檔案不存在"}
-
-            # 讀取現有配置
-            with open(private_yml_path, "r", encoding="utf-8") as file:
-                existing_config = yaml.safe_load(file)
-
-            # 更新配置
-            updated_config = existing_config.copy()
-
-            # 更新基本欄位
-            updatable_fields = [
-                "title",
-                "author",
-                "difficulty",
-                "description",
-                "challenge_type",
-                "source_code_provided",
-                "files",
-                "status",
-                "points",
-                "tags",
-                "flag",
-                "flag_description",
-                "solution_steps",
-                "internal_notes",
-                "learning_objectives",
-                "required_skills",
-            ]
-
-            for field in updatable_fields:
-                if field in challenge_data:
-                    updated_config[field] = challenge_data[field]
-
-            # 處理提示
-            if "hints" in challenge_data:
-                updated_config["hints"] = challenge_data["hints"]
-
-            # 處理部署資訊
-            if "deploy_info" in challenge_data:
-                if "deploy_info" not in updated_config:
-                    updated_config["deploy_info"] = {}
-                updated_config["deploy_info"].update(challenge_data["deploy_info"])
-
-            # 更新時間戳
-            updated_config["updated_at"] = datetime.now().isoformat()
-
-            # 保存 private.yml
-            with open(private_yml_path, "w", encoding="utf-8") as file:
-                yaml.dump(
-                    updated_config,
-                    file,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False,
-                )
-
-            # 更新 public.yml
-            public_config = {
-                k: v
-                for k, v in updated_config.items()
-                if not k.startswith(("flag", "solution_", "internal_", "testing"))
-            }
-
-            # 移除敏感的 hints 內容
-            if "hints" in public_config:
-                public_config["hints"] = [
-                    {"level": hint["level"], "cost": hint["cost"]}
-                    for hint in public_config["hints"]
-                ]
-
             public_yml_path = challenge_path / "public.yml"
-            with open(public_yml_path, "w", encoding="utf-8") as file:
-                yaml.dump(
-                    public_config,
-                    file,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False,
+            with locked([private_yml_path, public_yml_path], _lock_dir()):
+                if not private_yml_path.exists():
+                    return {"status": "error", "message": "題目配置檔案不存在"}
+                check_version(private_yml_path, expected_version)
+                updated_config, version, changed = self._write_challenge_update(
+                    private_yml_path, public_yml_path, challenge_data
                 )
+            if changed:
+                _notify_challenges_changed()
 
             return {
                 "status": "success",
                 "message": f"題目 {category}/{name} 更新成功",
                 "data": updated_config,
+                "version": version,
             }
 
+        except VersionConflict as conflict:
+            return _conflict_result(conflict)
         except Exception as update_error:
             return {"status": "error", "message": f"更新題目失敗: {str(update_error)}"}
 
+    def _write_challenge_update(
+        self, private_yml_path: Path, public_yml_path: Path, challenge_data: Dict[str, Any]
+    ):
+        """合併欄位並寫入 private.yml / public.yml（呼叫端需持有 lock）；回傳 (新設定, 新版本, 是否有寫入)"""
+        # 讀取現有配置
+        with open(private_yml_path, "r", encoding="utf-8") as file:
+            existing_config = yaml.safe_load(file)
+
+        # 更新配置
+        updated_config = copy.deepcopy(existing_config)
+
+        # 更新基本欄位
+        updatable_fields = [
+            "title",
+            "author",
+            "difficulty",
+            "description",
+            "challenge_type",
+            "source_code_provided",
+            "files",
+            "status",
+            "points",
+            "tags",
+            "flag",
+            "flag_description",
+            "solution_steps",
+            "internal_notes",
+            "learning_objectives",
+            "required_skills",
+        ]
+
+        for field in updatable_fields:
+            if field in challenge_data:
+                updated_config[field] = challenge_data[field]
+
+        # 處理提示
+        if "hints" in challenge_data:
+            updated_config["hints"] = challenge_data["hints"]
+
+        # 處理部署資訊
+        if "deploy_info" in challenge_data:
+            if "deploy_info" not in updated_config:
+                updated_config["deploy_info"] = {}
+            updated_config["deploy_info"].update(challenge_data["deploy_info"])
+
+        # 沒有任何欄位改變時不寫入，兩個檔案的 mtime 與下游快取都維持有效
+        if updated_config == existing_config:
+            return existing_config, file_version(private_yml_path), False
+
+        # 更新時間戳
+        updated_config["updated_at"] = datetime.now().isoformat()
+
+        # 保存 private.yml
+        version = dump_yaml(private_yml_path, updated_config)
+
+        # 更新 public.yml（投影結果相同時不寫入）
+        self.projection.write(public_yml_path, updated_config)
+        return updated_config, version, True
+
     def validate_challenge(self, challenge_path: str) -> Dict[str, Any]:
         """驗證挑戰"""
         try:
@@ -1178,14 +1165,137 @@ tail -f /dev/null
             return {"status": "error", "message": f"驗證失敗: {str(validate_error)}"}
 
 
+def _file_signature(path: Path):
+    """(mtime_ns, size)；檔案不存在時為 None"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _lock_dir() -> Path:
+    """config.yml / 題目 YAML 的寫入 lock 檔目錄（多個 worker 共用）"""
+    return BASE_DIR / ".ctf-cache" / "locks"
+
+
+_file_manifests: Dict[Path, FileManifest] = {}
+
+
+def _attachments() -> FileManifest:
+    """附件清單與 sha256 快取（依 BASE_DIR 各一份）"""
+    path = BASE_DIR / ".ctf-cache" / "files.sqlite"
+    manifest = _file_manifests.get(path)
+    if manifest is None:
+        manifest = _file_manifests.setdefault(path, FileManifest(path))
+    return manifest
+
+
+def _conflict_result(conflict: VersionConflict) -> Dict[str, Any]:
+    """樂觀鎖衝突的回應內容；API 以 409 回傳，前端可用 version 重新載入"""
+    return {
+        "status": "error",
+        "conflict": True,
+        "message": str(conflict),
+        "version": conflict.current,
+    }
+
+
+def _if_match() -> Optional[str]:
+    """request 的 If-Match（前端讀取時拿到的檔案版本）；沒有帶或為 * 時為 None"""
+    tag = (request.headers.get("If-Match") or "").strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    return tag if tag and tag != "*" else None
+
+
+def _write_status(result: Dict[str, Any]) -> int:
+    if result["status"] == "success":
+        return 200
+    return 409 if result.get("conflict") else 400
+
+
 # 創建 CTF 管理器實例
 ctf_manager = CTFManager()
 
 
+def _generation_file() -> Path:
+    """多個 worker 共用的變更通知檔：任一 worker 寫入題目後更新它"""
+    return BASE_DIR / ".ctf-cache" / "web-generation"
+
+
+_seen_generation = None
+
+
+def _notify_challenges_changed():
+    """本 worker 寫入題目後呼叫：使本地快照失效，並通知其他 worker"""
+    ctf_manager.challenge_store().invalidate()
+    path = _generation_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(time.time_ns()), encoding="utf-8")
+    except OSError as notify_error:
+        print(f"無法更新變更通知檔: {notify_error}")
+
+
+@app.before_request
+def _sync_shared_state():
+    """每個 request 前檢查其他 worker 是否修改過 config.yml 或題目（各一次 stat）"""
+    global _seen_generation
+    ctf_manager.reload_config_if_changed()
+    generation = _file_signature(_generation_file())
+    if generation != _seen_generation:
+        if _seen_generation is not None:
+            ctf_manager.challenge_store().invalidate()
+        _seen_generation = generation
+
+
+def _data_version():
+    """頁面資料的版本：題目快照與 config.yml；任一改變時 ETag 隨之改變。"""
+    snapshot = ctf_manager.challenge_store().snapshot()
+    return snapshot.loaded_at, snapshot.version, _file_signature(CONFIG_FILE)
+
+# 掃描 / 建置 / 同步的背景工作（固定大小的 worker pool）
+# serve.py 以多個 worker 行程執行時（CTF_WEB_WORKERS > 1），工作狀態改存 sqlite 讓各 worker 共用
+if int(os.environ.get("CTF_WEB_WORKERS", "1")) > 1:
+    job_runner = JobRunner(store=SharedJobStore(BASE_DIR / ".ctf-cache" / "jobs.sqlite"))
+else:
+    job_runner = JobRunner()
+
+# 會寫入 public-release/ 的工作共用這個 lock，依序執行
+PUBLIC_RELEASE_LOCK = "public-release"
+
+
+def _run_job(kind: str, key: str, fn, body: Dict[str, Any], lock: Optional[str] = None):
+    """提交背景工作；body 帶 async 時立即回傳 202 與 job 資訊，否則等待結果。
+
+    相同 key 的工作執行中時會合併到既有的 job。
+    """
+    job, created = job_runner.submit(kind, key, fn, lock=lock)
+    if body.get("async") or request.args.get("async"):
+        data = _job_payload(job, include_output=False)
+        data["coalesced"] = not created
+        return jsonify({"status": "accepted", "data": data}), 202
+
+    job.wait()
+    if job.exception is not None:
+        return jsonify(job.result), 500
+    return jsonify(job.result), 200 if job.status == SUCCESS else 400
+
+
+def _job_payload(job, include_output: bool = True) -> Dict[str, Any]:
+    data = job.to_dict(include_output=include_output)
+    data["status_url"] = f"/api/jobs/{job.id}"
+    data["stream_url"] = f"/api/jobs/{job.id}/stream"
+    return data
+
+
 # ===== 路由定義 =====
 
 
 @app.route("/")
+@versioned(_data_version)
 def dashboard():
     """儀表板首頁"""
     stats = ctf_manager.get_stats()
@@ -1200,6 +1310,7 @@ def dashboard():
 
 
 @app.route("/challenges")
+@versioned(_data_version)
 def challenges_list():
     """挑戰列表頁面"""
     challenges = ctf_manager.get_challenges()
@@ -1241,6 +1352,7 @@ def setup_step(step: str):
         steps=SETUP_STEPS,
         statuses=statuses,
         config=ctf_manager.config,
+        config_version=file_version(CONFIG_FILE) or "",
     )
 
 
@@ -1257,8 +1369,8 @@ def setup_step_save(step: str):
         for k, v in data.items():
             flat[k] = v[0] if isinstance(v, list) and len(v) == 1 else v
         data = flat
-    result = ctf_manager.save_setup_step(step, data or {})
-    return jsonify(result)
+    result = ctf_manager.save_setup_step(step, data or {}, expected_version=_if_match())
+    return jsonify(result), 409 if result.get("conflict") else 200
 
 
 def _handle_setup_finalize(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -1297,6 +1409,7 @@ def _handle_setup_finalize(data: Dict[str, Any]) -> Dict[str, Any]:
 
     if data.get("cleanup_legacy"):
         report = cleanup_legacy_validation_fields(CHALLENGES_DIR, dry_run=False)
+        _notify_challenges_changed()
         actions.append(f"清理 {len(report.files_changed)} 個含冗餘欄位的檔案")
 
     return {"status": "success", "actions": actions}
@@ -1359,6 +1472,7 @@ def edit_challenge_form(category: str, name: str):
                 "error.html", error_code=404, error_message="題目配置檔案不存在"
             ), 404
 
+        challenge_version = file_version(private_yml_path)
         with open(private_yml_path, "r", encoding="utf-8") as f:
             challenge_data = yaml.safe_load(f)
 
@@ -1366,7 +1480,10 @@ def edit_challenge_form(category: str, name: str):
         challenge_data["name"] = name
         challenge_data["category"] = category
         return render_template(
-            "edit_challenge.html", config=ctf_manager.config, challenge=challenge_data
+            "edit_challenge.html",
+            config=ctf_manager.config,
+            challenge=challenge_data,
+            challenge_version=challenge_version,
         )
 
     except Exception as e:
@@ -1378,13 +1495,18 @@ def edit_challenge_form(category: str, name: str):
 @app.route("/settings")
 def settings():
     """設定頁面"""
-    return render_template("settings.html", config=ctf_manager.config)
+    return render_template(
+        "settings.html",
+        config=ctf_manager.config,
+        config_version=file_version(CONFIG_FILE) or "",
+    )
 
 
 # ===== API 路由 =====
 
 
 @app.route("/api/stats")
+@versioned(_data_version)
 def api_stats():
     """獲取統計資料 API"""
     try:
@@ -1394,12 +1516,75 @@ def api_stats():
         return jsonify({"status": "error", "message": str(stats_error)}), 500
 
 
+# /api/challenges 單頁上限
+MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    offset = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    if offset < 0:
+        raise ValueError(cursor)
+    return offset
+
+
 @app.route("/api/challenges")
+@versioned(_data_version)
 def api_challenges():
-    """獲取挑戰列表 API"""
+    """獲取挑戰列表 API
+
+    查詢參數（皆為選用，未指定時回傳全部題目的完整內容）：
+    - category / difficulty / status / author：篩選，逗號分隔多個值
+    - fields：只回傳指定欄位（逗號分隔；category、name 一律保留）
+    - sort：排序欄位，前面加 - 表示遞減，例如 sort=-points
+    - limit / cursor：分頁；回應中的 next_cursor 用於取得下一頁
+
+    回應帶 ETag（快照版本 + 查詢參數），If-None-Match 相符時回傳 304。
+    """
     try:
-        challenges = ctf_manager.get_challenges()
-        return jsonify({"status": "success", "data": challenges})
+        snapshot = ctf_manager.challenge_store().snapshot()
+        args = request.args
+
+        filters = {}
+        for field_name in GROUP_FIELDS:
+            values = [v for raw in args.getlist(field_name) for v in raw.split(",") if v]
+            if values:
+                filters[field_name] = values
+        fields = [f for raw in args.getlist("fields") for f in raw.split(",") if f]
+        try:
+            limit = int(args["limit"]) if "limit" in args else None
+            offset = _decode_cursor(args["cursor"]) if args.get("cursor") else 0
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit 或 cursor 格式錯誤"}), 400
+        if limit is not None and limit <= 0:
+            return jsonify({"status": "error", "message": "limit 必須大於 0"}), 400
+
+        challenges = query_challenges(snapshot, filters, args.get("sort") or None)
+        total = len(challenges)
+        next_cursor = None
+        if limit is not None:
+            limit = min(limit, MAX_PAGE_SIZE)
+            if offset + limit < total:
+                next_cursor = _encode_cursor(offset + limit)
+            challenges = challenges[offset:offset + limit]
+        elif offset:
+            challenges = challenges[offset:]
+        if fields:
+            challenges = [project_fields(c, fields) for c in challenges]
+
+        return jsonify(
+            {
+                "status": "success",
+                "data": challenges,
+                "total": total,
+                "next_cursor": next_cursor,
+                "version": snapshot.version,
+            }
+        )
     except Exception as challenges_error:
         return jsonify({"status": "error", "message": str(challenges_error)}), 500
 
@@ -1408,10 +1593,15 @@ def api_challenges():
 def api_scan_challenge(category: str, name: str):
     """對單一題目執行敏感資料掃描。"""
     try:
-        result = ctf_manager.run_scan_secrets(category, name)
-        if result["status"] == "success":
-            return jsonify(result)
-        return jsonify(result), 400
+        body = request.get_json(silent=True) or {}
+        jobs = body.get("jobs")
+        jobs = int(jobs) if jobs is not None else None
+        return _run_job(
+            "scan",
+            f"scan:{category}/{name}",
+            lambda emit: ctf_manager.run_scan_secrets(category, name, jobs=jobs, emit=emit),
+            body,
+        )
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1422,10 +1612,13 @@ def api_build_challenge(category: str, name: str):
     try:
         body = request.get_json() or {}
         force = bool(body.get("force", True))
-        result = ctf_manager.run_build_public(category, name, force=force)
-        if result["status"] == "success":
-            return jsonify(result)
-        return jsonify(result), 400
+        return _run_job(
+            "build",
+            f"build:{category}/{name}:{force}",
+            lambda emit: ctf_manager.run_build_public(category, name, force=force, emit=emit),
+            body,
+            lock=PUBLIC_RELEASE_LOCK,
+        )
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1436,10 +1629,13 @@ def api_build_public_release():
     try:
         body = request.get_json() or {}
         force = bool(body.get("force", True))
-        result = ctf_manager.run_build_all_public(force=force)
-        if result["status"] == "success":
-            return jsonify(result)
-        return jsonify(result), 400
+        return _run_job(
+            "build",
+            f"build:all:{force}",
+            lambda emit: ctf_manager.run_build_all_public(force=force, emit=emit),
+            body,
+            lock=PUBLIC_RELEASE_LOCK,
+        )
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1448,14 +1644,68 @@ def api_build_public_release():
 def api_sync_public_release():
     """同步 ready_for_release 題目到 public-release（不推送遠端）。"""
     try:
-        result = ctf_manager.run_sync_to_public()
-        if result["status"] == "success":
-            return jsonify(result)
-        return jsonify(result), 400
+        body = request.get_json(silent=True) or {}
+        return _run_job(
+            "sync",
+            "sync",
+            lambda emit: ctf_manager.run_sync_to_public(emit=emit),
+            body,
+            lock=PUBLIC_RELEASE_LOCK,
+        )
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/api/jobs")
+def api_jobs():
+    """最近的背景工作（不含輸出）。"""
+    return jsonify(
+        {
+            "status": "success",
+            "data": [_job_payload(job, include_output=False) for job in job_runner.list()],
+        }
+    )
+
+
+@app.route("/api/jobs/<string:job_id>")
+def api_job_status(job_id: str):
+    """查詢背景工作的狀態、目前為止的輸出與結果。"""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "工作不存在"}), 404
+    return jsonify({"status": "success", "data": _job_payload(job)})
+
+
+@app.route("/api/jobs/<string:job_id>/stream")
+def api_job_stream(job_id: str):
+    """以 Server-Sent Events 逐行串流工作輸出；結束時送出 done 事件（內容為工作狀態）。
+
+    斷線重連時瀏覽器會帶 Last-Event-ID，從下一行繼續。
+    """
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "工作不存在"}), 404
+    try:
+        start = int(request.headers.get("Last-Event-ID", request.args.get("from", -1))) + 1
+    except ValueError:
+        start = 0
+
+    def generate():
+        for index, line in job.follow(max(start, 0)):
+            if line is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {index}\ndata: {line.replace(chr(13), '')}\n\n"
+        payload = json.dumps(_job_payload(job, include_output=False), ensure_ascii=False)
+        yield f"event: done\ndata: {payload}\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/challenges", methods=["POST"])
 def api_create_challenge():
     """創建挑戰 API"""
@@ -1488,7 +1738,9 @@ def api_get_challenge(category: str, name: str):
         public_yml_path = challenge_path / "public.yml"
 
         challenge_data = {}
+        version = None
         if private_yml_path.exists():
+            version = file_version(private_yml_path)
             with open(private_yml_path, "r", encoding="utf-8") as f:
                 challenge_data = yaml.safe_load(f)
         elif public_yml_path.exists():
@@ -1498,7 +1750,7 @@ def api_get_challenge(category: str, name: str):
             return jsonify({"status": "error", "message": "題目配置檔案不存在"}), 404
 
         challenge_data["path"] = str(challenge_path)
-        return jsonify({"status": "success", "data": challenge_data})
+        return jsonify({"status": "success", "data": challenge_data, "version": version})
 
     except Exception as e:
         return jsonify({"status": "error", "message": f"讀取題目失敗: {str(e)}"}), 500
@@ -1512,12 +1764,10 @@ def api_update_challenge(category: str, name: str):
         if not challenge_data:
             raise BadRequest("無效的請求資料")
 
-        result = ctf_manager.update_challenge(category, name, challenge_data)
-
-        if result["status"] == "success":
-            return jsonify(result)
-        else:
-            return jsonify(result), 400
+        result = ctf_manager.update_challenge(
+            category, name, challenge_data, expected_version=_if_match()
+        )
+        return jsonify(result), _write_status(result)
 
     except Exception as update_error:
         return jsonify({"status": "error", "message": str(update_error)}), 500
@@ -1535,6 +1785,7 @@ def api_delete_challenge(category: str, name: str):
 
         # 刪除整個挑戰目錄
         shutil.rmtree(challenge_path)
+        _notify_challenges_changed()
 
         return jsonify({"status": "success", "message": "挑戰刪除成功"})
 
@@ -1552,22 +1803,7 @@ def api_list_challenge_files(category: str, name: str):
         if not challenge_dir.exists():
             return jsonify({"status": "error", "message": "挑戰不存在"}), 404
 
-        files_dir = challenge_dir / "files"
-        files = []
-
-        if files_dir.exists():
-            for file_path in files_dir.iterdir():
-                if file_path.is_file():
-                    files.append(
-                        {
-                            "name": file_path.name,
-                            "size": file_path.stat().st_size,
-                            "modified": datetime.fromtimestamp(
-                                file_path.stat().st_mtime
-                            ).isoformat(),
-                        }
-                    )
-
+        files = [entry.to_dict() for entry in _attachments().listing(challenge_dir / "files")]
         return jsonify({"status": "success", "data": files})
 
     except Exception as e:
@@ -1576,16 +1812,30 @@ def api_list_challenge_files(category: str, name: str):
 
 @app.route("/api/challenges/<category>/<name>/files/<filename>", methods=["GET"])
 def api_download_challenge_file(category: str, name: str, filename: str):
-    """API: 下載挑戰檔案"""
-    try:
-        challenge_dir = CHALLENGES_DIR / category / name
-        files_dir = challenge_dir / "files"
-        file_path = files_dir / filename
+    """API: 下載挑戰檔案
 
-        if not file_path.exists() or not file_path.is_file():
+    支援 Range / If-Range（斷點續傳）與 If-None-Match；ETag 為快取的 sha256，
+    檔案內容交給 WSGI server 的 file_wrapper（gunicorn 會使用 sendfile）送出。
+    """
+    try:
+        entry = _attachments().entry(CHALLENGES_DIR / category / name / "files", filename)
+        if entry is None:
             return jsonify({"status": "error", "message": "檔案不存在"}), 404
 
-        return send_file(file_path, as_attachment=True, download_name=filename)
+        response = send_file(
+            entry.path,
+            as_attachment=True,
+            download_name=filename,
+            conditional=True,
+            etag=entry.sha256,
+            last_modified=entry.mtime_ns / 1e9,
+            max_age=None,
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Repr-Digest"] = (
+            "sha-256=:" + base64.b64encode(bytes.fromhex(entry.sha256)).decode("ascii") + ":"
+        )
+        return response
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -1606,10 +1856,22 @@ def api_validate_challenge(challenge_path: str):
         return jsonify({"status": "error", "message": str(validate_error)}), 500
 
 
+@app.route("/api/metrics")
+def api_metrics():
+    """Prometheus 格式的效能量測（需以 CTF_WEB_METRICS=1 啟用）"""
+    if metrics is None:
+        return jsonify({"status": "error", "message": "未啟用量測（設定 CTF_WEB_METRICS=1）"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/api/config")
 def api_config():
     """獲取配置 API"""
-    return jsonify({"status": "success", "data": ctf_manager.config})
+    return jsonify({
+        "status": "success",
+        "data": ctf_manager.config,
+        "version": file_version(CONFIG_FILE),
+    })
 
 
 @app.route("/api/git-user")
@@ -1627,10 +1889,8 @@ def api_update_settings():
     """更新 config.yml（分數/配額/團隊/時間等）。"""
     try:
         body = request.get_json() or {}
-        result = ctf_manager.update_config(body)
-        if result["status"] == "success":
-            return jsonify(result)
-        return jsonify(result), 400
+        result = ctf_manager.update_config(body, expected_version=_if_match())
+        return jsonify(result), _write_status(result)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1651,8 +1911,12 @@ def api_setup_legacy_count():
 
 @app.route("/static/<path:filename>")
 def static_files(filename):
-    """提供靜態檔案"""
-    return send_from_directory(STATIC_DIR, filename)
+    """提供靜態檔案（帶版本的網址長期快取，可壓縮的檔案送出預壓縮版本）"""
+    return send_static(STATIC_DIR, filename)
+
+
+# Flask 內建的 static endpoint 會先比對到 /static/...，讓它也走同一個處理函式
+app.view_functions["static"] = static_files
 
 
 # ===== 錯誤處理 =====
@@ -1685,5 +1949,9 @@ if __name__ == "__main__":
     print("📍 URL: http://localhost:8004")
     print("🎨 使用 Jinja2 + Bulma CSS 框架")
 
+    # 啟動時載入題目快照，之後由檔案監看保持最新
+    store = ctf_manager.challenge_store()
+    print(f"📚 已載入 {len(store.snapshot().challenges)} 個題目（更新方式：{store.mode}）")
+
     # 開發模式運行
     app.run(host="0.0.0.0", port=8004, debug=True, threaded=True)
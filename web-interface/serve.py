@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+IS1AB CTF Template - Web 介面正式環境啟動入口
+
+以正式的 WSGI server 執行 app.py（取代 Flask 開發伺服器）：
+- gunicorn（Linux / macOS）：多個 worker 行程 × 每個 worker 多個執行緒（gthread），
+  `kill -HUP <pid>` 可平滑重啟 worker；
+- waitress（Windows 或沒有 gunicorn 時）：單一行程、多執行緒。
+
+多個 worker 時，背景工作的狀態存放在 .ctf-cache/jobs.sqlite，題目或 config.yml
+的修改會透過 .ctf-cache/web-generation 通知其他 worker 重新載入。
+
+使用方式：
+    uv run --with gunicorn python serve.py --workers 4 --threads 8
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parent
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8004
+DEFAULT_THREADS = 8
+
+
+def default_workers() -> int:
+    """預設 worker 數：CPU 核心數（上限 4，管理介面不需要太多行程）。"""
+    return max(1, min(os.cpu_count() or 1, 4))
+
+
+def load_app():
+    """匯入 Flask app 並預先載入題目快照。"""
+    if str(WEB_DIR) not in sys.path:
+        sys.path.insert(0, str(WEB_DIR))
+    from app import app, ctf_manager
+
+    ctf_manager.challenge_store()
+    return app
+
+
+def pick_server(name: str) -> str:
+    if name != "auto":
+        return name
+    if os.name != "nt":
+        try:
+            import gunicorn  # noqa: F401
+
+            return "gunicorn"
+        except ImportError:
+            pass
+    try:
+        import waitress  # noqa: F401
+
+        return "waitress"
+    except ImportError:
+        pass
+    sys.exit(
+        "❌ 找不到 WSGI server，請安裝 gunicorn 或 waitress，例如：\n"
+        "   uv run --with gunicorn python serve.py"
+    )
+
+
+def run_gunicorn(args) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": 5,
+        "pidfile": args.pid,
+        "reload": args.reload,
+        "accesslog": "-" if args.access_log else None,
+        "errorlog": "-",
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    Server().run()
+
+
+def run_waitress(args) -> None:
+    from waitress import serve
+
+    if args.workers > 1:
+        print("⚠️  waitress 只支援單一行程，改以 1 個 worker、多執行緒執行")
+    os.environ["CTF_WEB_WORKERS"] = "1"
+    serve(load_app(), host=args.host, port=args.port, threads=args.threads)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="以正式 WSGI server 啟動 Web 介面")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"監聽位址 (預設: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"監聽埠 (預設: {DEFAULT_PORT})")
+    parser.add_argument("-w", "--workers", type=int, default=default_workers(),
+                        help="worker 行程數 (預設: CPU 核心數，最多 4)")
+    parser.add_argument("-t", "--threads", type=int, default=DEFAULT_THREADS,
+                        help=f"每個 worker 的執行緒數 (預設: {DEFAULT_THREADS})；每條 SSE 串流會佔用一個執行緒")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "waitress"], default="auto",
+                        help="WSGI server (預設: auto，優先 gunicorn)")
+    parser.add_argument("--timeout", type=int, default=120, help="gunicorn worker 逾時秒數")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="平滑重啟 / 關閉時等待進行中 request 的秒數")
+    parser.add_argument("--pid", help="gunicorn pid 檔（kill -HUP $(cat <pid>) 可平滑重啟）")
+    parser.add_argument("--reload", action="store_true", help="程式碼變更時自動重啟（gunicorn，開發用）")
+    parser.add_argument("--access-log", action="store_true", help="輸出 access log")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers 與 --threads 必須大於 0")
+
+    server = pick_server(args.server)
+    # 在匯入 app 之前設定，讓 app 依 worker 數選擇共用的工作狀態儲存方式
+    os.environ["CTF_WEB_WORKERS"] = str(args.workers)
+
+    print("🚀 啟動 IS1AB CTF Template Web Interface（正式模式）")
+    print(f"📍 URL: http://{args.host}:{args.port}")
+    print(f"⚙️  {server}：{args.workers} 個 worker × {args.threads} 個執行緒")
+
+    if server == "gunicorn":
+        run_gunicorn(args)
+    else:
+        run_waitress(args)
+
+
+if __name__ == "__main__":
+    main()
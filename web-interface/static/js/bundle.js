@@ -27,8 +27,11 @@ function showNotification(message,type='info',duration=5000){const notification=
 const deleteButton=notification.querySelector('.delete');deleteButton.addEventListener('click',()=>{notification.remove();});if(duration>0){setTimeout(()=>{if(notification.parentNode){notification.remove();}},duration);}}
 async function apiRequest(url,options={}){const defaultOptions={headers:{'Content-Type':'application/json',}};try{const response=await fetch(url,{...defaultOptions,...options});const data=await response.json();if(!response.ok){throw new Error(data.message||'請求失敗');}
 return data;}catch(error){console.error('API 請求錯誤:',error);showNotification(`錯誤:${error.message}`,'danger');throw error;}}
+async function runJob(url,body={},onOutput=()=>{}){const response=await fetch(url,{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({...body,async:true}),});const accepted=await response.json();if(response.status!==202){return{ok:response.ok,j:accepted};}
+const job=accepted.data;const lines=[];const finished=await new Promise((resolve)=>{if(!window.EventSource){const poll=()=>fetch(job.status_url).then((r)=>r.json()).then((s)=>{onOutput(s.data.output||'');if(s.data.result)return resolve(s.data);setTimeout(poll,1000);}).catch(()=>setTimeout(poll,1000));return poll();}
+const source=new EventSource(job.stream_url);source.onmessage=(event)=>{lines.push(event.data);onOutput(lines.join('\n'));};source.addEventListener('done',(event)=>{source.close();resolve(JSON.parse(event.data));});});const result=finished.result||{status:'error',message:'工作失敗'};return{ok:finished.status==='success',j:result};}
 function formatDate(date){return new Intl.DateTimeFormat('zh-TW',{year:'numeric',month:'2-digit',day:'2-digit',hour:'2-digit',minute:'2-digit'}).format(new Date(date));}
 function formatFileSize(bytes){if(bytes===0)return'0 Bytes';const k=1024;const sizes=['Bytes','KB','MB','GB'];const i=Math.floor(Math.log(bytes)/Math.log(k));return parseFloat((bytes/Math.pow(k,i)).toFixed(2))+' '+sizes[i];}
 function debounce(func,wait){let timeout;return function executedFunction(...args){const later=()=>{clearTimeout(timeout);func(...args);};clearTimeout(timeout);timeout=setTimeout(later,wait);};}
 function throttle(func,limit){let inThrottle;return function(){const args=arguments;const context=this;if(!inThrottle){func.apply(context,args);inThrottle=true;setTimeout(()=>inThrottle=false,limit);}};}
-window.CTF={showLoading,hideLoading,showNotification,apiRequest,formatDate,formatFileSize,debounce,throttle};
\ No newline at end of file
+window.CTF={showLoading,hideLoading,showNotification,apiRequest,runJob,formatDate,formatFileSize,debounce,throttle};
\ No newline at end of file
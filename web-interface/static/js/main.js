@@ -378,6 +378,51 @@ async function apiRequest(url, options = {}) {
     }
 }
 
+/**
+ * 執行背景工作（掃描 / 建置 / 同步）
+ * 以 async 模式送出請求，再透過 SSE 逐行接收輸出；onOutput(text) 會收到目前累積的輸出。
+ * 回傳 { ok, j }，j 與同步模式的回應格式相同。
+ */
+async function runJob(url, body = {}, onOutput = () => {}) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...body, async: true }),
+    });
+    const accepted = await response.json();
+    if (response.status !== 202) {
+        return { ok: response.ok, j: accepted };
+    }
+
+    const job = accepted.data;
+    const lines = [];
+    const finished = await new Promise((resolve) => {
+        if (!window.EventSource) {
+            const poll = () => fetch(job.status_url)
+                .then((r) => r.json())
+                .then((s) => {
+                    onOutput(s.data.output || '');
+                    if (s.data.result) return resolve(s.data);
+                    setTimeout(poll, 1000);
+                })
+                .catch(() => setTimeout(poll, 1000));
+            return poll();
+        }
+        const source = new EventSource(job.stream_url);
+        source.onmessage = (event) => {
+            lines.push(event.data);
+            onOutput(lines.join('\n'));
+        };
+        source.addEventListener('done', (event) => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        });
+    });
+
+    const result = finished.result || { status: 'error', message: '工作失敗' };
+    return { ok: finished.status === 'success', j: result };
+}
+
 /**
  * 格式化日期
  */
@@ -441,6 +486,7 @@ window.CTF = {
     hideLoading,
     showNotification,
     apiRequest,
+    runJob,
     formatDate,
     formatFileSize,
     debounce,